@@ -0,0 +1,217 @@
+"""
+Сериализаторы только для чтения для списочных эндпоинтов.
+
+Вместо создания экземпляров моделей и обхода полей DRF строки выбираются
+через .values(), а словари ответа собираются по заранее составленному
+плану полей. Категории и жанры берутся из кэша titles.taxonomy.
+Формат и порядок полей совпадают с соответствующими сериализаторами из
+api.serializers.
+"""
+from rest_framework import serializers
+from titles.models import Title
+from titles.taxonomy import get_taxonomy
+
+
+class Column:
+    """
+    Поле модели или связанной модели, которое выводится как есть.
+    """
+    uses_taxonomy = False
+
+    def __init__(self, lookup, to_representation):
+        self.lookup = lookup
+        self.lookups = (lookup,)
+        self.to_representation = to_representation
+
+    def prepare(self, rows, taxonomy):
+        return None
+
+    def build(self, row, prepared):
+        value = row[self.lookup]
+        if value is None:
+            return None
+        return self.to_representation(value)
+
+
+class TaxonomyRelated:
+    """
+    Вложенная категория произведения. Берется из кэша titles.taxonomy по
+    значению внешнего ключа, без JOIN.
+    """
+    uses_taxonomy = True
+
+    def __init__(self, lookup, kind, fields):
+        self.lookup = lookup
+        self.lookups = (lookup,)
+        self.kind = kind
+        self.fields = fields
+
+    def prepare(self, rows, taxonomy):
+        return getattr(taxonomy, self.kind)
+
+    def build(self, row, objects):
+        obj = objects.get(row[self.lookup])
+        if obj is None:
+            return None
+        return {name: getattr(obj, name) for name in self.fields}
+
+
+class TaxonomyManyRelated:
+    """
+    Список жанров произведения. На страницу выполняется один запрос к
+    промежуточной таблице за парами id, сами жанры берутся из кэша
+    titles.taxonomy.
+    """
+    lookups = ()
+    uses_taxonomy = True
+
+    def __init__(self, model, relation, kind, fields):
+        field = model._meta.get_field(relation)
+        self.through = field.remote_field.through
+        self.source = f'{field.m2m_field_name()}_id'
+        self.target = f'{field.m2m_reverse_field_name()}_id'
+        self.kind = kind
+        self.fields = fields
+
+    def prepare(self, rows, taxonomy):
+        links = {}
+        pairs = self.through.objects.filter(
+            **{f'{self.source}__in': [row['id'] for row in rows]}
+        ).order_by(self.target).values_list(self.source, self.target)
+        for source_id, target_id in pairs:
+            links.setdefault(source_id, []).append(target_id)
+        return links, getattr(taxonomy, self.kind)
+
+    def build(self, row, prepared):
+        links, objects = prepared
+        return [
+            {name: getattr(objects[pk], name) for name in self.fields}
+            for pk in links.get(row['id'], ()) if pk in objects
+        ]
+
+
+datetime_field = serializers.DateTimeField()
+
+
+class FastSerializer:
+    """
+    Базовый класс. В plan перечисляются пары (имя поля в ответе, поле),
+    в том же порядке, что и в обычном сериализаторе.
+    """
+    plan = ()
+
+    def __init__(self, fields=None):
+        self.fields = tuple(
+            (name, field) for name, field in self.plan
+            if fields is None or name in fields
+        )
+        lookups = {'id'}
+        for _, field in self.fields:
+            lookups.update(field.lookups)
+        self.lookups = tuple(lookups)
+
+    def prepare(self, queryset):
+        """
+        Превращает queryset вьюсета в queryset словарей с нужными колонками.
+        """
+        return queryset.prefetch_related(None).values(*self.lookups)
+
+    def serialize(self, rows):
+        rows = list(rows)
+        # Снимок категорий и жанров берется один раз на страницу: каждая
+        # проверка его версии - обращение к общему кэшу.
+        taxonomy = None
+        if any(field.uses_taxonomy for _, field in self.fields):
+            taxonomy = get_taxonomy()
+        fields = tuple(
+            (name, field.build, field.prepare(rows, taxonomy))
+            for name, field in self.fields
+        )
+        return [
+            {name: build(row, prepared) for name, build, prepared in fields}
+            for row in rows
+        ]
+
+
+class TitleListFastSerializer(FastSerializer):
+    plan = (
+        ('id', Column('id', int)),
+        ('category', TaxonomyRelated(
+            'category', 'categories', ('name', 'slug')
+        )),
+        ('genre', TaxonomyManyRelated(
+            Title, 'genre', 'genres', ('name', 'slug')
+        )),
+        ('rating', Column('rating', float)),
+        ('review_count', Column('review_count', int)),
+        ('name', Column('name', str)),
+        ('year', Column('year', int)),
+        ('description', Column('description', str)),
+    )
+
+
+class ReviewFastSerializer(FastSerializer):
+    plan = (
+        ('id', Column('id', int)),
+        ('author', Column('author__username', str)),
+        ('score', Column('score', int)),
+        ('text', Column('text', str)),
+        ('pub_date', Column('pub_date', datetime_field.to_representation)),
+        ('comment_count', Column('comment_count', int)),
+    )
+
+
+class UserReviewFastSerializer(FastSerializer):
+    """
+    Отзыв в ленте пользователя: поля ReviewFastSerializer и id
+    произведения.
+    """
+    plan = (
+        ('id', Column('id', int)),
+        ('title', Column('title_id', int)),
+        *ReviewFastSerializer.plan[1:],
+    )
+
+
+class CommentFastSerializer(FastSerializer):
+    plan = (
+        ('id', Column('id', int)),
+        ('author', Column('author__username', str)),
+        ('text', Column('text', str)),
+        ('pub_date', Column('pub_date', datetime_field.to_representation)),
+    )
+
+
+class UserCommentFastSerializer(FastSerializer):
+    """
+    Комментарий в ленте пользователя: поля CommentFastSerializer, id
+    отзыва и произведения.
+    """
+    plan = (
+        ('id', Column('id', int)),
+        ('title', Column('review__title_id', int)),
+        ('review', Column('review_id', int)),
+        *CommentFastSerializer.plan[1:],
+    )
+
+
+class ReviewSearchFastSerializer(FastSerializer):
+    """
+    Отзыв в результатах поиска: поля UserReviewFastSerializer и
+    релевантность.
+    """
+    plan = (
+        *UserReviewFastSerializer.plan,
+        ('rank', Column('rank', float)),
+    )
+
+
+class CommentSearchFastSerializer(FastSerializer):
+    """
+    Комментарий в результатах поиска: поля UserCommentFastSerializer и
+    релевантность.
+    """
+    plan = (
+        *UserCommentFastSerializer.plan,
+        ('rank', Column('rank', float)),
+    )
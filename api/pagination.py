@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация от новых отзывов к старым. CursorPagination
+    строит курсор только по первому полю ordering: следующая страница
+    выбирается условием pub_date < последнего значения, а строки с той же
+    pub_date, что уже были показаны, пропускаются через OFFSET. -id лишь
+    фиксирует порядок строк с равной pub_date. При индексе
+    (author, -pub_date, -id) стоимость запроса не зависит от номера
+    страницы, пока совпадающих pub_date немного.
+    """
+    ordering = ('-pub_date', '-id')
+
+
+class RankCursorPagination(CursorPagination):
+    """
+    Результаты поиска от более релевантных к менее релевантным. Курсор
+    строится по rank, отзывы с равной релевантностью упорядочены по id и
+    пропускаются через OFFSET, как в PubDateCursorPagination.
+    """
+    ordering = ('-rank', '-id')
@@ -1,9 +1,16 @@
 import datetime
 
+from django.db import IntegrityError, transaction
+from django.utils.encoding import smart_str
+
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from titles.models import Category, Comment, Genre, Review, Title
+from titles.taxonomy import get_taxonomy
 from users.models import CustomUser
 
+UNIQUE_VIOLATION = '23505'
+
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,18 +24,96 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
+def get_context_taxonomy(field):
+    """
+    Снимок titles.taxonomy, общий для всех полей и строк одной
+    сериализации: он хранится в контексте корневого сериализатора, поэтому
+    версия в общем кэше проверяется один раз, а не на каждое поле.
+    """
+    context = field.context
+    if 'taxonomy' not in context:
+        context['taxonomy'] = get_taxonomy()
+    return context['taxonomy']
+
+
+class TaxonomySlugField(serializers.SlugRelatedField):
+    """
+    Категория или жанр по slug. Объект ищется в кэше titles.taxonomy, а не
+    запросом к БД.
+    """
+
+    def __init__(self, kind, **kwargs):
+        self.kind = kind
+        kwargs.setdefault('slug_field', 'slug')
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        obj = getattr(get_context_taxonomy(self), self.kind).get(data)
+        if obj is None:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        return obj
+
+
+class TaxonomyNestedField(serializers.Field):
+    """
+    Вложенные категория или жанры произведения. Объекты берутся из кэша
+    titles.taxonomy по id: для категории это значение category_id, для
+    жанров - id из промежуточной таблицы.
+    """
+
+    def __init__(self, kind, serializer_class, many=False, **kwargs):
+        self.kind = kind
+        self.serializer = serializer_class()
+        self.many = many
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        if not self.many:
+            return getattr(instance, f'{self.source}_id')
+        prefetched = getattr(instance, '_prefetched_objects_cache', {})
+        if self.source in prefetched:
+            return sorted(obj.pk for obj in prefetched[self.source])
+        manager = getattr(instance, self.source)
+        return list(
+            manager.through.objects.filter(
+                **{manager.source_field_name: instance.pk}
+            ).order_by(f'{manager.target_field_name}_id').values_list(
+                f'{manager.target_field_name}_id', flat=True
+            )
+        )
+
+    def to_representation(self, value):
+        objects = getattr(get_context_taxonomy(self), self.kind)
+        if self.many:
+            return [
+                self.serializer.to_representation(objects[pk])
+                for pk in value if pk in objects
+            ]
+        obj = objects.get(value)
+        if obj is None:
+            return None
+        return self.serializer.to_representation(obj)
+
+
 class TitleCreateSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
-        slug_field='slug',
+    category = TaxonomySlugField(
+        'categories_by_slug',
         queryset=Category.objects.all())
-    genre = serializers.SlugRelatedField(
-        slug_field='slug',
+    genre = TaxonomySlugField(
+        'genres_by_slug',
         many=True,
         queryset=Genre.objects.all())
     rating = serializers.FloatField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'category', 'genre', 'rating', 'review_count', 'name',
+            'year', 'description',
+        )
         model = Title
 
     def validate_year(self, year):
@@ -43,44 +128,109 @@ class TitleCreateSerializer(serializers.ModelSerializer):
         return year
 
 
-class TitleListSerializer(serializers.ModelSerializer):
-    category = CategorySerializer()
-    genre = GenreSerializer(many=True)
+class SparseFieldsetMixin:
+    """
+    Оставляет в ответе только поля, перечисленные в параметре запроса
+    ?fields=. Вложенные объекты из Meta.expandable_fields при этом не
+    выводятся, пока их не добавят через ?expand= или явно в ?fields=;
+    ?expand= без ?fields= добавляет их ко всем простым полям. Без
+    параметров выводятся все поля.
+    """
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """
+        Возвращает множество запрошенных полей или None, если клиент не
+        ограничивал набор полей.
+        """
+        if request is None:
+            return None
+        fields = request.query_params.get('fields')
+        expand = request.query_params.get('expand')
+        if not fields and not expand:
+            return None
+        expandable = set(cls.Meta.expandable_fields)
+        if fields:
+            requested = {name.strip() for name in fields.split(',')}
+        else:
+            requested = set(cls.Meta.fields) - expandable
+        if expand:
+            requested |= {
+                name.strip() for name in expand.split(',')
+            } & expandable
+        return requested & set(cls.Meta.fields)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.get_requested_fields(self.context.get('request'))
+        if requested is None:
+            return
+        for field_name in set(self.fields) - requested:
+            self.fields.pop(field_name)
+
+
+class TitleListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    category = TaxonomyNestedField('categories', CategorySerializer)
+    genre = TaxonomyNestedField('genres', GenreSerializer, many=True)
     rating = serializers.FloatField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'category', 'genre', 'rating', 'review_count', 'name',
+            'year', 'description',
+        )
+        expandable_fields = ('category', 'genre')
         model = Title
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+def is_unique_violation(error):
+    """
+    IntegrityError вызван нарушением уникальности, а не внешнего ключа,
+    NOT NULL или CHECK.
+    """
+    pgcode = getattr(error.__cause__, 'pgcode', None)
+    if pgcode is not None:
+        return pgcode == UNIQUE_VIOLATION
+    return str(error).startswith('UNIQUE constraint failed')
+
+
+class UniqueConstraintMixin:
+    """
+    Уникальность проверяется ограничениями БД, а не запросами exists()
+    перед сохранением. Нарушение уникальности переводится в ошибку
+    валидации из get_unique_error(), остальные IntegrityError
+    пробрасываются дальше.
+    """
+    unique_error = 'Объект с такими данными уже существует.'
+
+    def get_unique_error(self, validated_data):
+        return {api_settings.NON_FIELD_ERRORS_KEY: [self.unique_error]}
+
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            if not is_unique_violation(error):
+                raise
+            raise serializers.ValidationError(
+                self.get_unique_error({**self.validated_data, **kwargs})
+            )
+
+
+class ReviewSerializer(UniqueConstraintMixin, serializers.ModelSerializer):
     author = serializers.StringRelatedField(
         default=serializers.CurrentUserDefault(),
         read_only=True,
     )
     score = serializers.IntegerField(max_value=10, min_value=1)
 
+    unique_error = 'Можно оставить только один отзыв на произведение.'
+
     class Meta:
         model = Review
         exclude = ('title',)
 
-    def validate(self, data):
-        """
-        Разрешить пользователям оставлять только один отзыв на произведение.
-        """
-        request = self.context.get('request')
-        if request.method != 'POST':
-            return data
-
-        title_id = self.context.get('view').kwargs.get('title_id')
-        user = self.context.get('request').user
-        queryset = Review.objects.filter(author=user, title=title_id)
-        if queryset.exists():
-            raise serializers.ValidationError(
-                'Можно оставить только один отзыв на произведение.'
-            )
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     author = serializers.StringRelatedField(read_only=True)
@@ -90,8 +240,18 @@ class CommentSerializer(serializers.ModelSerializer):
         exclude = ('review',)
 
 
-class UserSerializer(serializers.ModelSerializer):
-    email = serializers.EmailField()
+class LowercaseEmailField(serializers.EmailField):
+    """
+    email приводится к нижнему регистру, как он хранится в CustomUser.
+    """
+
+    def to_internal_value(self, data):
+        return super().to_internal_value(data).lower()
+
+
+class UserSerializer(UniqueConstraintMixin, serializers.ModelSerializer):
+    unique_error = 'Пользователь с такими данными уже существует!'
+    email = LowercaseEmailField()
     username = serializers.CharField()
 
     class Meta:
@@ -100,35 +260,25 @@ class UserSerializer(serializers.ModelSerializer):
             'first_name', 'last_name', 'username', 'role', 'email', 'bio'
         )
 
-    def validate_email(self, value):
+    def get_unique_error(self, validated_data):
         """
-        email должен быть уникальным.
+        email и username должны быть уникальными. Какое из полей совпало с
+        существующим пользователем, проверяется только после ошибки
+        сохранения.
         """
-        request = self.context.get('request')
-        if request.method != 'POST':
-            return value
-        queryset = CustomUser.objects.filter(email=value)
-        if queryset.exists():
-            raise serializers.ValidationError(
-                'Пользователь с таким email уже существует!'
-            )
-        return value
-
-    def validate_username(self, value):
-        """
-        username должны быть уникальным.
-        """
-        request = self.context.get('request')
-        if request.method != 'POST':
-            return value
-        queryset_username = CustomUser.objects.filter(
-            username=value
-        )
-        if queryset_username.exists():
-            raise serializers.ValidationError(
+        users = CustomUser.objects.all()
+        if self.instance is not None:
+            users = users.exclude(pk=self.instance.pk)
+        errors = {}
+        email = validated_data.get('email')
+        if email and users.filter(email=email).exists():
+            errors['email'] = ['Пользователь с таким email уже существует!']
+        username = validated_data.get('username')
+        if username and users.filter(username=username).exists():
+            errors['username'] = [
                 'Пользователь с таким username уже существует!'
-            )
-        return value
+            ]
+        return errors or super().get_unique_error(validated_data)
 
 
 class UserRoleReadOnlySerializer(UserSerializer):
@@ -136,7 +286,7 @@ class UserRoleReadOnlySerializer(UserSerializer):
 
 
 class EmailSerializer(serializers.ModelSerializer):
-    email = serializers.EmailField()
+    email = LowercaseEmailField()
 
     class Meta:
         model = CustomUser
@@ -144,7 +294,7 @@ class EmailSerializer(serializers.ModelSerializer):
 
 
 class EmailCodeSerializer(serializers.ModelSerializer):
-    email = serializers.EmailField()
+    email = LowercaseEmailField()
     code = serializers.CharField(max_length=30)
 
     class Meta:
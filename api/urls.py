@@ -6,8 +6,11 @@ from .views import (
     AuthInfoEmailAPIView,
     AuthInfoTokenAPIView,
     CategoriesViewSet,
+    CommentSearchViewSet,
     CommentViewSet,
     GenreViewSet,
+    ProfileAPIView,
+    ReviewSearchViewSet,
     ReviewViewSet,
     TitleViewSet,
     UserViewSet
@@ -19,6 +22,12 @@ v1_router.register('categories', CategoriesViewSet, 'categories')
 v1_router.register('titles', TitleViewSet, 'titles'),
 v1_router.register('genres', GenreViewSet),
 v1_router.register(r'users', UserViewSet, basename='users')
+v1_router.register(
+    'search/reviews', ReviewSearchViewSet, 'search-reviews'
+)
+v1_router.register(
+    'search/comments', CommentSearchViewSet, 'search-comments'
+)
 v1_router.register(
     r'titles/(?P<title_id>\d+)/reviews/(?P<review_id>\d+)/comments',
     CommentViewSet,
@@ -39,6 +48,11 @@ v1_auth = [
 
 v1_urlpatterns = [
     path('v1/auth/', include(v1_auth)),
+    path('v1/profiles/<str:profile_id>/', ProfileAPIView.as_view()),
+    path(
+        'v1/profiles/<str:profile_id>/prof/', ProfileAPIView.as_view(),
+        {'prof': True},
+    ),
     path('v1/', include(v1_router.urls)),
 ]
 
@@ -1,8 +1,10 @@
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import send_mail
-from django.db.models import Avg
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
 
+from api_yamdb.page_cache import CachedListMixin
+from api_yamdb.profiling import get_profile
 from api_yamdb.settings import (
     CONF_CODE_STRING,
     DEFAULT_FROM_EMAIL,
@@ -11,15 +13,35 @@ from api_yamdb.settings import (
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, mixins, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
-from titles.filters import TitleFilter
+from titles.filters import (
+    CommentSearchFilter,
+    ReviewSearchFilter,
+    StableOrderingFilter,
+    TitleFilter
+)
 from titles.models import Category, Comment, Genre, Review, Title
 from titles.permissions import IsAdmin, IsModerator, IsOwner, ReadOnly
+from titles.purge import soft_delete
+from titles.search import search
+from users.filters import UserFilter
 from users.models import CustomUser
 
+from .fast_serializers import (
+    CommentFastSerializer,
+    CommentSearchFastSerializer,
+    ReviewFastSerializer,
+    ReviewSearchFastSerializer,
+    TitleListFastSerializer,
+    UserCommentFastSerializer,
+    UserReviewFastSerializer
+)
+from .pagination import PubDateCursorPagination, RankCursorPagination
 from .serializers import (
     CategorySerializer,
     CommentSerializer,
@@ -34,6 +56,27 @@ from .serializers import (
 )
 
 
+class FastListMixin:
+    """
+    Отдает список объектов через быстрый сериализатор, который строит
+    ответ из .values() без создания экземпляров моделей.
+    """
+    fast_serializer_class = None
+
+    def get_fast_serializer(self):
+        return self.fast_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_fast_serializer()
+        queryset = serializer.prepare(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.serialize(page))
+        return Response(serializer.serialize(queryset))
+
+
 class ListCreateDestroyViewSet(mixins.ListModelMixin,
                                mixins.CreateModelMixin,
                                mixins.DestroyModelMixin,
@@ -67,15 +110,38 @@ class GenreViewSet(ListCreateDestroyViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(CachedListMixin, FastListMixin, viewsets.ModelViewSet):
     """
     На запрос с методом 'GET' возвращаются все произведения.
     Только админ может создавать, изменять или удалять произведения.
     """
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+    queryset = Title.objects.all()
     permission_classes = (ReadOnly | IsAdmin,)
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (DjangoFilterBackend, StableOrderingFilter)
     filter_class = TitleFilter
+    ordering_fields = ('name', 'year', 'rating', 'review_count')
+    ordering = ('id',)
+    fast_serializer_class = TitleListFastSerializer
+    batch_max_size = 100
+    page_cache_group = 'titles'
+
+    def get_fast_serializer(self):
+        return self.fast_serializer_class(
+            fields=TitleListSerializer.get_requested_fields(self.request)
+        )
+
+    def get_queryset(self):
+        """
+        Для чтения выбираем из БД только те колонки, которые попадут в
+        ответ. Категории и жанры берутся из кэша titles.taxonomy.
+        """
+        queryset = super().get_queryset()
+        if self.action not in ('retrieve', 'list'):
+            return queryset
+        fields = TitleListSerializer.get_requested_fields(self.request)
+        if fields is None:
+            return queryset
+        return queryset.only('id', *(fields - {'genre'}))
 
     def get_serializer_class(self):
         """"
@@ -86,8 +152,89 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleListSerializer
         return TitleCreateSerializer
 
+    def perform_destroy(self, instance):
+        """
+        Произведение скрывается сразу, а отзывы удаляются в фоне, см.
+        titles.purge.
+        """
+        soft_delete(instance)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=('get', 'post'),
+            permission_classes=(AllowAny,))
+    def batch(self, request):
+        """
+        Несколько произведений одним запросом: GET ?id__in=1,2,3 или POST
+        {"ids": [1, 2, 3]}. Произведения возвращаются в порядке запроса,
+        id, которых нет, перечисляются в missing. Число запросов к БД не
+        зависит от числа id.
+        """
+        ids = self.get_batch_ids(request)
+        fields = TitleListSerializer.get_requested_fields(request)
+        if fields is not None:
+            fields |= {'id'}
+        serializer = self.fast_serializer_class(fields=fields)
+        rows = {
+            row['id']: row for row in serializer.serialize(
+                serializer.prepare(self.get_queryset().filter(pk__in=ids))
+            )
+        }
+        return Response({
+            'results': [rows[pk] for pk in ids if pk in rows],
+            'missing': [pk for pk in ids if pk not in rows],
+        })
+
+    def get_batch_ids(self, request):
+        if request.method == 'POST':
+            field = 'ids'
+            if not isinstance(request.data, dict):
+                raise ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Ожидается объект {"ids": [...]}.'
+                    ]
+                })
+            ids = request.data.get(field)
+            if not isinstance(ids, list):
+                raise ValidationError({field: ['Ожидается список id.']})
+        else:
+            field = 'id__in'
+            ids = request.query_params.get(field, '')
+            ids = [pk.strip() for pk in ids.split(',') if pk.strip()]
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            raise ValidationError({field: ['id должны быть целыми числами.']})
+        # Повторы убираются с сохранением порядка.
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            raise ValidationError({field: ['Не указано ни одного id.']})
+        if len(ids) > self.batch_max_size:
+            raise ValidationError({
+                field: [f'Не больше {self.batch_max_size} id за запрос.']
+            })
+        return ids
+
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        """
+        Похожие произведения в порядке убывания сходства. Берутся из
+        таблицы SimilarTitle одним запросом по индексу (title, rank);
+        таблицу пересчитывает команда build_similar_titles.
+        """
+        try:
+            pk = int(pk)
+        except ValueError:
+            raise Http404
+        serializer = self.get_fast_serializer()
+        rows = serializer.serialize(serializer.prepare(
+            Title.objects.filter(recommended_in__title_id=pk)
+            .order_by('recommended_in__rank')
+        ))
+        if not rows and not Title.objects.filter(pk=pk).exists():
+            raise Http404
+        return Response(rows)
+
+
+class ReviewViewSet(CachedListMixin, FastListMixin, viewsets.ModelViewSet):
     """
     На запрос с методом 'GET' возвращаются все отзывы на произведение из
     запроса. Только автор, модератор или админ могут изменять или удалять
@@ -95,7 +242,9 @@ class ReviewViewSet(viewsets.ModelViewSet):
     """
     queryset = Review.objects.all()
     serializer_class = ReviewSerializer
+    fast_serializer_class = ReviewFastSerializer
     permission_classes = (ReadOnly | IsOwner | IsModerator | IsAdmin,)
+    page_cache_group = 'titles/{title_id}/reviews'
 
     def get_queryset(self):
         """
@@ -116,13 +265,14 @@ class ReviewViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user, title_id=title.id)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(FastListMixin, viewsets.ModelViewSet):
     """
     На запрос с методом 'GET' возвращаются все комментарии к отзыву из запроса.
     Только автор, модератор или админ могут изменять или удалять комментарии.
     """
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    fast_serializer_class = CommentFastSerializer
     permission_classes = (ReadOnly | IsOwner | IsModerator | IsAdmin,)
 
     def get_queryset(self):
@@ -132,7 +282,10 @@ class CommentViewSet(viewsets.ModelViewSet):
         """
         review_id = self.kwargs.get('review_id')
         title_id = self.kwargs.get('title_id')
-        review = get_object_or_404(Review, id=review_id, title__id=title_id)
+        review = get_object_or_404(
+            Review, id=review_id, title__id=title_id,
+            title__is_deleted=False,
+        )
         return review.comments.all()
 
     def perform_create(self, serializer):
@@ -142,10 +295,56 @@ class CommentViewSet(viewsets.ModelViewSet):
         """
         review_id = self.kwargs.get('review_id')
         title_id = self.kwargs.get('title_id')
-        review = get_object_or_404(Review, id=review_id, title__id=title_id)
+        review = get_object_or_404(
+            Review, id=review_id, title__id=title_id,
+            title__is_deleted=False,
+        )
         serializer.save(author=self.request.user, review_id=review.id)
 
 
+class SearchViewSet(FastListMixin, mixins.ListModelMixin,
+                    viewsets.GenericViewSet):
+    """
+    Полнотекстовый поиск по тексту для модераторов и администраторов.
+    Слова из параметра q ищутся все сразу, результаты идут по убыванию
+    релевантности (titles.search).
+    """
+    permission_classes = (IsModerator | IsAdmin,)
+    pagination_class = RankCursorPagination
+    filter_backends = (DjangoFilterBackend,)
+    search_param = 'q'
+    search_max_length = 200
+
+    def get_search_query(self):
+        query = self.request.query_params.get(self.search_param, '').strip()
+        if not query:
+            raise ValidationError(
+                {self.search_param: 'Укажите текст для поиска.'}
+            )
+        if len(query) > self.search_max_length:
+            raise ValidationError({
+                self.search_param: 'Не больше {} символов.'.format(
+                    self.search_max_length
+                )
+            })
+        return query
+
+    def get_queryset(self):
+        return search(super().get_queryset(), self.get_search_query())
+
+
+class ReviewSearchViewSet(SearchViewSet):
+    queryset = Review.objects.filter(title__is_deleted=False)
+    filter_class = ReviewSearchFilter
+    fast_serializer_class = ReviewSearchFastSerializer
+
+
+class CommentSearchViewSet(SearchViewSet):
+    queryset = Comment.objects.filter(review__title__is_deleted=False)
+    filter_class = CommentSearchFilter
+    fast_serializer_class = CommentSearchFastSerializer
+
+
 def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
 
@@ -160,11 +359,16 @@ class UserViewSet(viewsets.ModelViewSet):
     Просматривать, создавать, изменять и удалять профайлы пользователей
     может только администратор.
     """
-    queryset = CustomUser.objects.all()
+    queryset = CustomUser.objects.order_by('username')
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
+    filter_backends = (DjangoFilterBackend,)
+    filter_class = UserFilter
     lookup_field = 'username'
 
+    def perform_destroy(self, instance):
+        soft_delete(instance)
+
     @action(detail=False, url_path='me', url_name='user_profile',
             permission_classes=(IsAuthenticated,))
     def user_data(self, request):
@@ -182,6 +386,57 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer.save()
         return Response(serializer.data)
 
+    def activity(self, queryset, fast_serializer_class):
+        """
+        Страница ленты отзывов или комментариев пользователя. Фильтры
+        вьюсета относятся к пользователям и здесь не применяются. Отзывы
+        удаленных произведений в ленту не попадают, пока их не удалит
+        titles.purge.
+        """
+        serializer = fast_serializer_class()
+        page = self.paginate_queryset(serializer.prepare(queryset))
+        return self.get_paginated_response(serializer.serialize(page))
+
+    @action(detail=False, url_path='me/reviews', url_name='my_reviews',
+            permission_classes=(IsAuthenticated,),
+            pagination_class=PubDateCursorPagination)
+    def my_reviews(self, request):
+        return self.activity(
+            Review.objects.filter(
+                author=request.user, title__is_deleted=False
+            ),
+            UserReviewFastSerializer,
+        )
+
+    @action(detail=False, url_path='me/comments', url_name='my_comments',
+            permission_classes=(IsAuthenticated,),
+            pagination_class=PubDateCursorPagination)
+    def my_comments(self, request):
+        return self.activity(
+            Comment.objects.filter(
+                author=request.user, review__title__is_deleted=False
+            ),
+            UserCommentFastSerializer,
+        )
+
+    @action(detail=True, pagination_class=PubDateCursorPagination)
+    def reviews(self, request, username=None):
+        return self.activity(
+            Review.objects.filter(
+                author=self.get_object(), title__is_deleted=False
+            ),
+            UserReviewFastSerializer,
+        )
+
+    @action(detail=True, pagination_class=PubDateCursorPagination)
+    def comments(self, request, username=None):
+        return self.activity(
+            Comment.objects.filter(
+                author=self.get_object(), review__title__is_deleted=False
+            ),
+            UserCommentFastSerializer,
+        )
+
 
 class AuthInfoEmailAPIView(generics.CreateAPIView):
     """
@@ -198,8 +453,9 @@ class AuthInfoEmailAPIView(generics.CreateAPIView):
         email = request.data.get('email')
         serializer = EmailSerializer(data={'email': email})
         serializer.is_valid(raise_exception=True)
+        email = serializer.validated_data['email']
         user, created = CustomUser.objects.get_or_create(
-            username=email, email=email)
+            email=email, defaults={'username': email})
         code = default_token_generator.make_token(user)
         send_mail(
             SUBJECT_CONFIRMATION,
@@ -223,7 +479,9 @@ class AuthInfoTokenAPIView(generics.CreateAPIView):
         serializer = EmailCodeSerializer(data={'email': email, 'code': code})
         serializer.is_valid(raise_exception=True)
 
-        user = get_object_or_404(CustomUser, email=email)
+        user = get_object_or_404(
+            CustomUser, email=serializer.validated_data['email']
+        )
 
         if not default_token_generator.check_token(user, code):
             raise ValidationError('Неверный код подтверждения!')
@@ -231,3 +489,26 @@ class AuthInfoTokenAPIView(generics.CreateAPIView):
         token = get_tokens_for_user(user).get('access')
 
         return Response({'token': token})
+
+
+class ProfileAPIView(APIView):
+    """
+    Отчет профилировщика запроса (api_yamdb.profiling): SQL-запросы с
+    временем и сводка cProfile. По адресу .../prof/ отдается файл для
+    pstats.
+    """
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, profile_id, prof=False):
+        profile = get_profile(profile_id)
+        if profile is None:
+            raise NotFound('Профиль не найден или устарел.')
+        if not prof:
+            return Response(profile['report'])
+        response = HttpResponse(
+            profile['prof'], content_type='application/octet-stream'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{profile_id}.prof"'
+        )
+        return response
@@ -0,0 +1,180 @@
+"""
+Чтение из реплик базы данных.
+
+ReplicaRoutingMiddleware выбирает реплику для запросов с безопасными
+методами (GET, HEAD, OPTIONS) и сохраняет ее в контекстной переменной,
+ReplicaRouter отправляет в нее чтения. Запись, чтение внутри транзакции
+и любые запросы вне HTTP (команды, миграции) идут в default.
+
+POST-запросы на адреса из REPLICA_READ_ONLY_PATH только читают данные
+и обрабатываются как GET. После остальных небезопасных запросов клиент
+на REPLICA_PIN_SECONDS закрепляется за default, чтобы сразу видеть свои
+изменения, даже если реплика отстает. Клиент определяется по заголовку
+Authorization, а без него по адресу. Отметка хранится в кэше, поэтому
+для нескольких процессов gunicorn кэш должен быть общим.
+
+Данные, которые сохраняются в кэш (страницы списков, снимок категорий и
+жанров), читаются из default внутри use_default(): иначе значение из
+отстающей реплики, прочитанное сразу после сброса кэша, осталось бы в
+кэше до следующей записи. Таблица DatabaseCache тоже читается только
+из default: createcachetable создает ее там, а отметки о закреплении и
+версии кэша, прочитанные из реплики, могли бы отставать.
+
+Реплика, к которой не удалось подключиться или которая отстает больше
+чем на REPLICA_MAX_LAG_SECONDS, на REPLICA_HEALTH_CHECK_SECONDS
+считается недоступной, и чтения уходят в default.
+"""
+import contextlib
+import contextvars
+import hashlib
+import logging
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_KEY_PREFIX = 'db:pin:'
+# Так DatabaseCache называет приложение своей модели таблицы кэша.
+CACHE_APP_LABEL = 'django_cache'
+
+read_alias = contextvars.ContextVar('read_alias', default=None)
+
+_health = {}
+_health_lock = threading.Lock()
+
+
+def get_replicas():
+    return getattr(settings, 'REPLICA_DATABASES', ())
+
+
+def check_replica(alias):
+    """
+    Проверяет подключение к реплике и, для PostgreSQL, отставание
+    репликации.
+    """
+    connection = connections[alias]
+    with connection.cursor() as cursor:
+        if connection.vendor != 'postgresql':
+            cursor.execute('SELECT 1')
+            return True
+        cursor.execute(
+            'SELECT EXTRACT(EPOCH FROM now() - '
+            'pg_last_xact_replay_timestamp())'
+        )
+        lag = cursor.fetchone()[0]
+    max_lag = getattr(settings, 'REPLICA_MAX_LAG_SECONDS', 10)
+    return lag is None or lag <= max_lag
+
+
+def is_healthy(alias):
+    """
+    Результат проверки реплики кэшируется в процессе на
+    REPLICA_HEALTH_CHECK_SECONDS.
+    """
+    now = time.monotonic()
+    checked_at, healthy = _health.get(alias, (None, None))
+    ttl = getattr(settings, 'REPLICA_HEALTH_CHECK_SECONDS', 10)
+    if checked_at is not None and now - checked_at < ttl:
+        return healthy
+    with _health_lock:
+        checked_at, healthy = _health.get(alias, (None, None))
+        if checked_at is not None and now - checked_at < ttl:
+            return healthy
+        try:
+            healthy = check_replica(alias)
+        except DatabaseError:
+            logger.warning('Реплика %s недоступна', alias, exc_info=True)
+            healthy = False
+        if not healthy:
+            connections[alias].close()
+        _health[alias] = (time.monotonic(), healthy)
+    return healthy
+
+
+def choose_replica():
+    replicas = [alias for alias in get_replicas() if is_healthy(alias)]
+    if not replicas:
+        return None
+    return random.choice(replicas)
+
+
+def is_read_only(request):
+    if request.method in SAFE_METHODS:
+        return True
+    pattern = getattr(settings, 'REPLICA_READ_ONLY_PATH', None)
+    return (
+        request.method == 'POST' and bool(pattern)
+        and re.match(pattern, request.path_info) is not None
+    )
+
+
+def get_client_key(request):
+    client = (
+        request.META.get('HTTP_AUTHORIZATION')
+        or request.META.get('REMOTE_ADDR', '')
+    )
+    return PIN_KEY_PREFIX + hashlib.sha1(client.encode()).hexdigest()
+
+
+@contextlib.contextmanager
+def use_default():
+    """
+    Чтения внутри блока идут в default.
+    """
+    token = read_alias.set(None)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Выбирает базу для чтений на время запроса.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_replicas():
+            return self.get_response(request)
+        key = get_client_key(request)
+        alias = None
+        if not is_read_only(request):
+            cache.set(
+                key, True, getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+            )
+        elif not cache.get(key):
+            alias = choose_replica()
+        token = read_alias.set(alias)
+        try:
+            return self.get_response(request)
+        finally:
+            read_alias.reset(token)
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        alias = read_alias.get()
+        if (
+            alias is None or model._meta.app_label == CACHE_APP_LABEL
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и default.
+        return True
@@ -0,0 +1,96 @@
+"""
+Микрокэш nginx для анонимных GET-запросов (nginx/default.conf).
+
+nginx несколько секунд хранит ответы списков произведений, жанров,
+категорий, отзывов и комментариев для запросов без Authorization; за
+это время одновременные запросы к одному адресу схлопываются в один
+запрос к приложению.
+
+SurrogateKeyMiddleware помечает такие ответы заголовком Surrogate-Key с
+путем без префикса API (titles/5/reviews), так что CDN или Varnish могут
+сбрасывать кэш по ключу. nginx без сторонних модулей этого не умеет,
+поэтому после записи invalidate() ставит задачу
+titles.tasks.refresh_edge_cache, которая запрашивает затронутые адреса
+через внутренний порт nginx (EDGE_CACHE_REFRESH_URL). Этот порт всегда
+идет в приложение и перезаписывает ответ в кэше. Без
+EDGE_CACHE_REFRESH_URL ответы устаревают не дольше TTL кэша.
+"""
+import re
+import urllib.error
+import urllib.request
+
+from django.conf import settings
+from django.db import transaction
+
+from jobs.registry import enqueue
+
+SAFE_METHODS = ('GET', 'HEAD')
+# Варианты ответа, которые nginx хранит для одного адреса, см.
+# $api_encoding в nginx/default.conf.
+REFRESH_ENCODINGS = ('gzip', '')
+
+
+def get_key(path):
+    """
+    Ключ кэша для пути запроса или None, если путь не кэшируется.
+    """
+    match = re.match(settings.EDGE_CACHE_PATH, path)
+    if match is None:
+        return None
+    return path[len(settings.EDGE_CACHE_PREFIX):].strip('/')
+
+
+def is_enabled():
+    return bool(settings.EDGE_CACHE_REFRESH_URL)
+
+
+def invalidate(*keys):
+    """
+    После коммита ставит в очередь обновление кэша для ключей. Задача
+    для ключа, которая еще ждет выполнения, повторно не ставится.
+    """
+    if not is_enabled():
+        return
+
+    def enqueue_refresh():
+        for key in dict.fromkeys(keys):
+            enqueue(
+                'titles.tasks.refresh_edge_cache', {'key': key},
+                key=f'edge:{key}',
+            )
+
+    transaction.on_commit(enqueue_refresh)
+
+
+def refresh(key):
+    url = (
+        settings.EDGE_CACHE_REFRESH_URL.rstrip('/')
+        + settings.EDGE_CACHE_PREFIX + key + '/'
+    )
+    for encoding in REFRESH_ENCODINGS:
+        headers = {'Accept-Encoding': encoding}
+        if settings.EDGE_CACHE_HOST:
+            # Ссылки next/previous в ответе строятся по Host.
+            headers['Host'] = settings.EDGE_CACHE_HOST
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+        except urllib.error.HTTPError as error:
+            # Например, 404 для удаленного объекта: nginx кэширует только
+            # ответы 200, и старая запись истечет сама.
+            error.close()
+
+
+class SurrogateKeyMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method in SAFE_METHODS and response.status_code == 200:
+            key = get_key(request.path)
+            if key is not None:
+                response['Surrogate-Key'] = key
+        return response
@@ -0,0 +1,187 @@
+import gzip
+import re
+import zlib
+
+from django.conf import settings
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+from django.contrib.sessions import middleware as session
+from django.middleware import clickjacking, csrf
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+re_accept_encoding = re.compile(
+    r'\s*([\w*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*'
+)
+
+
+def accepted_encodings(header):
+    """
+    Разбирает заголовок Accept-Encoding и возвращает множество кодировок,
+    которые клиент принимает (q > 0).
+    """
+    encodings = set()
+    for item in header.split(','):
+        match = re_accept_encoding.fullmatch(item)
+        if not match:
+            continue
+        name, quality = match.groups()
+        try:
+            if quality is not None and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        encodings.add(name.lower())
+    return encodings
+
+
+def gzip_compress_sequence(sequence, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for item in sequence:
+        data = compressor.compress(item)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def brotli_compress_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for item in sequence:
+        data = compressor.process(item)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжимает ответы с типами из COMPRESSION_CONTENT_TYPES размером от
+    COMPRESSION_MIN_LENGTH байт. Если установлен пакет brotli и клиент его
+    принимает, используется brotli, иначе gzip.
+    Потоковые ответы сжимаются по частям. Сильный ETag превращается в
+    слабый, чтобы условные запросы продолжали совпадать по ETag.
+    """
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self.min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', 1024)
+        self.content_types = getattr(
+            settings, 'COMPRESSION_CONTENT_TYPES', ('application/json',)
+        )
+        self.gzip_level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_quality = getattr(
+            settings, 'COMPRESSION_BROTLI_QUALITY', 4
+        )
+
+    def get_encoding(self, request):
+        accepted = accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    def compress(self, encoding, content):
+        if encoding == 'br':
+            return brotli.compress(content, quality=self.brotli_quality)
+        return gzip.compress(content, self.gzip_level, mtime=0)
+
+    def compress_sequence(self, encoding, sequence):
+        if encoding == 'br':
+            return brotli_compress_sequence(sequence, self.brotli_quality)
+        return gzip_compress_sequence(sequence, self.gzip_level)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if content_type.strip().lower() not in self.content_types:
+            return response
+        if not response.streaming and len(response.content) < self.min_length:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.get_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            # Размер сжатого потока заранее неизвестен.
+            response.streaming_content = self.compress_sequence(
+                encoding, response.streaming_content
+            )
+            del response['Content-Length']
+        else:
+            compressed_content = self.compress(encoding, response.content)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+
+class SkipAPIPathsMixin:
+    """
+    Пропускает middleware для запросов к API. API аутентифицирует
+    пользователей только по JWT, поэтому сессии, сообщения, CSRF и
+    X-Frame-Options ему не нужны, а админка и страницы сайта по-прежнему
+    проходят через полный стек. Префиксы путей задаются настройкой
+    API_PATH_PREFIXES.
+    """
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self.skip_prefixes = tuple(
+            getattr(settings, 'API_PATH_PREFIXES', ('/api/',))
+        )
+
+    def skip(self, request):
+        return request.path_info.startswith(self.skip_prefixes)
+
+    def __call__(self, request):
+        if self.skip(request):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SessionMiddleware(SkipAPIPathsMixin, session.SessionMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(SkipAPIPathsMixin, csrf.CsrfViewMiddleware):
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        # process_view вызывается обработчиком Django отдельно от __call__.
+        if self.skip(request):
+            return None
+        return super().process_view(
+            request, callback, callback_args, callback_kwargs
+        )
+
+
+class AuthenticationMiddleware(
+    SkipAPIPathsMixin, auth.AuthenticationMiddleware
+):
+    pass
+
+
+class MessageMiddleware(SkipAPIPathsMixin, messages.MessageMiddleware):
+    pass
+
+
+class XFrameOptionsMiddleware(
+    SkipAPIPathsMixin, clickjacking.XFrameOptionsMiddleware
+):
+    pass
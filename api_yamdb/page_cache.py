@@ -0,0 +1,233 @@
+"""
+Кэш страниц списков API в кэше Django и его прогрев.
+
+CachedListMixin сохраняет данные ответа list() (до рендеринга) на
+PAGE_CACHE_TTL секунд. Ключ строится из адреса с отсортированными
+параметрами и версии группы: 'titles' для списков произведений и
+'titles/{id}/reviews' для отзывов произведения. titles.signals меняют
+версию группы при записи сразу и еще раз после коммита, как и версию
+кэша категорий и жанров, поэтому старые страницы просто перестают
+читаться. Ответ не зависит от пользователя, так что кэш общий для всех.
+
+Промах защищен блокировкой в кэше (cache.add): страницу считает один
+запрос, остальные до PAGE_CACHE_LOCK_WAIT секунд ждут, пока она
+появится в кэше, и только потом идут в базу сами.
+
+warm() заранее отрисовывает страницы в пуле потоков, например после
+деплоя или сброса кэша (команда warm_cache). Кэш должен быть общим для
+процессов (memcached, redis, таблица БД): с LocMemCache прогрев из
+отдельного процесса не виден gunicorn, поэтому с ним кэш страниц по
+умолчанию выключен (PAGE_CACHE_TTL=0).
+"""
+import hashlib
+import re
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve
+
+from api_yamdb import db_router
+from rest_framework.response import Response
+
+API_PREFIX = '/api/v1/'
+KEY_PREFIX = 'page:'
+VERSION_PREFIX = 'page:version:'
+LOCK_PREFIX = 'page:lock:'
+POLL_INTERVAL = 0.05
+ACCESS_LOG_RE = re.compile(r'"GET (?P<path>\S+) HTTP/[\d.]+" 200 ')
+
+
+def is_enabled():
+    return settings.PAGE_CACHE_TTL > 0
+
+
+def get_version(group):
+    key = VERSION_PREFIX + group
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate(*groups):
+    """
+    Меняет версии групп сразу и еще раз после коммита: запрос, который
+    успел прочитать старые данные до коммита, не сохранит их под новой
+    версией.
+    """
+    if not is_enabled():
+        return
+
+    def bump():
+        cache.set_many(
+            {VERSION_PREFIX + group: uuid.uuid4().hex for group in groups},
+            None,
+        )
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_key(request, group):
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    digest = hashlib.md5(url.encode()).hexdigest()
+    return f'{KEY_PREFIX}{group}:{get_version(group)}:{digest}'
+
+
+def get_or_set(key, compute, refresh=False):
+    """
+    Значение из кэша или результат compute(), который сохраняется в кэш.
+    Одновременно compute() для ключа выполняет только один вызов.
+    refresh пересчитывает значение, даже если оно уже есть.
+    """
+    if not refresh:
+        value = cache.get(key)
+        if value is not None:
+            return value
+    lock = LOCK_PREFIX + key
+    deadline = time.monotonic() + settings.PAGE_CACHE_LOCK_WAIT
+    while not cache.add(lock, True, settings.PAGE_CACHE_LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            return compute()
+        time.sleep(POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+    try:
+        if not refresh:
+            # Значение могли сохранить, пока блокировка была занята.
+            value = cache.get(key)
+            if value is not None:
+                return value
+        # Страница, прочитанная из отстающей реплики, вернула бы в кэш
+        # данные до только что сбросившей его записи.
+        with db_router.use_default():
+            value = compute()
+        cache.set(key, value, settings.PAGE_CACHE_TTL)
+        return value
+    finally:
+        cache.delete(lock)
+
+
+class CachedListMixin:
+    """
+    Отдает list() из кэша страниц. Группа ключа - page_cache_group,
+    в которую подставляются параметры адреса, например
+    'titles/{title_id}/reviews'. Атрибут обязателен.
+    """
+
+    def get_page_cache_group(self):
+        return self.page_cache_group.format(**self.kwargs)
+
+    def list(self, request, *args, **kwargs):
+        if not is_enabled():
+            return super().list(request, *args, **kwargs)
+
+        def compute():
+            return super(CachedListMixin, self).list(
+                request, *args, **kwargs
+            ).data
+
+        key = get_key(request, self.get_page_cache_group())
+        refresh = getattr(request, 'page_cache_refresh', False)
+        return Response(get_or_set(key, compute, refresh))
+
+
+def is_cacheable(path):
+    try:
+        match = resolve(path.split('?', 1)[0])
+    except Resolver404:
+        return False
+    view = getattr(match.func, 'cls', None)
+    actions = getattr(match.func, 'actions', None) or {}
+    return (
+        view is not None and issubclass(view, CachedListMixin)
+        and actions.get('get') == 'list'
+    )
+
+
+def default_paths(top):
+    """
+    Список произведений, его фильтры по каждому жанру и категории и
+    отзывы top самых обсуждаемых произведений.
+    """
+    from titles.models import Title
+    from titles.taxonomy import get_taxonomy
+
+    taxonomy = get_taxonomy()
+    titles = f'{API_PREFIX}titles/'
+    paths = [titles]
+    paths += [
+        f'{titles}?{urlencode({"genre": slug})}'
+        for slug in sorted(taxonomy.genres_by_slug)
+    ]
+    paths += [
+        f'{titles}?{urlencode({"category": slug})}'
+        for slug in sorted(taxonomy.categories_by_slug)
+    ]
+    popular = Title.objects.order_by('-review_count', '-id')
+    paths += [
+        f'{titles}{pk}/reviews/'
+        for pk in popular.values_list('id', flat=True)[:top]
+    ]
+    return paths
+
+
+def access_log_paths(files, top):
+    """
+    top самых частых кэшируемых адресов из access-логов nginx.
+    """
+    hits = Counter()
+    for name in files:
+        with open(name, encoding='utf-8', errors='replace') as log:
+            for line in log:
+                match = ACCESS_LOG_RE.search(line)
+                if match is not None:
+                    hits[match['path']] += 1
+    paths = []
+    for path, _ in hits.most_common():
+        if len(paths) >= top:
+            break
+        if is_cacheable(path):
+            paths.append(path)
+    return paths
+
+
+def render(path, host, refresh=True):
+    """
+    Выполняет анонимный GET-запрос к вьюсету без middleware и
+    возвращает код ответа.
+    """
+    request = RequestFactory().get(path, HTTP_HOST=host)
+    request.page_cache_refresh = refresh
+    match = resolve(request.path_info)
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+        return response.status_code
+    finally:
+        # Соединения потока пула больше не понадобятся.
+        connections.close_all()
+
+
+def warm(paths, host, workers=4, refresh=True):
+    """
+    Отрисовывает кэшируемые страницы paths в workers потоках и
+    возвращает [(путь, код ответа, время в секундах)].
+    """
+    def warm_path(path):
+        started = time.perf_counter()
+        status = render(path, host, refresh)
+        return path, status, time.perf_counter() - started
+
+    paths = [path for path in dict.fromkeys(paths) if is_cacheable(path)]
+    with ThreadPoolExecutor(workers) as pool:
+        return list(pool.map(warm_path, paths))
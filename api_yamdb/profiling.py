@@ -0,0 +1,149 @@
+"""
+Профилирование отдельного запроса по требованию администратора.
+
+Запрос с заголовком X-Profile: 1 или параметром ?profile=1 от
+администратора (IsAdmin, те же способы аутентификации, что и в API)
+выполняется под cProfile, а все SQL-запросы записываются с временем
+выполнения. Отчет хранится в кэше PROFILING_TTL секунд, его id
+возвращается в заголовке X-Profile-Id, краткая сводка пишется в лог.
+Отчет отдает /api/v1/profiles/{id}/, файл для pstats или snakeviz -
+/api/v1/profiles/{id}/prof/.
+
+Профилирование запускается не чаще раза в PROFILING_INTERVAL секунд на
+весь сайт (блокировка в кэше), остальные запросы с флагом выполняются
+как обычно и получают заголовок X-Profile: rate-limited. Запросы без
+флага middleware только проверяет на наличие заголовка и параметра.
+"""
+import io
+import logging
+import marshal
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from titles.permissions import IsAdmin
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'HTTP_X_PROFILE'
+PARAM = 'profile'
+KEY_PREFIX = 'profile:'
+LOCK_KEY = 'profile:lock'
+
+
+def is_requested(request):
+    if request.META.get(HEADER) == '1':
+        return True
+    return (
+        PARAM in request.META.get('QUERY_STRING', '')
+        and request.GET.get(PARAM) == '1'
+    )
+
+
+def is_admin(request):
+    drf_request = Request(request, authenticators=[
+        authenticator()
+        for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    ])
+    try:
+        return IsAdmin().has_permission(drf_request, None)
+    except APIException:
+        return False
+
+
+def get_profile(profile_id):
+    return cache.get(KEY_PREFIX + profile_id)
+
+
+class QueryLog:
+    """
+    Обертка execute_wrapper, которая записывает SQL и время выполнения.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'db': self.alias,
+                'sql': sql,
+                'time_ms': round((time.perf_counter() - started) * 1000, 3),
+                'many': many,
+            })
+
+
+class ProfilingMiddleware:
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_requested(request) or not is_admin(request):
+            return self.get_response(request)
+        if not cache.add(LOCK_KEY, True, settings.PROFILING_INTERVAL):
+            response = self.get_response(request)
+            response['X-Profile'] = 'rate-limited'
+            return response
+        return self.profile(request)
+
+    def profile(self, request):
+        # Профилировщик нужен редко и не загружается при старте процесса.
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        logs = [QueryLog(alias) for alias in connections]
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for log in logs:
+                stack.enter_context(
+                    connections[log.alias].execute_wrapper(log)
+                )
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+        elapsed = (time.perf_counter() - started) * 1000
+
+        queries = [query for log in logs for query in log.queries]
+        sql_ms = sum(query['time_ms'] for query in queries)
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats('cumulative').print_stats(settings.PROFILING_TOP)
+        profile_id = uuid.uuid4().hex
+        report = {
+            'id': profile_id,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(elapsed, 3),
+            'sql_count': len(queries),
+            'sql_ms': round(sql_ms, 3),
+            'sql': queries[:settings.PROFILING_MAX_QUERIES],
+            'profile': stream.getvalue(),
+        }
+        cache.set(
+            KEY_PREFIX + profile_id,
+            {'report': report, 'prof': marshal.dumps(stats.stats)},
+            settings.PROFILING_TTL,
+        )
+        logger.info(
+            'Профиль %s: %s %s -> %s, %.1f мс, SQL: %d за %.1f мс',
+            profile_id, request.method, report['path'],
+            response.status_code, elapsed, len(queries), sql_ms,
+        )
+        response['X-Profile-Id'] = profile_id
+        return response
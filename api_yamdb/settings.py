@@ -15,6 +15,11 @@ DEBUG = False
 
 ALLOWED_HOSTS = ['*']
 
+# API_ONLY=1 - режим для процессов, которые обслуживают только API: без
+# админки, сессий и сообщений. Эти модули не импортируются при старте, а их
+# middleware не выполняются на каждом запросе.
+API_ONLY = os.environ.get('API_ONLY', '').lower() in ('1', 'true', 'yes')
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -30,20 +35,48 @@ INSTALLED_APPS = [
     # project apps
     'users.apps.UsersConfig',
     'titles',
+    'jobs.apps.JobsConfig',
 ]
 
 AUTH_USER_MODEL = 'users.CustomUser'
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'api_yamdb.profiling.ProfilingMiddleware',
+    'api_yamdb.edge_cache.SurrogateKeyMiddleware',
+    'api_yamdb.middleware.CompressionMiddleware',
+    'api_yamdb.db_router.ReplicaRoutingMiddleware',
+    'api_yamdb.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api_yamdb.middleware.CsrfViewMiddleware',
+    'api_yamdb.middleware.AuthenticationMiddleware',
+    'api_yamdb.middleware.MessageMiddleware',
+    'api_yamdb.middleware.XFrameOptionsMiddleware',
 ]
 
+# Запросы с этими префиксами обходят сессии, сообщения, CSRF и
+# X-Frame-Options (см. api_yamdb.middleware.SkipAPIPathsMixin).
+API_PATH_PREFIXES = ('/api/',)
+
+if API_ONLY:
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS
+        if app not in (
+            'django.contrib.admin',
+            'django.contrib.sessions',
+            'django.contrib.messages',
+        )
+    ]
+    MIDDLEWARE = [
+        middleware for middleware in MIDDLEWARE
+        if middleware not in (
+            'api_yamdb.middleware.SessionMiddleware',
+            'api_yamdb.middleware.CsrfViewMiddleware',
+            'api_yamdb.middleware.AuthenticationMiddleware',
+            'api_yamdb.middleware.MessageMiddleware',
+        )
+    ]
+
 ROOT_URLCONF = 'api_yamdb.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, "templates")
@@ -63,6 +96,11 @@ TEMPLATES = [
     },
 ]
 
+if API_ONLY:
+    TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+        'django.contrib.messages.context_processors.messages'
+    )
+
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
@@ -79,6 +117,56 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения: DB_REPLICA_HOSTS=host1,host2:5433. Остальные
+# параметры подключения берутся из default.
+REPLICA_DATABASES = []
+for number, replica in enumerate(
+    filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1
+):
+    host, _, port = replica.strip().partition(':')
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['api_yamdb.db_router.ReplicaRouter']
+# Сколько секунд после записи клиент читает из default.
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 5))
+REPLICA_MAX_LAG_SECONDS = int(os.environ.get('REPLICA_MAX_LAG_SECONDS', 10))
+REPLICA_HEALTH_CHECK_SECONDS = 10
+# POST-запросы только на чтение (батч произведений): клиент за default не
+# закрепляется, а сами запросы читают из реплики.
+REPLICA_READ_ONLY_PATH = r'^/api/v1/titles/batch/$'
+
+# Секционирование отзывов и комментариев по месяцам (titles.partitions,
+# только PostgreSQL): применяется миграцией titles 0013 при
+# PARTITION_REVIEWS=1, секции создает и архивирует команда
+# manage_partitions.
+PARTITION_REVIEWS = (
+    os.environ.get('PARTITION_REVIEWS', '').lower() in ('1', 'true', 'yes')
+)
+PARTITION_MONTHS_AHEAD = 3
+PARTITION_ARCHIVE_TABLESPACE = os.environ.get('PARTITION_ARCHIVE_TABLESPACE')
+
+# Cache
+# Кэш должен быть общим для всех процессов gunicorn (memcached, таблица БД
+# и т.п.), иначе версия кэша категорий и жанров не будет согласована. По
+# умолчанию это таблица django_cache (python manage.py createcachetable);
+# с LocMemCache gunicorn.conf.py не запускает больше одного процесса.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'django_cache'),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -122,10 +210,82 @@ REST_FRAMEWORK = {
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ],
 
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',  # noqa: E501
     'PAGE_SIZE': 100
 }
 
+if API_ONLY:
+    # Browsable API рассчитан на вход через сессию и в этом режиме не нужен.
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].remove(
+        'rest_framework.renderers.BrowsableAPIRenderer'
+    )
+
+# Background jobs (jobs.worker): задержка повтора упавшей задачи
+# JOBS_RETRY_BACKOFF * 2 ** (попытка - 1) секунд, но не больше максимума.
+
+JOBS_RETRY_BACKOFF = 10
+JOBS_RETRY_BACKOFF_MAX = 3600
+
+# Через сколько дней воркер удаляет завершенные и упавшие задачи.
+# 0 - хранить всегда.
+JOBS_RETENTION_DAYS = int(os.environ.get('JOBS_RETENTION_DAYS', 7))
+
+# Edge micro-cache (nginx/default.conf, api_yamdb.edge_cache): внутренний
+# адрес nginx, через который после записи обновляются закэшированные
+# ответы, например http://nginx:8080. Пусто - не обновлять.
+# EDGE_CACHE_HOST - публичное имя сайта для заголовка Host этих запросов.
+
+EDGE_CACHE_REFRESH_URL = os.environ.get('EDGE_CACHE_REFRESH_URL', '')
+EDGE_CACHE_HOST = os.environ.get('EDGE_CACHE_HOST', '')
+EDGE_CACHE_PREFIX = '/api/v1/'
+EDGE_CACHE_PATH = r'^/api/v1/(titles|genres|categories)/'
+
+# Page cache (api_yamdb.page_cache): страницы списков произведений и
+# отзывов хранятся в кэше PAGE_CACHE_TTL секунд, 0 - не кэшировать. Промах
+# считает один запрос, остальные ждут его до PAGE_CACHE_LOCK_WAIT секунд.
+# PAGE_CACHE_WARM_PATHS - адреса, которые warm_cache прогревает всегда.
+# С LocMemCache кэш у каждого процесса свой и запись в одном не сбросила
+# бы страницы в других, поэтому по умолчанию он выключен.
+
+PAGE_CACHE_TTL = int(os.environ.get(
+    'PAGE_CACHE_TTL',
+    0 if CACHES['default']['BACKEND'].endswith('.LocMemCache') else 300,
+))
+PAGE_CACHE_LOCK_TIMEOUT = 30
+PAGE_CACHE_LOCK_WAIT = 5
+PAGE_CACHE_WARM_PATHS = [
+    path for path in os.environ.get('PAGE_CACHE_WARM_PATHS', '').split(',')
+    if path
+]
+
+# Per-request profiling (api_yamdb.profiling): не чаще раза в
+# PROFILING_INTERVAL секунд, отчет хранится в кэше PROFILING_TTL секунд.
+
+PROFILING_INTERVAL = 10
+PROFILING_TTL = 3600
+PROFILING_TOP = 50
+PROFILING_MAX_QUERIES = 500
+
+# Response compression (api_yamdb.middleware.CompressionMiddleware)
+
+COMPRESSION_MIN_LENGTH = int(os.environ.get('COMPRESSION_MIN_LENGTH', 1024))
+COMPRESSION_CONTENT_TYPES = ('application/json',)
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(
+    os.environ.get('COMPRESSION_BROTLI_QUALITY', 4)
+)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=24),
 
@@ -141,7 +301,7 @@ LOGGING = {
     },
     'root': {
         'handlers': ['console'],
-        'level': 'DEBUG',
+        'level': os.environ.get('LOG_LEVEL', 'INFO'),
     },
 }
 
@@ -1,9 +1,8 @@
-from django.contrib import admin
+from django.apps import apps
 from django.urls import include, path
 from django.views.generic import TemplateView
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
     path(
         'redoc/',
@@ -16,3 +15,9 @@ urlpatterns = [
         name='index'
     ),
 ]
+
+# В режиме API_ONLY админка не установлена и не импортируется.
+if apps.is_installed('django.contrib.admin'):
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
@@ -0,0 +1,53 @@
+"""
+Размер ответа и затраты CPU на сжатие для разных настроек
+CompressionMiddleware на страницах списков произведений и отзывов.
+
+    python -m benchmarks.compression
+"""
+import gzip
+
+from benchmarks.utils import seed, setup_django, timeit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def main():
+    setup_django()
+    seed(titles=100, reviews_per_title=100)
+
+    from rest_framework.test import APIClient
+    from titles.models import Title
+
+    title = Title.objects.first()
+    client = APIClient()
+    payloads = (
+        ('titles', client.get('/api/v1/titles/').content),
+        ('reviews', client.get(f'/api/v1/titles/{title.id}/reviews/').content),
+    )
+    codecs = [
+        (f'gzip-{level}', lambda data, level=level: gzip.compress(
+            data, level, mtime=0))
+        for level in (1, 6, 9)
+    ]
+    if brotli is not None:
+        codecs += [
+            (f'br-{quality}', lambda data, quality=quality: brotli.compress(
+                data, quality=quality))
+            for quality in (1, 4, 11)
+        ]
+    print(f'{"page":<10}{"codec":<10}{"bytes":>10}{"ratio":>8}{"ms":>8}'
+          f'{"MB/s":>8}')
+    for name, data in payloads:
+        print(f'{name:<10}{"identity":<10}{len(data):>10}')
+        for codec, compress in codecs:
+            size = len(compress(data))
+            seconds = timeit(lambda: compress(data), repeat=50)
+            print(f'{"":<10}{codec:<10}{size:>10}{len(data) / size:>8.1f}'
+                  f'{seconds * 1e3:>8.2f}{len(data) / seconds / 1e6:>8.0f}')
+
+
+if __name__ == '__main__':
+    main()
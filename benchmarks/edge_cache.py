@@ -0,0 +1,73 @@
+"""
+Нагрузочный тест микрокэша nginx: сколько запросов пачки доходит до
+приложения.
+
+    docker-compose up -d
+    python -m benchmarks.edge_cache --url http://localhost/api/v1/titles/
+
+Пачка из --requests одновременных GET-запросов (--concurrency потоков)
+отправляется сначала анонимно, затем с заголовком Authorization, который
+отключает кэш. Для каждого ответа берется X-Cache-Status из nginx: MISS,
+EXPIRED и BYPASS - запросы, дошедшие до приложения, HIT и UPDATING -
+отданные из кэша, STALE - старый ответ при ошибке приложения.
+"""
+import argparse
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+ORIGIN_STATUSES = ('MISS', 'EXPIRED', 'BYPASS')
+
+
+def fetch(url, headers):
+    request = urllib.request.Request(url, headers=headers)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            response.read()
+            return response.headers.get('X-Cache-Status', '-')
+    except urllib.error.HTTPError as error:
+        error.close()
+        return f'HTTP {error.code}'
+
+
+def burst(url, requests, concurrency, headers):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        statuses = Counter(pool.map(
+            lambda _: fetch(url, headers), range(requests)
+        ))
+    return statuses, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        '--url', default='http://localhost/api/v1/titles/'
+    )
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument(
+        '--token', default='benchmark',
+        help='Значение Bearer для запросов мимо кэша.',
+    )
+    args = parser.parse_args()
+
+    for name, headers in (
+        ('anonymous', {}),
+        ('authorized', {'Authorization': f'Bearer {args.token}'}),
+    ):
+        statuses, elapsed = burst(
+            args.url, args.requests, args.concurrency, headers
+        )
+        origin = sum(statuses[status] for status in ORIGIN_STATUSES)
+        print(f'{name}: {args.requests} запросов за {elapsed:.2f} с, '
+              f'до приложения дошло {origin}')
+        print('    ' + ', '.join(
+            f'{status}: {count}' for status, count in sorted(statuses.items())
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""
+Пропускная способность и задержки API при разных настройках gunicorn
+из gunicorn.conf.py.
+
+    python -m benchmarks.gunicorn_modes --duration 10 --concurrency 32
+
+Для каждого режима запускается gunicorn на заполненной базе SQLite и
+нагружается из потоков клиента с keep-alive соединениями. Клиент
+работает в одном процессе Python, поэтому при большом числе процессов
+gunicorn упирается в него; для точных цифр используйте wrk или ab.
+"""
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.utils import seed, setup_django
+
+MODES = [
+    ('sync', {'GUNICORN_WORKER_CLASS': 'sync'}),
+    ('sync+preload', {
+        'GUNICORN_WORKER_CLASS': 'sync', 'GUNICORN_PRELOAD': '1',
+    }),
+    ('gthread-4', {
+        'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_THREADS': '4',
+    }),
+    ('gthread-8', {
+        'GUNICORN_WORKER_CLASS': 'gthread', 'GUNICORN_THREADS': '8',
+    }),
+]
+try:
+    import gevent  # noqa: F401
+except ImportError:
+    pass
+else:
+    MODES.append(('gevent', {'GUNICORN_WORKER_CLASS': 'gevent'}))
+
+
+def wait_ready(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            connection.request('GET', '/api/v1/categories/')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('gunicorn не запустился')
+
+
+def load(port, urls, duration, concurrency):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(offset):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        local, failed, i = [], 0, offset
+        while time.monotonic() < deadline:
+            url = urls[i % len(urls)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                connection.request('GET', url)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port)
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+
+    threads = [
+        threading.Thread(target=client, args=(i,))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors)
+
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    db = tempfile.NamedTemporaryFile(suffix='.sqlite3', delete=False)
+    os.environ['BENCHMARK_DB'] = db.name
+    cache_dir = tempfile.TemporaryDirectory()
+    os.environ['BENCHMARK_CACHE_DIR'] = cache_dir.name
+    setup_django()
+    seed(titles=500, reviews_per_title=50)
+
+    from titles.models import Title
+
+    title_ids = list(Title.objects.values_list('id', flat=True)[:20])
+    urls = ['/api/v1/titles/', '/api/v1/titles/?genre=genre-1',
+            '/api/v1/genres/']
+    urls += [f'/api/v1/titles/{pk}/' for pk in title_ids]
+    urls += [f'/api/v1/titles/{pk}/reviews/' for pk in title_ids]
+
+    print(f'{"mode":<14}{"rps":>8}{"p50, ms":>10}{"p95, ms":>10}'
+          f'{"p99, ms":>10}{"errors":>8}')
+    try:
+        for name, mode_env in MODES:
+            env = {
+                **os.environ,
+                **mode_env,
+                'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+                'GUNICORN_BIND': f'127.0.0.1:{args.port}',
+                'GUNICORN_WORKERS': str(args.workers),
+            }
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn',
+                 'api_yamdb.wsgi:application', '-c', 'gunicorn.conf.py'],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                wait_ready(args.port)
+                latencies, errors = load(
+                    args.port, urls, args.duration, args.concurrency
+                )
+            finally:
+                server.terminate()
+                server.wait()
+            print(f'{name:<14}{len(latencies) / args.duration:>8.0f}'
+                  f'{percentile(latencies, 50):>10.1f}'
+                  f'{percentile(latencies, 95):>10.1f}'
+                  f'{percentile(latencies, 99):>10.1f}{errors:>8}')
+    finally:
+        os.unlink(db.name)
+        cache_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
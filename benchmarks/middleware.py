@@ -0,0 +1,62 @@
+"""
+Накладные расходы стека middleware на запрос к API.
+
+    python -m benchmarks.middleware
+
+Один и тот же GET-запрос выполняется через тестовый клиент Django с
+тремя списками MIDDLEWARE: стандартным стеком Django, текущим MIDDLEWARE
+из настроек (сессии, сообщения, CSRF и X-Frame-Options пропускаются для
+API_PATH_PREFIXES) и пустым списком. Разница с пустым списком -
+стоимость middleware на запрос. Сначала запрос идет к пустому
+представлению из benchmarks.urls, чтобы время view не скрывало
+разницу, затем к /api/v1/genres/ с JWT-токеном.
+"""
+from benchmarks.utils import seed, setup_django, timeit
+
+DJANGO_STACK = [
+    'django.middleware.security.SecurityMiddleware',
+    'api_yamdb.middleware.CompressionMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+def main():
+    setup_django()
+    seed(titles=10, reviews_per_title=1)
+
+    from django.conf import settings
+    from django.test import Client, override_settings
+
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from users.models import CustomUser
+
+    token = RefreshToken.for_user(CustomUser.objects.first()).access_token
+    stacks = (
+        ('django', DJANGO_STACK),
+        ('api profile', settings.MIDDLEWARE),
+        ('empty', []),
+    )
+    for url in ('/api/v1/empty/', '/api/v1/genres/'):
+        print(url)
+        print(f'{"stack":<14}{"request, us":>14}{"overhead, us":>14}')
+        results = []
+        for name, middleware in stacks:
+            with override_settings(
+                MIDDLEWARE=middleware, ROOT_URLCONF='benchmarks.urls'
+            ):
+                client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+                results.append(
+                    (name, timeit(lambda: client.get(url), repeat=2000) * 1e6)
+                )
+        baseline = results[-1][1]
+        for name, elapsed in results:
+            print(f'{name:<14}{elapsed:>14.1f}{elapsed - baseline:>14.1f}')
+
+
+if __name__ == '__main__':
+    main()
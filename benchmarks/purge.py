@@ -0,0 +1,97 @@
+"""
+Удаление произведения с большим числом отзывов: обычный delete()
+против soft_delete() и пачечного удаления titles.purge.
+
+    python -m benchmarks.purge --reviews 100000
+
+Заполняются два произведения с одинаковым числом отзывов и одним
+комментарием на отзыв. Первое удаляется через delete(), которое
+загружает все отзывы и комментарии и отправляет по ним сигналы, второе
+- через soft_delete() (время ответа API) и purge_title (фоновая задача).
+Память - пик выделений Python по tracemalloc.
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks.utils import setup_django
+
+
+def fill(reviews, comments=1):
+    from django.db import connection
+    from django.utils import timezone
+
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO titles_title (id, name, review_count, score_sum, '
+            'is_deleted) VALUES (%s, %s, %s, %s, 0)',
+            [(i, f'Произведение {i}', reviews, reviews * 5) for i in (1, 2)],
+        )
+        cursor.executemany(
+            'INSERT INTO users_customuser (id, password, is_superuser, '
+            'username, first_name, last_name, email, is_staff, is_active, '
+            "date_joined, role, bio, is_deleted) VALUES (%s, '', 0, %s, '', "
+            "'', '', 0, 1, %s, 'user', '', 0)",
+            [(i, f'user{i}', now) for i in range(1, reviews + 1)],
+        )
+        cursor.executemany(
+            'INSERT INTO titles_review (id, author_id, title_id, text, '
+            "score, pub_date, comment_count) VALUES (%s, %s, %s, 'Отзыв', "
+            '5, %s, %s)',
+            [
+                ((title - 1) * reviews + author, author, title, now, comments)
+                for title in (1, 2)
+                for author in range(1, reviews + 1)
+            ],
+        )
+        cursor.executemany(
+            'INSERT INTO titles_comment (review_id, author_id, text, '
+            "pub_date) VALUES (%s, %s, 'Комментарий', %s)",
+            [
+                (review, review % reviews + 1, now)
+                for review in range(1, 2 * reviews + 1)
+                for _ in range(comments)
+            ],
+        )
+
+
+def measure(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--reviews', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    fill(args.reviews)
+
+    from titles.models import Title
+    from titles.purge import purge_title, soft_delete
+
+    results = (
+        ('delete()', measure(lambda: Title.objects.get(pk=1).delete())),
+        ('soft_delete()', measure(
+            lambda: soft_delete(Title.objects.get(pk=2))
+        )),
+        ('purge_title', measure(
+            lambda: purge_title(2, batch_size=args.batch_size)
+        )),
+    )
+    print(f'отзывов у произведения: {args.reviews}')
+    print(f'{"способ":<16}{"время, с":>10}{"память, МБ":>12}')
+    for name, (elapsed, peak) in results:
+        print(f'{name:<16}{elapsed:>10.2f}{peak:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Сравнение стандартного JSONRenderer из DRF и FastJSONRenderer на ответах
+списочных эндпоинтов.
+
+    python -m benchmarks.renderers
+"""
+from benchmarks.utils import seed, setup_django, timeit
+
+
+def main():
+    setup_django()
+    seed(titles=100, reviews_per_title=100)
+
+    from api.renderers import FastJSONRenderer
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+    from titles.models import Review, Title
+
+    title = Title.objects.first()
+    review = Review.objects.filter(title=title).first()
+    endpoints = (
+        ('titles', '/api/v1/titles/'),
+        ('reviews', f'/api/v1/titles/{title.id}/reviews/'),
+        ('comments',
+         f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'),
+        ('categories', '/api/v1/categories/'),
+    )
+    client = APIClient()
+    stdlib, fast = JSONRenderer(), FastJSONRenderer()
+    print(f'{"endpoint":<12}{"bytes":>10}{"json, us":>12}{"orjson, us":>12}'
+          f'{"speedup":>10}')
+    for name, url in endpoints:
+        data = client.get(url).data
+        expected = stdlib.render(data)
+        assert fast.render(data) == expected, f'{name}: вывод отличается'
+        stdlib_time = timeit(lambda: stdlib.render(data), repeat=200) * 1e6
+        fast_time = timeit(lambda: fast.render(data), repeat=200) * 1e6
+        print(f'{name:<12}{len(expected):>10}{stdlib_time:>12.1f}'
+              f'{fast_time:>12.1f}{stdlib_time / fast_time:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Сравнение обычных сериализаторов DRF и быстрых сериализаторов из
+api.fast_serializers на странице из 100 объектов.
+
+    python -m benchmarks.serializers
+"""
+from benchmarks.utils import seed, setup_django, timeit
+
+PAGE_SIZE = 100
+
+
+def main():
+    setup_django()
+    seed(titles=PAGE_SIZE, reviews_per_title=PAGE_SIZE // 10)
+
+    from django.db.models import Prefetch
+
+    from api.fast_serializers import (
+        CommentFastSerializer,
+        ReviewFastSerializer,
+        TitleListFastSerializer
+    )
+    from api.serializers import (
+        CommentSerializer,
+        ReviewSerializer,
+        TitleListSerializer
+    )
+    from titles.models import Comment, Genre, Review, Title
+
+    cases = (
+        (
+            'titles',
+            Title.objects.select_related('category').prefetch_related(
+                Prefetch('genre', queryset=Genre.objects.order_by('id'))
+            ),
+            TitleListSerializer,
+            TitleListFastSerializer,
+        ),
+        (
+            'reviews',
+            Review.objects.select_related('author').order_by('id'),
+            ReviewSerializer,
+            ReviewFastSerializer,
+        ),
+        (
+            'comments',
+            Comment.objects.select_related('author').order_by('id'),
+            CommentSerializer,
+            CommentFastSerializer,
+        ),
+    )
+    print(f'{"endpoint":<10}{"drf, us/row":>14}{"fast, us/row":>14}'
+          f'{"speedup":>10}')
+    for name, queryset, serializer_class, fast_class in cases:
+        page = queryset[:PAGE_SIZE]
+
+        def drf():
+            return serializer_class(page.all(), many=True).data
+
+        def fast():
+            serializer = fast_class()
+            return serializer.serialize(serializer.prepare(page.all()))
+
+        drf_time = timeit(drf) / PAGE_SIZE * 1e6
+        fast_time = timeit(fast) / PAGE_SIZE * 1e6
+        print(f'{name:<10}{drf_time:>14.1f}{fast_time:>14.1f}'
+              f'{drf_time / fast_time:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+from tests.settings_qa import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('BENCHMARK_DB', ':memory:'),  # noqa: F405
+    }
+}
+
+# Несколько процессов gunicorn в benchmarks.gunicorn_modes делят кэш через
+# файлы: с LocMemCache gunicorn.conf.py их не запустит.
+if os.environ.get('BENCHMARK_CACHE_DIR'):  # noqa: F405
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['BENCHMARK_CACHE_DIR'],  # noqa: F405
+        }
+    }
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'root': {
+        'level': 'WARNING',
+    },
+}
@@ -0,0 +1,100 @@
+"""
+Время и память команды build_similar_titles на синтетических данных.
+
+    python -m benchmarks.similar --titles 20000 --users 20000 --reviews 500000
+
+Пользователи выбирают произведения по закону Ципфа: немного популярных
+произведений и длинный хвост, как в реальных отзывах. Строки вставляются
+через executemany, минуя модели. Пиковая память (ru_maxrss) считается для
+всего процесса, включая загруженные данные.
+"""
+import argparse
+import random
+import resource
+import time
+from itertools import accumulate
+
+from benchmarks.utils import setup_django
+
+
+def fill(titles, users, reviews, genres=20):
+    from django.db import connection
+    from django.utils import timezone
+
+    rnd = random.Random(0)
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO titles_genre (id, name, slug) VALUES (%s, %s, %s)',
+            [(i, f'Жанр {i}', f'genre-{i}') for i in range(1, genres + 1)],
+        )
+        cursor.executemany(
+            'INSERT INTO titles_title (id, name, review_count, score_sum) '
+            'VALUES (%s, %s, 0, 0)',
+            [(i, f'Произведение {i}') for i in range(1, titles + 1)],
+        )
+        cursor.executemany(
+            'INSERT INTO titles_title_genre (title_id, genre_id) '
+            'VALUES (%s, %s)',
+            [
+                (title, genre)
+                for title in range(1, titles + 1)
+                for genre in rnd.sample(range(1, genres + 1), 2)
+            ],
+        )
+        cursor.executemany(
+            'INSERT INTO users_customuser (id, password, is_superuser, '
+            'username, first_name, last_name, email, is_staff, is_active, '
+            "date_joined, role, bio) VALUES (%s, '', 0, %s, '', '', '', 0, "
+            "1, %s, 'user', '')",
+            [(i, f'user{i}', now) for i in range(1, users + 1)],
+        )
+        weights = list(accumulate(1 / rank for rank in range(1, titles + 1)))
+        pairs = set()
+        while len(pairs) < reviews:
+            author = rnd.randint(1, users)
+            for title in rnd.choices(
+                range(1, titles + 1), cum_weights=weights, k=20
+            ):
+                pairs.add((author, title))
+        cursor.executemany(
+            'INSERT INTO titles_review (author_id, title_id, text, score, '
+            "pub_date) VALUES (%s, %s, '', 5, %s)",
+            [(author, title, now) for author, title in pairs],
+        )
+        cursor.execute(
+            'UPDATE titles_title SET review_count = (SELECT COUNT(*) FROM '
+            'titles_review WHERE title_id = titles_title.id)'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--titles', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--reviews', type=int, default=200000)
+    parser.add_argument('--backend', default='auto')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django()
+    fill(args.titles, args.users, args.reviews)
+
+    from titles.models import SimilarTitle
+    from titles.similarity import get_builder
+
+    memory_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    started = time.perf_counter()
+    get_builder(args.backend).build(chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - started
+    memory_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f'backend: {args.backend}, titles: {args.titles}, '
+          f'reviews: {args.reviews}')
+    print(f'время: {elapsed:.1f} с, строк SimilarTitle: '
+          f'{SimilarTitle.objects.count()}')
+    growth = (memory_after - memory_before) / 1024
+    print(f'прирост пиковой памяти: {growth:.0f} МБ')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Время холодного старта воркера: импорт api_yamdb.wsgi и разбор URL,
+как при первом запросе.
+
+    python -m benchmarks.startup --repeat 7 --top 15
+    python -m benchmarks.startup --api-only --max-ms 1500
+
+Каждый замер выполняется в новом процессе Python с -X importtime на
+настройках benchmarks.settings, если DJANGO_SETTINGS_MODULE не задан.
+Выводится медиана общего времени и модули с наибольшим собственным
+временем импорта из последнего запуска. С --max-ms скрипт завершается
+с кодом 1, если медиана превышает порог; так он используется в CI.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BOOT = (
+    'import api_yamdb.wsgi;'
+    'from django.urls import resolve;'
+    "resolve('/api/v1/titles/')"
+)
+
+
+def run(env):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True, check=False,
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        sys.stderr.write(result.stderr)
+        raise SystemExit('не удалось импортировать api_yamdb.wsgi')
+    return elapsed, result.stderr
+
+
+def parse_importtime(output):
+    """
+    Возвращает список пар (собственное время в мс, модуль).
+    """
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        modules.append((int(parts[0]) / 1000, parts[2].strip()))
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--api-only', action='store_true')
+    parser.add_argument('--max-ms', type=float)
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+    if args.api_only:
+        env['API_ONLY'] = '1'
+
+    timings = []
+    for _ in range(args.repeat):
+        elapsed, output = run(env)
+        timings.append(elapsed)
+    median = statistics.median(timings)
+
+    modules = parse_importtime(output)
+    print(f'модулей импортировано: {len(modules)}')
+    print(f'сумма собственного времени импорта: '
+          f'{sum(ms for ms, _ in modules):.1f} мс')
+    print(f'медиана старта процесса: {median:.1f} мс')
+    for ms, name in sorted(modules, reverse=True)[:args.top]:
+        print(f'{ms:8.1f} мс  {name}')
+
+    if args.max_ms is not None and median > args.max_ms:
+        print(f'превышен порог {args.max_ms:.0f} мс')
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+"""
+URL проекта и пустое представление под префиксом API для замеров
+накладных расходов middleware.
+"""
+from django.http import JsonResponse
+from django.urls import include, path
+
+
+def empty_view(request):
+    return JsonResponse({'detail': 'ok'})
+
+
+urlpatterns = [
+    path('api/v1/empty/', empty_view),
+    path('', include('api_yamdb.urls')),
+]
@@ -0,0 +1,93 @@
+"""
+Общие функции для скриптов замеров производительности.
+
+Скрипты запускаются из корня проекта, например
+python -m benchmarks.serializers, и работают на базе SQLite из
+benchmarks.settings: в памяти или в файле BENCHMARK_DB.
+"""
+import os
+import random
+import statistics
+import time
+
+import django
+
+
+def setup_django(settings_module='benchmarks.settings'):
+    """
+    Настраивает Django и применяет миграции к базе для замеров.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+
+
+def seed(titles=100, reviews_per_title=20, comments_per_review=1):
+    """
+    Наполняет базу произведениями, отзывами и комментариями.
+    """
+    from django.contrib.auth import get_user_model
+
+    from titles.models import Category, Comment, Genre, Review, Title
+
+    User = get_user_model()
+    rnd = random.Random(0)
+    # bulk_create на SQLite не возвращает id, поэтому объекты
+    # перечитываются из базы.
+    Category.objects.bulk_create(
+        Category(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(5)
+    )
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(15)
+    )
+    User.objects.bulk_create(
+        User(username=f'user{i}', email=f'user{i}@yamdb.fake')
+        for i in range(reviews_per_title)
+    )
+    categories = list(Category.objects.all())
+    genres = list(Genre.objects.all())
+    users = list(User.objects.all())
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {i}',
+            year=1950 + i % 70,
+            description='Описание произведения. ' * rnd.randint(5, 40),
+            category=rnd.choice(categories),
+        )
+        for i in range(titles)
+    )
+    Genre_title = Title.genre.through
+    Genre_title.objects.bulk_create(
+        Genre_title(title=title, genre=genre)
+        for title in Title.objects.all()
+        for genre in rnd.sample(genres, 3)
+    )
+    Review.objects.bulk_create(
+        Review(
+            title=title, author=author, score=rnd.randint(1, 10),
+            text='Текст отзыва. ' * rnd.randint(3, 30),
+        )
+        for title in Title.objects.all()
+        for author in users
+    )
+    Comment.objects.bulk_create(
+        Comment(review=review, author=rnd.choice(users), text='Комментарий')
+        for review in Review.objects.all()
+        for _ in range(comments_per_review)
+    )
+
+
+def timeit(func, repeat=20):
+    """
+    Возвращает медианное время выполнения func в секундах.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
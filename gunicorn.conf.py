@@ -0,0 +1,85 @@
+"""
+Настройки gunicorn. Все параметры задаются переменными окружения:
+
+GUNICORN_BIND                  адрес, по умолчанию 0.0.0.0:8000
+GUNICORN_WORKER_CLASS          sync, gthread (по умолчанию), gevent, eventlet
+GUNICORN_WORKERS               число процессов, по умолчанию 2 * CPU + 1
+GUNICORN_THREADS               потоков на процесс для gthread, по умолчанию 4
+GUNICORN_WORKER_CONNECTIONS    соединений на процесс для gevent/eventlet
+GUNICORN_KEEPALIVE             секунды keep-alive, по умолчанию 5
+GUNICORN_TIMEOUT               таймаут обработки запроса, по умолчанию 30
+GUNICORN_MAX_REQUESTS          перезапуск процесса после N запросов
+GUNICORN_MAX_REQUESTS_JITTER   случайная добавка к GUNICORN_MAX_REQUESTS
+GUNICORN_PRELOAD               1, чтобы загрузить приложение до fork
+
+Кэш Django должен быть общим для процессов: с LocMemCache сервер
+запускается только при GUNICORN_WORKERS=1.
+"""
+import multiprocessing
+import os
+
+
+def env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = env_int('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+threads = env_int(
+    'GUNICORN_THREADS', 4 if worker_class == 'gthread' else 1
+)
+worker_connections = env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+keepalive = env_int('GUNICORN_KEEPALIVE', 5)
+timeout = env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+max_requests = env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+preload_app = env_bool('GUNICORN_PRELOAD')
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG')
+
+
+def on_starting(server):
+    if workers <= 1:
+        return
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    from django.conf import settings
+
+    backend = settings.CACHES['default']['BACKEND']
+    if backend == 'django.core.cache.backends.locmem.LocMemCache':
+        # Версии кэша категорий и жанров и кэша страниц у каждого процесса
+        # были бы свои, и запись в одном не сбрасывала бы кэш в других.
+        raise RuntimeError(
+            f'LocMemCache не общий для {workers} процессов gunicorn: '
+            'укажите CACHE_BACKEND (например, '
+            'django.core.cache.backends.db.DatabaseCache) или '
+            'GUNICORN_WORKERS=1'
+        )
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Соединения с БД, открытые в мастер-процессе при загрузке
+        # приложения, нельзя использовать в дочерних процессах.
+        from django.db import connections
+
+        connections.close_all()
+    if worker_class in ('gevent', 'eventlet'):
+        try:
+            module = __import__(
+                f'psycogreen.{worker_class}', fromlist=['patch_psycopg']
+            )
+        except ImportError:
+            server.log.warning(
+                'psycogreen не установлен: запросы к PostgreSQL будут '
+                'блокировать процесс %s', worker_class
+            )
+        else:
+            module.patch_psycopg()
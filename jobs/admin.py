@@ -0,0 +1,39 @@
+from django.contrib import admin, messages
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from jobs.models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'attempts', 'run_at', 'finished')
+    list_filter = ('status', 'name')
+    search_fields = ('=key', '=name')
+    readonly_fields = ('created', 'finished', 'locked_until', 'attempts')
+    actions = ('retry',)
+
+    def retry(self, request, queryset):
+        # Задачи ставятся по одной: если задача с тем же ключом уже ждет
+        # или выполняется, job_active_key_uniq не даст поставить вторую.
+        skipped = 0
+        for pk in queryset.filter(status=Job.FAILED).values_list(
+            'pk', flat=True
+        ):
+            try:
+                with transaction.atomic():
+                    Job.objects.filter(pk=pk, status=Job.FAILED).update(
+                        status=Job.QUEUED, attempts=0,
+                        run_at=timezone.now(), finished=None,
+                    )
+            except IntegrityError:
+                skipped += 1
+        if skipped:
+            self.message_user(
+                request,
+                f'Не повторено задач: {skipped}, такие задачи уже в очереди',
+                messages.WARNING,
+            )
+    retry.short_description = 'Повторить упавшие задачи'
+
+
+admin.site.register(Job, JobAdmin)
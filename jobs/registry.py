@@ -0,0 +1,78 @@
+"""
+Регистрация задач и постановка их в очередь.
+
+    @task(max_attempts=3)
+    def recompute_title_rating(title_id):
+        ...
+
+    enqueue(recompute_title_rating, {'title_id': 1}, key='rating:1')
+
+Аргументы задачи передаются как JSON, поэтому могут содержать только
+строки, числа, списки, словари, True/False и None.
+"""
+import json
+from datetime import timedelta
+
+from django.utils import timezone
+
+from jobs.models import Job
+
+tasks = {}
+
+
+class Task:
+
+    def __init__(self, func, name, max_attempts, timeout):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+
+def task(name=None, max_attempts=5, timeout=300):
+    """
+    Регистрирует функцию как задачу. timeout - сколько секунд задача
+    может выполняться, прежде чем другой воркер сочтет ее зависшей и
+    повторит.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__qualname__}'
+        tasks[task_name] = Task(func, task_name, max_attempts, timeout)
+        return tasks[task_name]
+    return decorator
+
+
+def get_task(name):
+    try:
+        return tasks[name]
+    except KeyError:
+        raise LookupError(f'Задача {name} не зарегистрирована')
+
+
+def enqueue(task_or_name, payload=None, key=None, run_at=None, delay=None):
+    """
+    Ставит задачу в очередь и возвращает Job. Если задача с тем же key
+    уже ждет или выполняется, возвращается она и новая не создается.
+    Время запуска задается run_at или задержкой delay в секундах.
+    """
+    name = getattr(task_or_name, 'name', task_or_name)
+    registered = get_task(name)
+    if run_at is None:
+        run_at = timezone.now()
+        if delay:
+            run_at += timedelta(seconds=delay)
+    values = {
+        'name': name,
+        'payload': json.dumps(payload or {}),
+        'run_at': run_at,
+        'max_attempts': registered.max_attempts,
+    }
+    if key is None:
+        return Job.objects.create(**values)
+    job, _ = Job.objects.get_or_create(
+        key=key, status__in=Job.ACTIVE_STATUSES, defaults=values
+    )
+    return job
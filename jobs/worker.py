@@ -0,0 +1,223 @@
+"""
+Выполнение задач из очереди.
+
+Воркер забирает готовые к запуску задачи через
+SELECT ... FOR UPDATE SKIP LOCKED и условный UPDATE статуса, поэтому
+несколько воркеров не возьмут одну задачу (на SQLite, где блокировок
+строк нет, это обеспечивает только UPDATE). Упавшая задача повторяется
+с экспоненциальной задержкой, пока не кончатся попытки. Задача, которая
+выполняется дольше своего timeout, считается зависшей (воркер мог
+упасть) и возвращается в очередь. Завершенные и упавшие задачи старше
+JOBS_RETENTION_DAYS воркер периодически удаляет.
+"""
+import json
+import logging
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait
+)
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import (
+    close_old_connections,
+    connection,
+    connections,
+    transaction
+)
+from django.db.models import F
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import get_task
+
+logger = logging.getLogger(__name__)
+
+STALE_CHECK_SECONDS = 30
+PRUNE_INTERVAL_SECONDS = 3600
+PRUNE_BATCH_SIZE = 1000
+
+
+def get_backoff(attempt):
+    """
+    Задержка перед повтором после attempt-й неудачной попытки.
+    """
+    base = getattr(settings, 'JOBS_RETRY_BACKOFF', 10)
+    limit = getattr(settings, 'JOBS_RETRY_BACKOFF_MAX', 3600)
+    return timedelta(seconds=min(base * 2 ** (attempt - 1), limit))
+
+
+def requeue_stale():
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, locked_until__lt=now)
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, locked_until=None, finished=now,
+        last_error='Превышено время выполнения',
+    )
+    count = stale.update(status=Job.QUEUED, locked_until=None)
+    if count:
+        logger.warning('Возвращено в очередь зависших задач: %s', count)
+
+
+def prune_finished():
+    """
+    Удаляет пачками задачи, завершенные или упавшие больше
+    JOBS_RETENTION_DAYS дней назад. Без настройки задачи не удаляются.
+    """
+    days = getattr(settings, 'JOBS_RETENTION_DAYS', None)
+    if not days:
+        return 0
+    finished = Job.objects.filter(
+        status__in=(Job.DONE, Job.FAILED),
+        finished__lt=timezone.now() - timedelta(days=days),
+    )
+    deleted = 0
+    while True:
+        pks = list(finished.values_list('pk', flat=True)[:PRUNE_BATCH_SIZE])
+        if not pks:
+            break
+        deleted += Job.objects.filter(pk__in=pks).delete()[0]
+    if deleted:
+        logger.info('Удалено завершенных задач: %s', deleted)
+    return deleted
+
+
+def claim(limit):
+    """
+    Переводит до limit готовых задач в статус running и возвращает их id.
+    """
+    now = timezone.now()
+    claimed = []
+    # Без блокировок строк (SQLite) транзакция не нужна: чтение в ней
+    # мешало бы другим воркерам писать, а захват и так делает UPDATE.
+    if connection.features.has_select_for_update:
+        atomic = transaction.atomic()
+    else:
+        atomic = nullcontext()
+    with atomic:
+        candidates = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.QUEUED, run_at__lte=now,
+        ).order_by('run_at', 'id').values_list('id', 'name')[:limit]
+        for job_id, name in candidates:
+            try:
+                timeout = get_task(name).timeout
+            except LookupError as error:
+                Job.objects.filter(pk=job_id).update(
+                    status=Job.FAILED, finished=now, last_error=str(error)
+                )
+                continue
+            updated = Job.objects.filter(
+                pk=job_id, status=Job.QUEUED
+            ).update(
+                status=Job.RUNNING,
+                attempts=F('attempts') + 1,
+                locked_until=now + timedelta(seconds=timeout),
+            )
+            if updated:
+                claimed.append(job_id)
+    return claimed
+
+
+def execute(job_id):
+    """
+    Выполняет задачу, которую воркер уже перевел в статус running.
+    """
+    close_old_connections()
+    try:
+        job = Job.objects.get(pk=job_id)
+        running = Job.objects.filter(pk=job_id, status=Job.RUNNING)
+        try:
+            get_task(job.name)(**json.loads(job.payload))
+        except Exception:
+            error = traceback.format_exc()
+            logger.exception('Задача %s завершилась ошибкой', job)
+            if job.attempts >= job.max_attempts:
+                running.update(
+                    status=Job.FAILED, locked_until=None,
+                    finished=timezone.now(), last_error=error,
+                )
+            else:
+                running.update(
+                    status=Job.QUEUED, locked_until=None,
+                    run_at=timezone.now() + get_backoff(job.attempts),
+                    last_error=error,
+                )
+        else:
+            running.update(
+                status=Job.DONE, locked_until=None,
+                finished=timezone.now(), last_error='',
+            )
+    finally:
+        close_old_connections()
+
+
+def noop():
+    pass
+
+
+class Worker:
+    """
+    Цикл воркера: забирает задачи, пока есть свободные места в пуле
+    потоков или процессов. В режиме burst завершается, когда готовых к
+    запуску задач не осталось.
+    """
+
+    def __init__(self, concurrency=4, pool='thread', poll_interval=1.0,
+                 burst=False):
+        self.concurrency = concurrency
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.stopping = False
+
+    def get_executor(self):
+        if self.pool == 'thread':
+            return ThreadPoolExecutor(self.concurrency)
+        # Процессы запускаются fork до первого запроса к базе, чтобы
+        # не унаследовать открытые соединения родителя.
+        connections.close_all()
+        executor = ProcessPoolExecutor(
+            self.concurrency, mp_context=multiprocessing.get_context('fork')
+        )
+        executor.submit(noop).result()
+        return executor
+
+    def stop(self, *args):
+        self.stopping = True
+
+    def run(self):
+        executor = self.get_executor()
+        running = set()
+        checked_stale = pruned = 0
+        try:
+            while not self.stopping:
+                if time.monotonic() - checked_stale > STALE_CHECK_SECONDS:
+                    requeue_stale()
+                    checked_stale = time.monotonic()
+                if time.monotonic() - pruned > PRUNE_INTERVAL_SECONDS:
+                    prune_finished()
+                    pruned = time.monotonic()
+                running = {future for future in running if not future.done()}
+                free = self.concurrency - len(running)
+                claimed = claim(free) if free else []
+                for job_id in claimed:
+                    running.add(executor.submit(execute, job_id))
+                if claimed:
+                    continue
+                if self.burst and not running:
+                    break
+                if running:
+                    wait(
+                        running, timeout=self.poll_interval,
+                        return_when=FIRST_COMPLETED,
+                    )
+                else:
+                    time.sleep(self.poll_interval)
+        finally:
+            executor.shutdown(wait=True)
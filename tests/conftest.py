@@ -7,4 +7,5 @@ sys.path.append(root_dir)
 
 
 pytest_plugins = [
+    'tests.fixtures.fixture_data',
 ]
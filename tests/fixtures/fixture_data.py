@@ -0,0 +1,86 @@
+import pytest
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestUser', email='testuser@yamdb.fake', password='1234567'
+    )
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestAdmin', email='testadmin@yamdb.fake',
+        password='1234567', role='admin'
+    )
+
+
+@pytest.fixture
+def moderator(django_user_model):
+    return django_user_model.objects.create_user(
+        username='TestModerator', email='testmoderator@yamdb.fake',
+        password='1234567', role='moderator'
+    )
+
+
+@pytest.fixture
+def user_client(user):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture
+def admin_client(admin):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+@pytest.fixture
+def moderator_client(moderator):
+    from rest_framework.test import APIClient
+
+    client = APIClient()
+    client.force_authenticate(user=moderator)
+    return client
+
+
+@pytest.fixture
+def titles(django_user_model):
+    from titles.models import Category, Comment, Genre, Review, Title
+
+    movie = Category.objects.create(name='Фильм', slug='movie')
+    book = Category.objects.create(name='Книга', slug='book')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{i}', email=f'author{i}@yamdb.fake'
+        )
+        for i in range(3)
+    ]
+    result = []
+    for i in range(6):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=2000 + i,
+            description='Описание ' * i or None,
+            category=(movie, book, None)[i % 3],
+        )
+        title.genre.set(([comedy, drama], [drama], [])[i % 3])
+        for author in authors[:i % 4]:
+            review = Review.objects.create(
+                title=title, author=author, text=f'Отзыв {i}',
+                score=(i * 3) % 10 + 1,
+            )
+            Comment.objects.create(
+                review=review, author=authors[0], text='Комментарий'
+            )
+        result.append(title)
+    return result
@@ -4,5 +4,40 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Файловая тестовая база нужна тестам с параллельными потоками:
+        # общая база в памяти сразу отвечает "table is locked".
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+        },
+    },
+    # Отдельная база вместо реплики для tests/test_db_router.py. В
+    # REPLICA_DATABASES она добавляется только в этих тестах.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'replica.sqlite3'),
+        'TEST': {
+            'NAME': os.path.join(BASE_DIR, 'test_replica.sqlite3'),
+        },
+    },
+}
+
+# Тесты с меткой postgres (tests/test_partitions.py) выполняются, только
+# если задан сервер PostgreSQL: TEST_POSTGRES_HOST и остальные TEST_POSTGRES_*.
+# Django создает на нем отдельную тестовую базу.
+if os.environ.get('TEST_POSTGRES_HOST'):
+    DATABASES['postgres'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ.get('TEST_POSTGRES_DB', 'postgres'),
+        'USER': os.environ.get('TEST_POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.environ.get('TEST_POSTGRES_PASSWORD', ''),
+        'HOST': os.environ['TEST_POSTGRES_HOST'],
+        'PORT': os.environ.get('TEST_POSTGRES_PORT', '5432'),
+    }
+
+# Тесты идут в одном процессе, общий кэш им не нужен.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+PAGE_CACHE_TTL = 300
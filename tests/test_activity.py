@@ -0,0 +1,87 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from api.pagination import PubDateCursorPagination
+from titles.models import Comment, Review, Title
+from titles.purge import soft_delete
+
+
+@pytest.fixture
+def activity(user, titles):
+    reviews = [
+        Review.objects.create(title=title, author=user, text='Отзыв', score=5)
+        for title in titles
+    ]
+    for review in reviews:
+        Comment.objects.create(review=review, author=user, text='Да')
+    return reviews
+
+
+def collect(client, url):
+    items = []
+    queries = []
+    while url:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        queries.append(len(context))
+        items.extend(response.data['results'])
+        url = response.data['next']
+    return items, queries
+
+
+@pytest.mark.django_db
+class TestUserActivity:
+
+    def test_my_reviews(self, activity, user_client, monkeypatch):
+        monkeypatch.setattr(PubDateCursorPagination, 'page_size', 2)
+        items, queries = collect(user_client, '/api/v1/users/me/reviews/')
+        assert [item['id'] for item in items] == [
+            review.id for review in reversed(activity)
+        ], 'Отзывы пользователя должны идти от новых к старым без пропусков'
+        assert items[0]['title'] == activity[-1].title_id
+        assert items[0]['comment_count'] == 1
+        assert len(set(queries)) == 1, \
+            'Число запросов не должно зависеть от номера страницы'
+
+    def test_my_comments(self, activity, user_client):
+        items, _ = collect(user_client, '/api/v1/users/me/comments/')
+        comments = Comment.objects.filter(author__username='TestUser')
+        assert [item['id'] for item in items] == list(
+            comments.order_by('-pub_date', '-id').values_list('id', flat=True)
+        )
+        assert {
+            (item['title'], item['review']) for item in items
+        } == {(review.title_id, review.id) for review in activity}
+
+    def test_admin_feed(self, activity, user_client, admin_client):
+        url = '/api/v1/users/TestUser/reviews/'
+        assert user_client.get(url).status_code == 403, \
+            'Чужую ленту может смотреть только администратор'
+        items, _ = collect(admin_client, url)
+        assert len(items) == Title.objects.count()
+        items, _ = collect(admin_client, '/api/v1/users/author0/comments/')
+        assert len(items) == Comment.objects.filter(
+            author__username='author0'
+        ).count()
+        assert admin_client.get(
+            '/api/v1/users/nobody/reviews/'
+        ).status_code == 404
+
+    def test_deleted_titles_hidden(self, activity, user_client,
+                                   admin_client):
+        soft_delete(activity[0].title)
+        for client, url, attribute in (
+            (user_client, '/api/v1/users/me/reviews/', 'id'),
+            (user_client, '/api/v1/users/me/comments/', 'review'),
+            (admin_client, '/api/v1/users/TestUser/reviews/', 'id'),
+            (admin_client, '/api/v1/users/TestUser/comments/', 'review'),
+        ):
+            items, _ = collect(client, url)
+            assert len(items) == len(activity) - 1
+            assert activity[0].id not in [item[attribute] for item in items], \
+                'Отзывы удаленных произведений не должны попадать в ленту'
+
+    def test_anonymous(self, client):
+        assert client.get('/api/v1/users/me/reviews/').status_code == 401
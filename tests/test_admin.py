@@ -0,0 +1,51 @@
+import pytest
+from titles.models import Title
+from titles.paginators import EstimatedCountPaginator, is_unfiltered
+
+
+@pytest.fixture
+def staff_client(client, django_user_model):
+    superuser = django_user_model.objects.create_superuser(
+        username='root', email='root@yamdb.fake', password='1234567'
+    )
+    client.force_login(superuser)
+    return client
+
+
+@pytest.mark.django_db
+class TestAdmin:
+
+    @pytest.mark.parametrize('url', (
+        '/admin/titles/title/',
+        '/admin/titles/title/?q=Произв',
+        '/admin/titles/review/',
+        '/admin/titles/review/?q=author1',
+        '/admin/titles/comment/',
+        '/admin/titles/comment/?q=author0',
+    ))
+    def test_changelists(self, staff_client, titles, url):
+        response = staff_client.get(url)
+        assert response.status_code == 200, url
+
+    def test_review_search_by_author(self, staff_client, titles):
+        response = staff_client.get('/admin/titles/review/?q=author2')
+        results = response.context['cl'].result_list
+        assert {review.author.username for review in results} == {'author2'}
+
+    def test_default_manager_filter_is_not_a_filter(self, titles):
+        assert is_unfiltered(Title.objects.all()), \
+            'Условие is_deleted=False менеджера не должно отключать оценку'
+        assert is_unfiltered(Title.all_objects.all())
+        assert not is_unfiltered(Title.objects.filter(year=2001))
+        assert not is_unfiltered(Title.all_objects.filter(is_deleted=True))
+
+    def test_estimate(self, titles, monkeypatch):
+        paginator = EstimatedCountPaginator(Title.objects.all(), 2)
+        assert paginator.count == len(titles), \
+            'На SQLite число записей считается точно'
+
+        monkeypatch.setattr(
+            EstimatedCountPaginator, 'get_estimate', lambda self: 10 ** 6
+        )
+        paginator = EstimatedCountPaginator(Title.objects.all(), 2)
+        assert paginator.count == 10 ** 6
@@ -0,0 +1,71 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+URL = '/api/v1/titles/batch/'
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context)
+
+
+@pytest.mark.django_db
+class TestTitleBatch:
+
+    def test_request_order_and_missing(self, titles, client):
+        ids = [titles[4].id, 999, titles[1].id, titles[4].id]
+        response = client.get(URL, {'id__in': ','.join(map(str, ids))})
+        assert response.status_code == 200
+        assert [title['id'] for title in response.data['results']] == [
+            titles[4].id, titles[1].id
+        ], 'Произведения должны идти в порядке запроса без повторов'
+        assert response.data['missing'] == [999]
+        title = response.data['results'][1]
+        assert title['genre'] == [{'name': 'Драма', 'slug': 'drama'}]
+        assert title['category'] == {'name': 'Книга', 'slug': 'book'}
+        assert title['rating'] == 4
+
+    def test_post(self, titles, client):
+        response = client.post(
+            URL, {'ids': [titles[2].id, titles[0].id]},
+            content_type='application/json'
+        )
+        assert response.status_code == 200
+        assert [title['id'] for title in response.data['results']] == [
+            titles[2].id, titles[0].id
+        ]
+
+    def test_constant_queries(self, titles, client):
+        # Первый запрос загружает кэш категорий и жанров.
+        client.get(f'{URL}?id__in={titles[0].id}')
+        few = count_queries(client, f'{URL}?id__in={titles[0].id}')
+        many = count_queries(client, URL + '?id__in=' + ','.join(
+            str(title.id) for title in titles
+        ))
+        assert few == many, \
+            'Число запросов не должно зависеть от числа произведений'
+
+    def test_sparse_fields(self, titles, client):
+        response = client.get(URL, {'id__in': titles[0].id, 'fields': 'name'})
+        assert response.data['results'] == [
+            {'id': titles[0].id, 'name': titles[0].name}
+        ]
+
+    @pytest.mark.parametrize('query', ['', 'a,b', '1.5'])
+    def test_invalid(self, query, client):
+        response = client.get(URL, {'id__in': query})
+        assert response.status_code == 400
+
+    def test_too_many(self, client):
+        ids = ','.join(str(pk) for pk in range(1, 102))
+        assert client.get(URL, {'id__in': ids}).status_code == 400
+
+    @pytest.mark.parametrize('body', [[1, 2], 'ids', {'ids': 1}])
+    def test_invalid_post(self, body, client):
+        response = client.post(URL, body, content_type='application/json')
+        assert response.status_code == 400, \
+            'Тело запроса, отличное от {"ids": [...]}, должно давать 400'
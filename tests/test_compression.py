@@ -0,0 +1,54 @@
+import gzip
+import json
+
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from api_yamdb.middleware import CompressionMiddleware
+
+
+def get_response(response, accept_encoding='gzip, deflate'):
+    request = RequestFactory().get(
+        '/api/v1/titles/', HTTP_ACCEPT_ENCODING=accept_encoding
+    )
+    return CompressionMiddleware(lambda request: response)(request)
+
+
+def big_payload():
+    return {'results': [{'name': 'Фильм', 'year': 1988}] * 200}
+
+
+class TestCompressionMiddleware:
+
+    def test_large_json_compressed(self):
+        response = JsonResponse(big_payload())
+        response['ETag'] = '"abc"'
+        response = get_response(response, 'br;q=0, gzip')
+        assert response['Content-Encoding'] == 'gzip'
+        assert response['ETag'] == 'W/"abc"', \
+            'Сильный ETag сжатого ответа должен стать слабым'
+        assert 'Accept-Encoding' in response['Vary']
+        assert json.loads(gzip.decompress(response.content)) == big_payload()
+
+    def test_small_json_not_compressed(self):
+        response = get_response(JsonResponse({'name': 'Фильм'}))
+        assert not response.has_header('Content-Encoding'), \
+            'Ответы меньше COMPRESSION_MIN_LENGTH не сжимаются'
+
+    def test_other_content_type_not_compressed(self):
+        response = get_response(HttpResponse('x' * 5000))
+        assert not response.has_header('Content-Encoding')
+
+    def test_gzip_not_accepted(self):
+        response = get_response(JsonResponse(big_payload()), 'gzip;q=0')
+        assert not response.has_header('Content-Encoding')
+        assert 'Accept-Encoding' in response['Vary']
+
+    def test_streaming(self):
+        chunks = [b'[', b'{"name": "film"},' * 1000, b'{}]']
+        response = get_response(StreamingHttpResponse(
+            chunks, content_type='application/json'
+        ))
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(b''.join(response.streaming_content)) == \
+            b''.join(chunks)
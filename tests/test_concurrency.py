@@ -0,0 +1,134 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from titles.models import Review, Title
+from users.models import CustomUser
+
+THREADS = 16
+REQUESTS = 48
+
+
+def hammer(client_user, method, url, data):
+    """
+    Отправляет REQUESTS одинаковых запросов из THREADS потоков и
+    возвращает коды ответов.
+    """
+    def send(_):
+        client = APIClient()
+        client.force_authenticate(user=client_user)
+        try:
+            response = getattr(client, method)(url, data, format='json')
+            return response.status_code, response.json()
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        return list(pool.map(send, range(REQUESTS)))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentUniqueness:
+
+    def test_signup(self, admin):
+        results = hammer(admin, 'post', '/api/v1/users/', {
+            'username': 'racer', 'email': 'Racer@yamdb.fake'
+        })
+        codes = [code for code, _ in results]
+        assert codes.count(201) == 1, \
+            'Только один из параллельных запросов должен создать пользователя'
+        assert codes.count(400) == REQUESTS - 1
+        assert CustomUser.objects.filter(email='racer@yamdb.fake').count() == 1
+        errors = [body for code, body in results if code == 400]
+        assert all(
+            body == {
+                'email': ['Пользователь с таким email уже существует!'],
+                'username': ['Пользователь с таким username уже существует!'],
+            }
+            for body in errors
+        )
+
+    def test_review_create(self, user):
+        title = Title.objects.create(name='Фильм', year=2000)
+        results = hammer(
+            user, 'post', f'/api/v1/titles/{title.id}/reviews/',
+            {'text': 'Отзыв', 'score': 7}
+        )
+        codes = [code for code, _ in results]
+        assert codes.count(201) == 1, \
+            'Только один из параллельных запросов должен создать отзыв'
+        assert codes.count(400) == REQUESTS - 1
+        assert Review.objects.filter(title=title, author=user).count() == 1
+        title.refresh_from_db()
+        assert title.review_count == 1
+        assert title.rating == 7
+
+
+WRITERS = 64
+
+
+def run_parallel(requests):
+    """
+    Выполняет запросы (пользователь, метод, url, данные) из WRITERS
+    потоков и возвращает коды ответов.
+    """
+    def send(request):
+        client_user, method, url, data = request
+        client = APIClient()
+        client.force_authenticate(user=client_user)
+        try:
+            response = getattr(client, method)(url, data, format='json')
+            return response.status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(WRITERS) as pool:
+        return list(pool.map(send, requests))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentReviewAggregates:
+
+    def assert_aggregates(self, title):
+        title.refresh_from_db()
+        scores = list(title.reviews.values_list('score', flat=True))
+        assert title.review_count == len(scores)
+        assert title.score_sum == sum(scores), \
+            'Сумма оценок не совпадает с отзывами после параллельной записи'
+        if scores:
+            assert title.rating == pytest.approx(sum(scores) / len(scores))
+        else:
+            assert title.rating is None
+
+    def test_create_update_delete(self, django_user_model):
+        title = Title.objects.create(name='Фильм', year=2000)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'writer{i}', email=f'writer{i}@yamdb.fake'
+            )
+            for i in range(WRITERS)
+        ]
+        codes = run_parallel([
+            (author, 'post', url, {'text': 'Отзыв', 'score': i % 10 + 1})
+            for i, author in enumerate(authors)
+        ])
+        assert codes == [201] * WRITERS
+        self.assert_aggregates(title)
+
+        reviews = dict(title.reviews.values_list('author_id', 'id'))
+        requests = []
+        for i, author in enumerate(authors):
+            review_url = f'{url}{reviews[author.id]}/'
+            if i % 2:
+                requests.append((author, 'delete', review_url, None))
+            else:
+                requests.append(
+                    (author, 'patch', review_url, {'score': 10 - i % 10})
+                )
+        codes = run_parallel(requests)
+        assert sorted(set(codes)) == [200, 204]
+        self.assert_aggregates(title)
+        assert title.review_count == WRITERS // 2
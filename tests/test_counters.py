@@ -0,0 +1,112 @@
+from django.core.management import call_command
+
+import pytest
+from titles.models import Comment, Review, Title
+
+
+def counters():
+    return (
+        dict(Title.objects.values_list('id', 'review_count')),
+        dict(Review.objects.values_list('id', 'comment_count')),
+    )
+
+
+def actual_counters():
+    return (
+        {
+            title.id: title.reviews.count()
+            for title in Title.objects.all()
+        },
+        {
+            review.id: review.comments.count()
+            for review in Review.objects.all()
+        },
+    )
+
+
+@pytest.mark.django_db
+class TestDenormalizedCounters:
+
+    def test_create_and_delete(self, titles, user):
+        review = Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=5
+        )
+        comments = [
+            Comment.objects.create(review=review, author=user, text='Да')
+            for _ in range(3)
+        ]
+        comments[0].delete()
+        assert counters() == actual_counters(), \
+            'Счетчики должны меняться при создании и удалении'
+
+        comment = Comment.objects.get(pk=comments[1].pk)
+        comment.review = Review.objects.exclude(pk=review.pk).first()
+        comment.save()
+        assert counters() == actual_counters(), \
+            'Перенос комментария должен менять счетчики обоих отзывов'
+
+    def test_cascade_delete(self, titles, django_user_model):
+        Review.objects.filter(title=titles[3]).first().delete()
+        django_user_model.objects.get(username='author0').delete()
+        titles[2].delete()
+        assert counters() == actual_counters(), \
+            'Каскадное удаление должно уменьшать счетчики'
+
+    def test_stale_instances(self, titles):
+        title = titles[3]
+        pk = title.reviews.first().pk
+        first, second = Review.objects.get(pk=pk), Review.objects.get(pk=pk)
+        first.score = 1
+        first.save()
+        second.score = 2
+        second.save()
+        title.refresh_from_db()
+        assert title.score_sum == sum(
+            title.reviews.values_list('score', flat=True)
+        ), 'Прежняя оценка должна читаться из базы, а не из объекта'
+
+        assert first.delete()[0] > 0
+        assert second.delete() == (0, {}), \
+            'Повторное удаление не должно менять агрегаты'
+        comment = Comment.objects.filter(review__title=titles[2]).first()
+        stale = Comment.objects.get(pk=comment.pk)
+        comment.delete()
+        stale.delete()
+        assert counters() == actual_counters()
+        title.refresh_from_db()
+        assert title.score_sum == sum(
+            title.reviews.values_list('score', flat=True)
+        )
+
+    def test_update_fields(self, titles):
+        review = Review.objects.filter(title=titles[3]).first()
+        review.title_id = titles[0].id
+        review.save(update_fields=['title_id'])
+        review.text = 'Новый текст'
+        review.score = 1
+        review.save(update_fields=['text'])
+        scores = dict(Title.objects.values_list('id', 'score_sum'))
+        for title in (titles[0], titles[3]):
+            assert scores[title.id] == sum(
+                title.reviews.values_list('score', flat=True)
+            ), 'Перенос отзыва через update_fields должен менять агрегаты'
+        assert counters() == actual_counters()
+
+    def test_reconcile(self, titles):
+        Title.objects.update(review_count=100, rating=None)
+        Review.objects.filter(title=titles[1]).update(comment_count=7)
+        call_command('reconcile_counters', batch_size=2)
+        assert counters() == actual_counters(), \
+            'reconcile_counters должна исправить расхождения'
+        ratings = dict(Title.objects.values_list('id', 'rating'))
+        assert ratings[titles[0].id] is None
+        assert ratings[titles[1].id] == 4
+
+    def test_api(self, titles, user_client):
+        response = user_client.get(f'/api/v1/titles/{titles[2].id}/')
+        assert response.data['review_count'] == 2
+
+        response = user_client.get(f'/api/v1/titles/{titles[2].id}/reviews/')
+        assert [
+            review['comment_count'] for review in response.data['results']
+        ] == [1, 1], 'Отзывы должны содержать число комментариев'
@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.core.cache.backends.db import DatabaseCache
+from django.db import DatabaseError, transaction
+
+import pytest
+from api_yamdb import db_router, page_cache
+from rest_framework.test import APIClient
+from titles import taxonomy
+from titles.models import Genre, Title
+
+
+@pytest.fixture(autouse=True)
+def replica_state(settings):
+    settings.REPLICA_DATABASES = ['replica']
+    settings.REPLICA_PIN_SECONDS = 60
+    cache.clear()
+    db_router._health.clear()
+    yield
+    cache.clear()
+    db_router._health.clear()
+
+
+@pytest.fixture
+def genres():
+    Genre.objects.create(name='Драма', slug='drama')
+    Genre.objects.using('replica').create(name='Реплика', slug='replica')
+
+
+def genre_slugs(client):
+    response = client.get('/api/v1/genres/')
+    assert response.status_code == 200
+    return [genre['slug'] for genre in response.data['results']]
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+class TestReplicaRouting:
+
+    def test_get_reads_from_replica(self, genres):
+        assert genre_slugs(APIClient()) == ['replica'], \
+            'GET-запросы должны читать из реплики'
+
+    def test_read_your_writes(self, genres, admin_client):
+        response = admin_client.post(
+            '/api/v1/genres/', {'name': 'Комедия', 'slug': 'comedy'},
+            format='json'
+        )
+        assert response.status_code == 201
+        assert genre_slugs(admin_client) == ['drama', 'comedy'], \
+            'После записи клиент должен читать из default'
+
+        other_client = APIClient(REMOTE_ADDR='10.0.0.2')
+        assert genre_slugs(other_client) == ['replica'], \
+            'Закрепление за default не должно касаться других клиентов'
+
+    def test_batch_post_not_pinned(self, genres):
+        client = APIClient()
+        response = client.post(
+            '/api/v1/titles/batch/', {'ids': [1]}, format='json'
+        )
+        assert response.status_code == 200
+        assert genre_slugs(client) == ['replica'], \
+            'POST батча только читает и не должен закреплять клиента'
+
+    def test_unhealthy_replica(self, genres, monkeypatch):
+        def check_replica(alias):
+            raise DatabaseError('connection refused')
+
+        monkeypatch.setattr(db_router, 'check_replica', check_replica)
+        assert genre_slugs(APIClient()) == ['drama'], \
+            'При недоступной реплике чтения должны идти в default'
+
+    def test_atomic_reads_from_default(self):
+        router = db_router.ReplicaRouter()
+        token = db_router.read_alias.set('replica')
+        try:
+            assert router.db_for_read(Genre) == 'replica'
+            with transaction.atomic():
+                assert router.db_for_read(Genre) == 'default'
+            assert router.db_for_write(Genre) == 'default'
+        finally:
+            db_router.read_alias.reset(token)
+
+    def test_cache_table_read_from_default(self):
+        cache_model = DatabaseCache('django_cache', {}).cache_model_class
+        router = db_router.ReplicaRouter()
+        token = db_router.read_alias.set('replica')
+        try:
+            assert router.db_for_read(cache_model) == 'default', \
+                'Таблица DatabaseCache должна читаться из default'
+            assert router.db_for_read(Genre) == 'replica'
+        finally:
+            db_router.read_alias.reset(token)
+
+    def test_cached_data_read_from_default(self, genres):
+        title = Title.objects.create(name='Новое', year=2020)
+        page_cache.invalidate('titles')
+        response = APIClient().get('/api/v1/titles/')
+        assert [row['id'] for row in response.data['results']] == [
+            title.id
+        ], 'Страница для кэша должна читаться из default'
+
+        taxonomy.invalidate_taxonomy()
+        token = db_router.read_alias.set('replica')
+        try:
+            snapshot = taxonomy.get_taxonomy()
+        finally:
+            db_router.read_alias.reset(token)
+        assert set(snapshot.genres_by_slug) == {'drama'}, \
+            'Снимок категорий и жанров должен читаться из default'
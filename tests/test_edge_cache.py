@@ -0,0 +1,128 @@
+import os
+import re
+
+from django.conf import settings
+
+import pytest
+from api_yamdb import edge_cache, middleware
+from jobs.models import Job
+from titles.models import Comment, Genre, Review
+from titles.purge import soft_delete
+
+
+@pytest.mark.django_db
+class TestSurrogateKeys:
+
+    def test_list_responses_have_keys(self, titles, client, user_client):
+        response = client.get('/api/v1/titles/', {'genre': 'drama'})
+        assert response['Surrogate-Key'] == 'titles'
+        response = client.get(f'/api/v1/titles/{titles[2].id}/reviews/')
+        assert response['Surrogate-Key'] == f'titles/{titles[2].id}/reviews'
+        assert not user_client.get('/api/v1/users/me/').has_header(
+            'Surrogate-Key'
+        ), 'Ответы вне кэшируемых путей не должны помечаться'
+
+    def test_refresh(self, settings, monkeypatch):
+        settings.EDGE_CACHE_REFRESH_URL = 'http://nginx:8080/'
+        settings.EDGE_CACHE_HOST = 'yamdb.fake'
+        requests = []
+
+        class Response:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def read(self):
+                return b''
+
+        def urlopen(request, timeout):
+            requests.append((
+                request.full_url, request.get_header('Host'),
+                request.get_header('Accept-encoding'),
+            ))
+            return Response()
+
+        monkeypatch.setattr(edge_cache.urllib.request, 'urlopen', urlopen)
+        edge_cache.refresh('titles/1/reviews')
+        assert requests == [
+            ('http://nginx:8080/api/v1/titles/1/reviews/', 'yamdb.fake', enc)
+            for enc in edge_cache.REFRESH_ENCODINGS
+        ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestInvalidation:
+
+    def test_writes_enqueue_refresh(self, titles, user, settings):
+        settings.EDGE_CACHE_REFRESH_URL = 'http://nginx:8080'
+        review = Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=5
+        )
+        Comment.objects.create(review=review, author=user, text='Да')
+        path = f'titles/{titles[0].id}/reviews'
+        assert set(Job.objects.values_list('key', flat=True)) == {
+            'edge:titles', f'edge:titles/{titles[0].id}', f'edge:{path}',
+            f'edge:{path}/{review.id}/comments',
+        }, 'Запись должна ставить обновление затронутых адресов'
+
+    def test_soft_delete_enqueues_refresh(self, titles, settings):
+        settings.EDGE_CACHE_REFRESH_URL = 'http://nginx:8080'
+        title = f'titles/{titles[1].id}'
+        soft_delete(titles[1])
+        assert {
+            'edge:titles', f'edge:{title}', f'edge:{title}/reviews'
+        } <= set(Job.objects.values_list('key', flat=True)), \
+            'Скрытие произведения должно обновлять его адреса в кэше nginx'
+
+    def test_genre_change_enqueues_refresh(self, titles, settings):
+        settings.EDGE_CACHE_REFRESH_URL = 'http://nginx:8080'
+        drama = Genre.objects.get(slug='drama')
+        expected = {
+            f'edge:titles/{pk}'
+            for pk in drama.titles.values_list('pk', flat=True)
+        }
+        drama.titles.clear()
+        titles[2].genre.add(drama)
+        expected |= {'edge:titles', f'edge:titles/{titles[2].id}'}
+        assert set(Job.objects.values_list('key', flat=True)) == expected, \
+            'Изменение жанров должно обновлять адреса произведений'
+
+    def test_disabled_without_refresh_url(self, titles, user):
+        Review.objects.create(
+            title=titles[0], author=user, text='Отзыв', score=5
+        )
+        assert not Job.objects.exists()
+
+
+class TestNginxConfig:
+
+    def test_micro_cache(self):
+        with open(os.path.join(settings.BASE_DIR, 'nginx', 'default.conf')) \
+                as f:
+            config = f.read()
+        assert re.search(r'proxy_cache_path\s', config)
+        assert re.search(r'proxy_cache_bypass\s+\$api_cache_skip', config)
+        assert re.search(r'proxy_no_cache\s+\$api_cache_skip', config), \
+            'Ответы на запросы с Authorization не должны кэшироваться'
+        assert re.search(r'proxy_cache_lock\s+on', config)
+
+    def test_encoding_variants(self):
+        with open(os.path.join(settings.BASE_DIR, 'nginx', 'default.conf')) \
+                as f:
+            config = f.read()
+        block = re.search(
+            r'map \$http_accept_encoding \$api_encoding \{(.*?)\}', config,
+            re.S,
+        )[1]
+        variants = {
+            line.split()[-1].rstrip(';').strip("'")
+            for line in block.splitlines()
+            if line.strip() and not line.strip().startswith('#')
+        }
+        assert variants == set(edge_cache.REFRESH_ENCODINGS), \
+            'Обновление кэша должно запрашивать все варианты сжатия из nginx'
+        assert 'br' not in variants or middleware.brotli is not None, \
+            'br передается приложению, только если установлен brotli'
+        assert re.search(r'proxy_cache_key\s+\S*\$api_encoding', config)
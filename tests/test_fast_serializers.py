@@ -0,0 +1,58 @@
+import pytest
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from api.fast_serializers import (
+    CommentFastSerializer,
+    ReviewFastSerializer,
+    TitleListFastSerializer
+)
+from api.serializers import (
+    CommentSerializer,
+    ReviewSerializer,
+    TitleListSerializer
+)
+from titles.models import Comment, Genre, Review, Title
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+class TestFastSerializers:
+
+    def test_title_list(self, titles):
+        queryset = Title.objects.select_related('category').prefetch_related(
+            Prefetch('genre', queryset=Genre.objects.order_by('id'))
+        )
+        fast = TitleListFastSerializer()
+        assert render(fast.serialize(fast.prepare(queryset))) == \
+            render(TitleListSerializer(queryset, many=True).data), \
+            'Быстрый сериализатор произведений должен давать тот же JSON'
+
+    def test_title_list_sparse(self, titles):
+        fields = {'id', 'name', 'genre'}
+        fast = TitleListFastSerializer(fields=fields)
+        data = fast.serialize(fast.prepare(Title.objects.all()))
+        assert all(set(item) == fields for item in data), \
+            'Быстрый сериализатор должен выводить только запрошенные поля'
+
+    def test_reviews(self, titles):
+        queryset = Review.objects.order_by('id')
+        fast = ReviewFastSerializer()
+        assert render(fast.serialize(fast.prepare(queryset))) == \
+            render(ReviewSerializer(queryset, many=True).data), \
+            'Быстрый сериализатор отзывов должен давать тот же JSON'
+
+    def test_comments(self, titles):
+        queryset = Comment.objects.order_by('id')
+        fast = CommentFastSerializer()
+        assert render(fast.serialize(fast.prepare(queryset))) == \
+            render(CommentSerializer(queryset, many=True).data), \
+            'Быстрый сериализатор комментариев должен давать тот же JSON'
+
+    def test_title_list_endpoint(self, client, titles):
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert response.json()['count'] == len(titles)
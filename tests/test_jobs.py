@@ -0,0 +1,143 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+import pytest
+from jobs.models import Job
+from jobs.registry import enqueue, task
+from jobs.worker import Worker, prune_finished, requeue_stale
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.fail', max_attempts=2)
+def fail():
+    raise RuntimeError('boom')
+
+
+def run_worker():
+    Worker(concurrency=2, poll_interval=0.01, burst=True).run()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestJobs:
+
+    def setup_method(self):
+        calls.clear()
+
+    def test_enqueue_is_idempotent(self):
+        first = enqueue(record, {'value': 1}, key='record:1')
+        second = enqueue('tests.record', {'value': 2}, key='record:1')
+        assert first.pk == second.pk, \
+            'Задача с тем же ключом не должна ставиться повторно'
+        run_worker()
+        assert calls == [1]
+
+        third = enqueue(record, {'value': 3}, key='record:1')
+        assert third.pk != first.pk, \
+            'После выполнения задачи ключ должен освобождаться'
+
+    def test_concurrent_enqueue(self):
+        def send(value):
+            try:
+                return enqueue(record, {'value': value}, key='race').pk
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(16) as pool:
+            ids = set(pool.map(send, range(32)))
+        assert len(ids) == 1
+        assert Job.objects.filter(key='race').count() == 1
+
+    def test_worker_runs_due_jobs(self):
+        for value in range(10):
+            enqueue(record, {'value': value})
+        later = enqueue(record, {'value': 100}, delay=3600)
+        run_worker()
+        assert sorted(calls) == list(range(10))
+        assert Job.objects.filter(status=Job.DONE).count() == 10
+        later.refresh_from_db()
+        assert later.status == Job.QUEUED, \
+            'Отложенная задача не должна выполняться раньше run_at'
+
+    def test_retry_with_backoff(self):
+        job = enqueue(fail)
+        run_worker()
+        job.refresh_from_db()
+        assert job.status == Job.QUEUED
+        assert job.attempts == 1
+        assert job.run_at > timezone.now()
+        assert 'RuntimeError: boom' in job.last_error
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        run_worker()
+        job.refresh_from_db()
+        assert job.status == Job.FAILED, \
+            'После последней попытки задача должна считаться упавшей'
+        assert job.attempts == 2
+
+    def test_requeue_stale(self):
+        job = enqueue(record, {'value': 1})
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING, attempts=1,
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        requeue_stale()
+        job.refresh_from_db()
+        assert job.status == Job.QUEUED
+        run_worker()
+        assert calls == [1]
+
+    @override_settings(JOBS_RETENTION_DAYS=7)
+    def test_prune_finished(self):
+        old = timezone.now() - timedelta(days=8)
+        done = enqueue(record, {'value': 1})
+        failed = enqueue(fail)
+        recent = enqueue(record, {'value': 2})
+        queued = enqueue(record, {'value': 3})
+        Job.objects.filter(pk=done.pk).update(status=Job.DONE, finished=old)
+        Job.objects.filter(pk=failed.pk).update(
+            status=Job.FAILED, finished=old
+        )
+        Job.objects.filter(pk=recent.pk).update(
+            status=Job.DONE, finished=timezone.now()
+        )
+        assert prune_finished() == 2
+        assert set(Job.objects.values_list('pk', flat=True)) == {
+            recent.pk, queued.pk
+        }, 'Удаляться должны только давно завершенные задачи'
+
+        with override_settings(JOBS_RETENTION_DAYS=0):
+            Job.objects.update(status=Job.DONE, finished=old)
+            assert prune_finished() == 0
+
+    def test_admin_retry(self, client, django_user_model):
+        superuser = django_user_model.objects.create_superuser(
+            username='root', email='root@yamdb.fake', password='1234567'
+        )
+        client.force_login(superuser)
+        blocked = enqueue(record, {'value': 1}, key='record:1')
+        free = enqueue(record, {'value': 2}, key='record:2')
+        Job.objects.update(status=Job.FAILED, finished=timezone.now())
+        active = enqueue(record, {'value': 1}, key='record:1')
+
+        response = client.post('/admin/jobs/job/', {
+            'action': 'retry',
+            '_selected_action': [blocked.pk, free.pk],
+        })
+        assert response.status_code == 302, \
+            'Повтор задачи с занятым ключом не должен приводить к ошибке'
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        assert statuses == {
+            blocked.pk: Job.FAILED,
+            free.pk: Job.QUEUED,
+            active.pk: Job.QUEUED,
+        }
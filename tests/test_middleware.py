@@ -0,0 +1,55 @@
+from django.apps import apps
+from django.test import Client
+
+import pytest
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+@pytest.mark.django_db
+class TestAPIMiddlewareProfile:
+
+    def test_api_skips_session_middleware(self, user_client):
+        response = user_client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert not response.has_header('X-Frame-Options'), \
+            'Ответы API не должны проходить через XFrameOptionsMiddleware'
+        assert 'Cookie' not in response.get('Vary', ''), \
+            'Ответы API не должны обращаться к сессии'
+        assert not response.cookies
+
+    def test_api_post_without_csrf(self, admin):
+        token = RefreshToken.for_user(admin).access_token
+        client = Client(enforce_csrf_checks=True)
+        response = client.post(
+            '/api/v1/genres/', {'name': 'Драма', 'slug': 'drama'},
+            HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        assert response.status_code == 201, \
+            'Запросы к API с JWT не должны требовать CSRF-токен'
+
+    def test_admin_uses_full_stack(self, django_user_model):
+        if not apps.is_installed('django.contrib.admin'):
+            pytest.skip('Админка отключена настройкой API_ONLY')
+        django_user_model.objects.create_superuser(
+            username='root', email='root@yamdb.fake', password='1234567'
+        )
+        client = Client(enforce_csrf_checks=True)
+        response = client.get('/admin/login/')
+        assert response['X-Frame-Options'] == 'DENY'
+        assert 'csrftoken' in response.cookies
+
+        response = client.post('/admin/login/?next=/admin/', {
+            'username': 'root',
+            'password': '1234567',
+        })
+        assert response.status_code == 403, \
+            'Админка должна проверять CSRF-токен'
+
+        response = client.post('/admin/login/?next=/admin/', {
+            'username': 'root',
+            'password': '1234567',
+            'csrfmiddlewaretoken': client.cookies['csrftoken'].value,
+        })
+        assert response.status_code == 302
+        assert 'sessionid' in response.cookies
+        assert client.get('/admin/').status_code == 200
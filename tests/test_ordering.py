@@ -0,0 +1,53 @@
+import pytest
+from rest_framework.pagination import PageNumberPagination
+from titles.models import Title
+
+
+def collect(client, url, params):
+    items = []
+    page = 1
+    while True:
+        response = client.get(url, {**params, 'page': page})
+        assert response.status_code == 200
+        items.extend(response.data['results'])
+        if response.data['next'] is None:
+            return items
+        page += 1
+
+
+@pytest.mark.django_db
+class TestTitleOrdering:
+
+    @pytest.fixture
+    def same_year(self, titles):
+        return [
+            Title.objects.create(name=f'Ремейк {i}', year=1990)
+            for i in range(5)
+        ]
+
+    @pytest.mark.parametrize('ordering', ('year', '-year'))
+    def test_id_tiebreak_across_pages(self, client, same_year, monkeypatch,
+                                      ordering):
+        monkeypatch.setattr(PageNumberPagination, 'page_size', 2)
+        items = collect(client, '/api/v1/titles/', {'ordering': ordering})
+        expected = sorted(
+            Title.objects.values_list('year', 'id'),
+            reverse=ordering.startswith('-'),
+        )
+        assert [item['id'] for item in items] == [pk for _, pk in expected], \
+            'Записи с одинаковым значением должны идти по id без повторов ' \
+            'и пропусков между страницами'
+
+    def test_rating_with_nulls(self, client, titles, monkeypatch):
+        monkeypatch.setattr(PageNumberPagination, 'page_size', 4)
+        items = collect(client, '/api/v1/titles/', {'ordering': '-rating'})
+        assert sorted(item['id'] for item in items) == sorted(
+            title.id for title in titles
+        ), 'Произведения без рейтинга не должны теряться между страницами'
+
+    def test_default_and_unknown_ordering(self, client, titles):
+        for params in ({}, {'ordering': 'description'}):
+            items = collect(client, '/api/v1/titles/', params)
+            assert [item['id'] for item in items] == sorted(
+                title.id for title in titles
+            ), 'По умолчанию произведения сортируются по id'
@@ -0,0 +1,210 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+from api_yamdb import page_cache
+from titles.models import Comment, Genre, Review
+
+
+def get(client, url, **params):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    return response.data, len(context)
+
+
+@pytest.mark.django_db
+class TestPageCache:
+
+    def test_hit(self, titles, client, user_client):
+        url = '/api/v1/titles/'
+        data, queries = get(client, url, genre='drama', page=1)
+        assert queries > 0
+        cached, queries = get(user_client, url, page=1, genre='drama')
+        assert queries == 0, \
+            'Повторный запрос страницы не должен обращаться к базе'
+        assert cached == data
+
+    def test_invalidation(self, titles, client, user):
+        title = titles[4]
+        titles_url = '/api/v1/titles/'
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+        get(client, titles_url)
+        get(client, reviews_url)
+
+        review = Review.objects.create(
+            title=title, author=user, text='Новый', score=1
+        )
+        data, _ = get(client, titles_url)
+        row = next(row for row in data['results'] if row['id'] == title.id)
+        assert row['review_count'] == title.reviews.count(), \
+            'Новый отзыв должен сбрасывать кэш списка произведений'
+        data, _ = get(client, reviews_url)
+        assert review.id in [row['id'] for row in data['results']]
+
+        Comment.objects.create(review=review, author=user, text='Да')
+        data, _ = get(client, reviews_url)
+        row = next(row for row in data['results'] if row['id'] == review.id)
+        assert row['comment_count'] == 1
+
+        title.category.name = 'Другое'
+        title.category.save()
+        data, _ = get(client, titles_url)
+        row = next(row for row in data['results'] if row['id'] == title.id)
+        assert row['category']['name'] == 'Другое'
+
+    def test_genre_invalidation(self, titles, client):
+        title = titles[4]
+        url = '/api/v1/titles/'
+
+        def genres():
+            data, _ = get(client, url)
+            row = next(row for row in data['results'] if row['id'] == title.id)
+            return {genre['slug'] for genre in row['genre']}
+
+        comedy = Genre.objects.get(slug='comedy')
+        assert genres() == {'drama'}
+        title.genre.add(comedy)
+        assert genres() == {'comedy', 'drama'}, \
+            'Изменение жанров должно сбрасывать кэш списка произведений'
+        Genre.objects.get(slug='drama').titles.remove(title)
+        assert genres() == {'comedy'}
+        comedy.titles.clear()
+        assert genres() == set()
+
+    def test_single_flight(self):
+        cache.delete('page:test:single')
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'value': 1}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(
+                page_cache.get_or_set('page:test:single', compute)
+            ))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1, \
+            'Промах должен считать только один из одновременных запросов'
+        assert results == [{'value': 1}] * 8
+
+    def test_lock_wait_limit(self, settings):
+        settings.PAGE_CACHE_LOCK_WAIT = 0.1
+        key = 'page:test:busy'
+        cache.add(page_cache.LOCK_PREFIX + key, True, 10)
+        assert page_cache.get_or_set(key, lambda: 'fresh') == 'fresh'
+        assert cache.get(key) is None, \
+            'Без блокировки результат не должен сохраняться'
+        cache.delete(page_cache.LOCK_PREFIX + key)
+
+    def test_disabled(self, titles, client, settings):
+        settings.PAGE_CACHE_TTL = 0
+        get(client, '/api/v1/titles/')
+        _, queries = get(client, '/api/v1/titles/')
+        assert queries > 0
+
+    @pytest.mark.parametrize('backend, ttl', [
+        ('django.core.cache.backends.locmem.LocMemCache', '0'),
+        ('django.core.cache.backends.db.DatabaseCache', '300'),
+    ])
+    def test_default_ttl(self, backend, ttl):
+        env = {**os.environ, 'CACHE_BACKEND': backend}
+        env.pop('PAGE_CACHE_TTL', None)
+        result = subprocess.run(
+            [sys.executable, '-c',
+             'from api_yamdb import settings; print(settings.PAGE_CACHE_TTL)'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.PIPE,
+            universal_newlines=True, check=True,
+        )
+        assert result.stdout.strip() == ttl, \
+            'С LocMemCache кэш страниц должен быть выключен по умолчанию'
+
+    def test_access_log(self, tmp_path):
+        log = tmp_path / 'access.log'
+        line = (
+            '1.2.3.4 - - [19/Oct/2026:10:00:00 +0000] "GET {} HTTP/1.1" '
+            '{} 512 "-" "curl"\n'
+        )
+        log.write_text(
+            line.format('/api/v1/titles/?genre=drama', 200) * 3
+            + line.format('/api/v1/titles/1/reviews/', 200) * 2
+            + line.format('/api/v1/titles/2/reviews/', 404) * 5
+            + line.format('/api/v1/users/me/', 200) * 4
+            + line.format('/api/v1/titles/1/', 200),
+            encoding='utf-8',
+        )
+        assert page_cache.access_log_paths([str(log)], 10) == [
+            '/api/v1/titles/?genre=drama', '/api/v1/titles/1/reviews/',
+        ]
+        assert page_cache.access_log_paths([str(log)], 1) == [
+            '/api/v1/titles/?genre=drama',
+        ]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestWarmCache:
+
+    def test_command(self, titles, client, tmp_path):
+        popular = max(titles, key=lambda title: title.reviews.count())
+        log = tmp_path / 'access.log'
+        log.write_text(
+            '- - - [19/Oct/2026:10:00:00 +0000] '
+            '"GET /api/v1/titles/?year=2000 HTTP/1.1" 200 512 "-" "-"\n',
+            encoding='utf-8',
+        )
+        call_command(
+            'warm_cache', '--host', 'testserver', '--workers', '3',
+            '--top', '1', '--access-log', str(log),
+        )
+        for url, params in (
+            ('/api/v1/titles/', {}),
+            ('/api/v1/titles/', {'year': 2000}),
+            ('/api/v1/titles/', {'genre': 'drama'}),
+            ('/api/v1/titles/', {'category': 'movie'}),
+            (f'/api/v1/titles/{popular.id}/reviews/', {}),
+        ):
+            _, queries = get(client, url, **params)
+            assert queries == 0, f'Страница {url} {params} не прогрета'
+
+    @override_settings(EDGE_CACHE_HOST='')
+    def test_command_requires_host(self):
+        with pytest.raises(CommandError):
+            call_command('warm_cache')
+
+
+class TestDeploy:
+
+    def test_workflows(self):
+        workflows = []
+        for path in ('yamdb_workflow.yaml', '.github/workflows/yamdb.yaml'):
+            with open(os.path.join(settings.BASE_DIR, path)) as f:
+                workflows.append(f.read())
+        assert workflows[0] == workflows[1], (
+            'yamdb_workflow.yaml и .github/workflows/yamdb.yaml '
+            'должны совпадать'
+        )
+        script = workflows[0]
+        assert 'up --force-recreate --no-deps -d web worker' in script, \
+            'Деплой должен перезапускать и worker'
+        assert script.index('createcachetable') < script.index('warm_cache')
+        assert 'warm_cache --host ' in script, \
+            'Прогрев должен идти под публичным именем сайта'
@@ -0,0 +1,61 @@
+import marshal
+
+from django.core.cache import cache
+
+import pytest
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def jwt_client(user):
+    token = RefreshToken.for_user(user).access_token
+    return APIClient(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    def test_admin_profile(self, titles, admin):
+        client = jwt_client(admin)
+        response = client.get('/api/v1/titles/', HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        profile_id = response['X-Profile-Id']
+
+        report = client.get(f'/api/v1/profiles/{profile_id}/').data
+        assert report['path'] == '/api/v1/titles/'
+        assert report['status'] == 200
+        assert report['sql_count'] == len(report['sql']) > 0
+        assert 'titles_title' in ' '.join(q['sql'] for q in report['sql'])
+        assert 'cumulative' in report['profile']
+
+        response = client.get(f'/api/v1/profiles/{profile_id}/prof/')
+        assert response['Content-Disposition'].startswith('attachment')
+        assert marshal.loads(response.content), \
+            'Файл профиля должен читаться pstats'
+
+    def test_rate_limit(self, admin):
+        client = jwt_client(admin)
+        assert client.get(
+            '/api/v1/genres/?profile=1'
+        ).has_header('X-Profile-Id')
+        response = client.get('/api/v1/genres/?profile=1')
+        assert response.status_code == 200
+        assert response['X-Profile'] == 'rate-limited', \
+            'Профилирование должно запускаться не чаще PROFILING_INTERVAL'
+
+    def test_not_admin(self, user):
+        for client in (jwt_client(user), APIClient()):
+            response = client.get('/api/v1/genres/', HTTP_X_PROFILE='1')
+            assert response.status_code == 200
+            assert not response.has_header('X-Profile-Id'), \
+                'Профилировать запросы может только администратор'
+        assert jwt_client(user).get(
+            '/api/v1/profiles/missing/'
+        ).status_code == 403
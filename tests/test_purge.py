@@ -0,0 +1,120 @@
+from django.core.management import call_command
+
+import pytest
+from jobs.models import Job
+from jobs.worker import Worker
+from titles.models import Comment, Review, Title
+from titles.purge import purge_user, soft_delete
+
+
+def run_worker():
+    Worker(concurrency=1, poll_interval=0.01, burst=True).run()
+
+
+def aggregates():
+    return (
+        sorted(Title.objects.values_list(
+            'id', 'review_count', 'score_sum', 'rating'
+        )),
+        sorted(Review.objects.values_list('id', 'comment_count')),
+    )
+
+
+def reconciled():
+    call_command('reconcile_counters')
+    return aggregates()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSoftDelete:
+
+    def test_delete_title(self, titles, admin_client, user_client):
+        title = titles[3]
+        response = admin_client.delete(f'/api/v1/titles/{title.id}/')
+        assert response.status_code == 204
+        assert user_client.get(
+            f'/api/v1/titles/{title.id}/'
+        ).status_code == 404, 'Удаленное произведение должно быть скрыто'
+        assert title.id not in [
+            item['id']
+            for item in user_client.get('/api/v1/titles/').data['results']
+        ]
+        assert Review.objects.filter(title=title).exists(), \
+            'Отзывы удаляются в фоне, а не в запросе'
+
+        run_worker()
+        assert not Title.all_objects.filter(pk=title.id).exists()
+        assert not Review.objects.filter(title_id=title.id).exists()
+        assert aggregates() == reconciled()
+        assert Job.objects.get().status == Job.DONE
+
+    def test_delete_user(self, titles, admin_client, django_user_model):
+        author = django_user_model.objects.get(username='author0')
+        response = admin_client.delete('/api/v1/users/author0/')
+        assert response.status_code == 204
+        assert not django_user_model.objects.filter(pk=author.pk).exists()
+        response = admin_client.post('/api/v1/users/', {
+            'username': 'author0', 'email': 'author0@yamdb.fake',
+        }, format='json')
+        assert response.status_code == 201, \
+            'Логин и email удаленного пользователя должны освободиться'
+
+        run_worker()
+        assert not django_user_model.all_objects.filter(
+            pk=author.pk
+        ).exists()
+        assert not Review.objects.filter(author_id=author.pk).exists()
+        assert not Comment.objects.filter(author_id=author.pk).exists()
+        assert aggregates() == reconciled(), \
+            'Агрегаты должны остаться согласованными'
+
+    def test_purge_in_batches(self, titles, django_user_model):
+        user = django_user_model.objects.get(username='author1')
+        for review in Review.objects.exclude(author=user):
+            Comment.objects.create(review=review, author=user, text='Нет')
+        soft_delete(user)
+        purge_user(user.pk, batch_size=1)
+        assert aggregates() == reconciled()
+
+    def test_purge_invalidates_cache(self, titles, client,
+                                     django_user_model, settings):
+        settings.EDGE_CACHE_REFRESH_URL = 'http://nginx:8080'
+        user = django_user_model.objects.get(username='author1')
+        title = titles[3]
+        reviews_url = f'/api/v1/titles/{title.id}/reviews/'
+
+        def review_count():
+            response = client.get('/api/v1/titles/')
+            return {
+                item['id']: item['review_count']
+                for item in response.data['results']
+            }[title.id]
+
+        def authors():
+            return {
+                item['author'] for item in client.get(reviews_url).data[
+                    'results'
+                ]
+            }
+
+        count = review_count()
+        assert 'author1' in authors()
+        soft_delete(user)
+        assert f'deleted-{user.pk}' in authors(), \
+            'Отзывы удаленного пользователя должны показываться под новым ' \
+            'именем'
+
+        purge_user(user.pk, batch_size=1)
+        assert review_count() == count - 1, \
+            'Удаление отзывов пачками должно сбрасывать список произведений'
+        assert f'deleted-{user.pk}' not in authors()
+        reviews = f'titles/{title.id}/reviews'
+        assert {
+            'edge:titles', f'edge:titles/{title.id}', f'edge:{reviews}',
+        } <= set(Job.objects.values_list('key', flat=True))
+
+    def test_purge_deleted_command(self, titles):
+        soft_delete(titles[5])
+        call_command('purge_deleted', batch_size=2)
+        assert not Title.all_objects.filter(pk=titles[5].pk).exists()
+        assert aggregates() == reconciled()
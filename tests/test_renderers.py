@@ -0,0 +1,41 @@
+import datetime
+import decimal
+import io
+
+from django.utils import timezone
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from rest_framework.renderers import JSONRenderer
+
+
+class TestFastJSONRenderer:
+
+    def test_same_output(self):
+        data = {
+            'count': 1,
+            'results': [{
+                'name': 'Фильм ',
+                'rating': 7.5,
+                'price': decimal.Decimal('1.10'),
+                'pub_date': datetime.datetime(
+                    2020, 8, 1, 12, 30, 15, 123456, tzinfo=timezone.utc
+                ),
+                'date': datetime.date(2020, 8, 1),
+                'description': None,
+            }],
+        }
+        assert FastJSONRenderer().render(data) == \
+            JSONRenderer().render(data), \
+            'FastJSONRenderer должен давать тот же JSON, что и JSONRenderer'
+
+    def test_indent_fallback(self):
+        data = {'name': 'Фильм'}
+        assert FastJSONRenderer().render(
+            data, 'application/json; indent=4'
+        ) == JSONRenderer().render(data, 'application/json; indent=4')
+
+    def test_parser(self):
+        stream = io.BytesIO('{"name": "Фильм", "year": 1988}'.encode())
+        assert FastJSONParser().parse(stream) == \
+            {'name': 'Фильм', 'year': 1988}
@@ -0,0 +1,131 @@
+from urllib.parse import urlencode
+
+import pytest
+from api.pagination import RankCursorPagination
+from titles.models import Comment, Review
+from titles.purge import soft_delete
+
+
+@pytest.fixture
+def texts(titles, user):
+    first, second = titles[:2]
+    return [
+        Review.objects.create(
+            title=first, author=user, score=3,
+            text='Скучный сюжет, но отличная музыка',
+        ),
+        Review.objects.create(
+            title=second, author=user, score=7,
+            text='Музыка отличная, музыка запоминается',
+        ),
+        Comment.objects.create(
+            review=first.reviews.first(), author=user,
+            text='Про музыку согласен',
+        ),
+    ]
+
+
+def search_url(kind, **params):
+    return f'/api/v1/search/{kind}/?{urlencode(params)}'
+
+
+def collect(client, url):
+    items = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        items.extend(response.data['results'])
+        url = response.data['next']
+    return items
+
+
+@pytest.mark.django_db
+class TestSearch:
+
+    def test_permissions(self, client, user_client, moderator_client,
+                         admin_client):
+        url = search_url('reviews', q='музыка')
+        assert client.get(url).status_code == 401
+        assert user_client.get(url).status_code == 403, \
+            'Поиск доступен только модераторам и администраторам'
+        assert moderator_client.get(url).status_code == 200
+        assert admin_client.get(url).status_code == 200
+
+    def test_query_required(self, moderator_client):
+        response = moderator_client.get('/api/v1/search/reviews/')
+        assert response.status_code == 400
+        assert 'q' in response.data
+        response = moderator_client.get('/api/v1/search/reviews/?q=%20')
+        assert response.status_code == 400
+
+    def test_ranked(self, texts, moderator_client):
+        items = collect(moderator_client, search_url('reviews', q='музыка'))
+        assert [item['id'] for item in items] == [texts[1].id, texts[0].id], \
+            'Отзыв, где слово встречается чаще, должен быть выше'
+        assert items[0]['rank'] > items[1]['rank']
+        assert items[0]['title'] == texts[1].title_id
+        items = collect(
+            moderator_client, search_url('reviews', q='скучный музыка')
+        )
+        assert [item['id'] for item in items] == [texts[0].id], \
+            'Должны находиться отзывы со всеми словами запроса'
+
+    def test_updates_and_deletes(self, texts, moderator_client):
+        url = search_url('reviews', q='запоминается')
+        first, second = (Review.objects.get(pk=obj.pk) for obj in texts[:2])
+        second.text = 'Музыка так себе'
+        second.save()
+        assert collect(moderator_client, url) == []
+        first.text = 'Сюжет запоминается'
+        first.save()
+        assert [item['id'] for item in collect(moderator_client, url)] == [
+            first.id
+        ]
+        first.delete()
+        assert collect(moderator_client, url) == []
+
+    def test_filters(self, texts, moderator_client):
+        url = search_url('reviews', q='музыка')
+        items = collect(
+            moderator_client, f'{url}&title={texts[0].title_id}'
+        )
+        assert [item['id'] for item in items] == [texts[0].id]
+        assert collect(moderator_client, f'{url}&author=author0') == []
+        assert len(collect(moderator_client, f'{url}&since=2000-01-01')) == 2
+        assert collect(moderator_client, f'{url}&until=2000-01-01') == []
+        soft_delete(texts[1].title)
+        assert [item['id'] for item in collect(moderator_client, url)] == [
+            texts[0].id
+        ], 'Отзывы удаленных произведений не должны находиться'
+
+    def test_comments(self, texts, moderator_client):
+        items = collect(
+            moderator_client, search_url('comments', q='согласен')
+        )
+        assert [item['id'] for item in items] == [texts[2].id]
+        assert items[0]['review'] == texts[2].review_id
+        assert items[0]['title'] == texts[0].title_id
+        assert collect(
+            moderator_client,
+            search_url('comments', q='согласен', review=0),
+        ) == []
+
+    def test_pages(self, titles, user, moderator_client, monkeypatch):
+        monkeypatch.setattr(RankCursorPagination, 'page_size', 2)
+        reviews = [
+            Review.objects.create(
+                title=title, author=user, score=5, text='Одинаково хорошо',
+            )
+            for title in titles
+        ]
+        items = collect(moderator_client, search_url('reviews', q='хорошо'))
+        assert [item['id'] for item in items] == [
+            review.id for review in reversed(reviews)
+        ], 'При равной релевантности страницы не должны терять отзывы'
+
+    def test_operators_escaped(self, texts, moderator_client):
+        for query in ('"', 'музыка OR', 'NEAR(музыка', '*', 'text:музыка'):
+            response = moderator_client.get(
+                '/api/v1/search/reviews/', {'q': query}
+            )
+            assert response.status_code == 200, query
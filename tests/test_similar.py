@@ -0,0 +1,88 @@
+from django.core.management import call_command
+
+import pytest
+from titles.models import Genre, Review, SimilarTitle, Title
+from titles.similarity import get_builder, sparse
+
+BACKENDS = [
+    'python',
+    pytest.param('scipy', marks=pytest.mark.skipif(
+        sparse is None, reason='scipy не установлен'
+    )),
+]
+
+
+@pytest.fixture
+def library(django_user_model):
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    titles = {
+        name: Title.objects.create(name=name, year=2000)
+        for name in 'ABCD'
+    }
+    titles['A'].genre.set([drama])
+    titles['B'].genre.set([drama])
+    titles['C'].genre.set([comedy])
+    first, second = [
+        django_user_model.objects.create_user(
+            username=f'reader{i}', email=f'reader{i}@yamdb.fake'
+        )
+        for i in range(2)
+    ]
+    for author, name in ((first, 'A'), (first, 'B'),
+                         (second, 'A'), (second, 'C')):
+        Review.objects.create(
+            author=author, title=titles[name], text='Отзыв', score=5
+        )
+    return titles
+
+
+def neighbours(titles):
+    names = {title.pk: name for name, title in titles.items()}
+    return {
+        name: [
+            (names[row.similar_id], round(row.score, 4))
+            for row in SimilarTitle.objects.filter(title=title)
+        ]
+        for name, title in titles.items()
+    }
+
+
+@pytest.mark.django_db
+class TestSimilarTitles:
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    def test_build(self, library, backend):
+        get_builder(backend).build(chunk_size=3)
+        assert neighbours(library) == {
+            'A': [('B', 0.795), ('C', 0.495)],
+            'B': [('A', 0.795)],
+            'C': [('A', 0.495)],
+            'D': [],
+        }, 'Сходство должно учитывать общие жанры и общих авторов отзывов'
+
+    @pytest.mark.parametrize('backend', BACKENDS)
+    def test_heavy_authors_ignored(self, library, backend):
+        get_builder(backend, max_user_reviews=1).build()
+        assert neighbours(library)['A'] == [('B', 0.3)]
+
+    def test_rebuild_replaces_rows(self, library):
+        call_command('build_similar_titles', '--backend', 'python')
+        call_command(
+            'build_similar_titles', '--backend', 'python', '--top', '1'
+        )
+        assert neighbours(library)['A'] == [('B', 0.795)]
+        assert SimilarTitle.objects.count() == 3
+
+    def test_endpoint(self, client, library):
+        call_command('build_similar_titles', '--backend', 'python')
+        response = client.get(f'/api/v1/titles/{library["A"].pk}/similar/')
+        assert response.status_code == 200
+        assert [title['name'] for title in response.json()] == ['B', 'C']
+
+        response = client.get(f'/api/v1/titles/{library["D"].pk}/similar/')
+        assert response.status_code == 200
+        assert response.json() == []
+
+        response = client.get('/api/v1/titles/999999/similar/')
+        assert response.status_code == 404
@@ -0,0 +1,73 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+
+def title_selects(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "titles_title"' in query['sql']
+        and not query['sql'].startswith('SELECT COUNT')
+    ]
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_fields(self, client, titles):
+        response = client.get('/api/v1/titles/', {'fields': 'id,name'})
+        assert response.status_code == 200
+        assert all(
+            set(item) == {'id', 'name'} for item in response.data['results']
+        ), 'В ответе должны быть только поля из ?fields='
+
+    def test_expand(self, client, titles):
+        response = client.get(
+            '/api/v1/titles/', {'fields': 'id', 'expand': 'category,genre'}
+        )
+        items = response.data['results']
+        assert all(
+            set(item) == {'id', 'category', 'genre'} for item in items
+        ), '?expand= должен добавлять вложенные объекты к ?fields='
+        movie = next(item for item in items if item['id'] == titles[0].id)
+        assert movie['category'] == {'name': 'Фильм', 'slug': 'movie'}
+
+    def test_expand_only_nested(self, client, titles):
+        response = client.get(
+            '/api/v1/titles/', {'fields': 'id', 'expand': 'description'}
+        )
+        assert all(
+            set(item) == {'id'} for item in response.data['results']
+        ), '?expand= должен добавлять только вложенные объекты'
+
+        response = client.get('/api/v1/titles/', {'expand': 'category'})
+        assert all(
+            set(item) == {
+                'id', 'category', 'rating', 'review_count', 'name', 'year',
+                'description',
+            }
+            for item in response.data['results']
+        ), '?expand= без ?fields= добавляет объекты к простым полям'
+
+    def test_unknown_fields_ignored(self, client, titles):
+        response = client.get(
+            f'/api/v1/titles/{titles[0].id}/', {'fields': 'name,password'}
+        )
+        assert response.status_code == 200
+        assert set(response.data) == {'name'}
+
+    def test_only_requested_columns(self, client, titles):
+        with CaptureQueriesContext(connection) as context:
+            client.get(f'/api/v1/titles/{titles[1].id}/', {'fields': 'name'})
+        [sql] = title_selects(context)
+        assert '"titles_title"."name"' in sql
+        assert '"titles_title"."description"' not in sql, \
+            'Из базы должны выбираться только запрошенные колонки'
+
+        with CaptureQueriesContext(connection) as context:
+            client.get('/api/v1/titles/', {'fields': 'id,year'})
+        [sql] = title_selects(context)
+        assert '"titles_title"."year"' in sql
+        assert '"titles_title"."description"' not in sql
+        assert '"titles_title"."name"' not in sql
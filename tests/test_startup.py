@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+# Модули, которые нужны только фоновым задачам или профилированию и не
+# должны загружаться при старте процесса, обслуживающего API.
+LAZY_MODULES = ('titles.similarity', 'numpy', 'scipy', 'cProfile', 'pstats')
+
+BOOT = (
+    'import sys, api_yamdb.wsgi;'
+    'from django.urls import resolve;'
+    "resolve('/api/v1/titles/');"
+    f'print(",".join(m for m in {LAZY_MODULES!r} if m in sys.modules))'
+)
+
+
+class TestStartup:
+
+    def test_heavy_modules_not_imported(self):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'tests.settings_qa'}
+        result = subprocess.run(
+            [sys.executable, '-c', BOOT], cwd=settings.BASE_DIR, env=env,
+            stdout=subprocess.PIPE, universal_newlines=True, check=True,
+        )
+        assert result.stdout.strip() == '', \
+            'При старте не должны импортироваться: ' + result.stdout
@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.fast_serializers import TitleListFastSerializer
+from api.serializers import TitleListSerializer
+from titles import taxonomy
+from titles.models import Category, Genre, Title
+
+
+def ids(client, **params):
+    response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200
+    return {item['id'] for item in response.data['results']}
+
+
+@pytest.fixture
+def version_reads(monkeypatch):
+    calls = []
+    get_version = taxonomy.get_version
+
+    def counting():
+        calls.append(1)
+        return get_version()
+
+    monkeypatch.setattr(taxonomy, 'get_version', counting)
+    return calls
+
+
+@pytest.mark.django_db
+class TestTaxonomy:
+
+    def test_snapshot_reused(self, titles):
+        snapshot = taxonomy.get_taxonomy()
+        with CaptureQueriesContext(connection) as context:
+            assert taxonomy.get_taxonomy() is snapshot
+        assert len(context) == 0, \
+            'Без изменений снимок не должен перечитываться из БД'
+
+    def test_invalidated_on_write(self, titles):
+        snapshot = taxonomy.get_taxonomy()
+        category = Category.objects.create(name='Сериал', slug='series')
+        assert taxonomy.get_taxonomy() is not snapshot
+        assert 'series' in taxonomy.get_taxonomy().categories_by_slug, \
+            'Новая категория должна попадать в кэш'
+
+        genre = Genre.objects.get(slug='drama')
+        genre.name = 'Трагедия'
+        genre.save()
+        assert taxonomy.get_taxonomy().genres_by_slug['drama'].name == \
+            'Трагедия'
+
+        category.delete()
+        assert 'series' not in taxonomy.get_taxonomy().categories_by_slug
+
+    def test_slug_filters(self, client, titles):
+        assert ids(client, genre='drama') == {
+            title.id for title in titles if title.genre.filter(
+                slug='drama'
+            ).exists()
+        }
+        assert ids(client, category='movie') == {
+            title.id for title in titles
+            if title.category and title.category.slug == 'movie'
+        }
+        assert ids(client, genre='comedy', category='book') == set()
+        assert ids(client, genre='unknown') == set(), \
+            'Неизвестный slug должен давать пустой список'
+
+    def test_new_slug_visible_to_api(self, admin_client, titles):
+        response = admin_client.post(
+            '/api/v1/categories/', {'name': 'Сериал', 'slug': 'series'}
+        )
+        assert response.status_code == 201
+        response = admin_client.post('/api/v1/titles/', {
+            'name': 'Новое', 'year': 2001, 'category': 'series',
+        })
+        assert response.status_code == 201, \
+            'Категория должна находиться сразу после создания'
+        title_id = response.data['id']
+        assert ids(admin_client, category='series') == {title_id}
+
+    def test_one_version_read_per_serialization(self, titles,
+                                                version_reads):
+        TitleListSerializer(Title.objects.all(), many=True).data
+        assert len(version_reads) == 1, \
+            'Версия кэша должна проверяться один раз на сериализацию'
+
+        version_reads.clear()
+        fast = TitleListFastSerializer()
+        fast.serialize(fast.prepare(Title.objects.all()))
+        assert len(version_reads) == 1
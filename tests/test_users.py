@@ -0,0 +1,88 @@
+from django.db import IntegrityError
+
+import pytest
+from api.serializers import UserSerializer
+from rest_framework import serializers
+from users.models import CustomUser
+
+
+@pytest.fixture
+def people(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=username, email=email, role=role
+        )
+        for username, email, role in (
+            ('anna', 'Anna@Yamdb.fake', 'user'),
+            ('andrey', 'andrey@mail.fake', 'moderator'),
+            ('boris', 'anton@yamdb.fake', 'user'),
+        )
+    ]
+
+
+def usernames(client, **params):
+    response = client.get('/api/v1/users/', params)
+    assert response.status_code == 200
+    return {item['username'] for item in response.data['results']}
+
+
+@pytest.mark.django_db
+class TestUserFilter:
+
+    def test_username_prefix(self, admin_client, people):
+        assert usernames(admin_client, username='an') == {'anna', 'andrey'}
+
+    def test_email_prefix_ignores_case(self, admin_client, people):
+        assert usernames(admin_client, email='ANNA@') == {'anna'}
+        assert CustomUser.objects.get(username='anna').email == \
+            'anna@yamdb.fake', 'email должен храниться в нижнем регистре'
+
+    def test_role(self, admin_client, people):
+        assert usernames(admin_client, role='moderator') == {'andrey'}
+        response = admin_client.get('/api/v1/users/', {'role': 'root'})
+        assert response.status_code == 400
+
+    def test_search(self, admin_client, people):
+        assert usernames(admin_client, search='an') == {
+            'anna', 'andrey', 'boris'
+        }, 'search ищет по началу username или email'
+        assert usernames(admin_client, search='bor') == {'boris'}
+
+
+@pytest.mark.django_db
+class TestEmailUniqueness:
+
+    def test_case_variant_rejected(self, admin_client, people):
+        response = admin_client.post('/api/v1/users/', {
+            'username': 'anna2', 'email': 'ANNA@yamdb.FAKE',
+        })
+        assert response.status_code == 400, \
+            'email, отличающийся только регистром, должен быть отклонен'
+        assert response.data == {
+            'email': ['Пользователь с таким email уже существует!']
+        }
+        assert not CustomUser.objects.filter(username='anna2').exists()
+
+    def test_update_keeps_own_email(self, admin_client, people):
+        response = admin_client.patch(
+            '/api/v1/users/anna/', {'email': 'ANNA@yamdb.fake'}
+        )
+        assert response.status_code == 200
+        response = admin_client.patch(
+            '/api/v1/users/anna/', {'email': 'Andrey@Mail.fake'}
+        )
+        assert response.status_code == 400
+
+    def test_other_integrity_errors_raised(self, people, monkeypatch):
+        def save(self, **kwargs):
+            raise IntegrityError(
+                'NOT NULL constraint failed: users_customuser.username'
+            )
+
+        monkeypatch.setattr(serializers.ModelSerializer, 'save', save)
+        serializer = UserSerializer(
+            data={'username': 'vera', 'email': 'vera@yamdb.fake'}
+        )
+        assert serializer.is_valid()
+        with pytest.raises(IntegrityError):
+            serializer.save()
@@ -1,6 +1,38 @@
 from django.contrib import admin
+from django.db.models import Q
 
 from titles.models import Category, Comment, Genre, Review, Title
+from titles.paginators import EstimatedCountPaginator
+
+
+class IndexedSearchMixin:
+    """
+    Поиск только по индексированным полям: точное совпадение с одним из
+    indexed_search_fields или с первичным ключом. Поиск LIKE по тексту
+    больших таблиц не используется.
+    """
+    indexed_search_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        condition = Q()
+        for field in self.indexed_search_fields:
+            condition |= Q(**{field: search_term})
+        if search_term.isdigit():
+            condition |= Q(pk=int(search_term))
+        return queryset.filter(condition), False
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Настройки списка для таблиц с миллионами строк: приблизительное число
+    записей и навигация по индексу pub_date.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    date_hierarchy = 'pub_date'
 
 
 class CategoryAdmin(admin.ModelAdmin):
@@ -17,21 +49,29 @@ class GenreAdmin(admin.ModelAdmin):
 
 class TitleAdmin(admin.ModelAdmin):
     list_display = ("pk", "name", "year", "description", 'category')
-    search_fields = ("name",)
+    list_select_related = ('category',)
+    search_fields = ("^name",)
+    autocomplete_fields = ('category', 'genre')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
 
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(IndexedSearchMixin, LargeTableAdmin):
     list_display = ('text', 'pub_date', 'author')
-    search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_select_related = ('author',)
+    search_fields = ('author__username',)
+    indexed_search_fields = ('author__username',)
+    raw_id_fields = ('author', 'title')
     empty_value_display = '-пусто-'
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(IndexedSearchMixin, LargeTableAdmin):
     list_display = ('text', 'pub_date', 'author', 'review')
-    search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_select_related = ('author', 'review__author')
+    search_fields = ('author__username',)
+    indexed_search_fields = ('author__username',)
+    raw_id_fields = ('author', 'review')
     empty_value_display = '-пусто-'
 
 
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class TitlesConfig(AppConfig):
     name = 'titles'
     verbose_name = 'Произведения'
+
+    def ready(self):
+        import titles.signals  # noqa: F401
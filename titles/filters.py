@@ -1,16 +1,75 @@
 from django_filters import rest_framework as filters
-from titles.models import Title
+from rest_framework.filters import OrderingFilter
+from titles.models import Comment, Review, Title
+from titles.taxonomy import get_taxonomy
 
 
 class TitleFilter(filters.FilterSet):
     """
     Фильтр по полю slug у связанных таблиц Category и Genre, а так же по полю
     name таблицы Title без учета регистра.
+    slug переводится в id через кэш категорий и жанров, поэтому таблицы
+    Category и Genre в запрос не попадают.
     """
-    genre = filters.CharFilter(field_name='genre__slug')
-    category = filters.CharFilter(field_name='category__slug')
+    genre = filters.CharFilter(method='filter_genre')
+    category = filters.CharFilter(method='filter_category')
     name = filters.CharFilter(field_name='name', lookup_expr='icontains')
 
     class Meta:
         model = Title
         fields = ('genre', 'category', 'name', 'year',)
+
+    def filter_genre(self, queryset, name, value):
+        genre = get_taxonomy().genres_by_slug.get(value)
+        if genre is None:
+            return queryset.none()
+        return queryset.filter(genre=genre.pk)
+
+    def filter_category(self, queryset, name, value):
+        category = get_taxonomy().categories_by_slug.get(value)
+        if category is None:
+            return queryset.none()
+        return queryset.filter(category_id=category.pk)
+
+
+class ReviewSearchFilter(filters.FilterSet):
+    """
+    Фильтры поиска по отзывам: произведение, автор и интервал дат
+    публикации.
+    """
+    title = filters.NumberFilter(field_name='title_id')
+    author = filters.CharFilter(field_name='author__username')
+    since = filters.DateTimeFilter(field_name='pub_date', lookup_expr='gte')
+    until = filters.DateTimeFilter(field_name='pub_date', lookup_expr='lte')
+
+    class Meta:
+        model = Review
+        fields = ('title', 'author', 'since', 'until')
+
+
+class CommentSearchFilter(ReviewSearchFilter):
+    """
+    Фильтры поиска по комментариям: те же, что у отзывов, и отзыв.
+    """
+    title = filters.NumberFilter(field_name='review__title_id')
+    review = filters.NumberFilter(field_name='review_id')
+
+    class Meta:
+        model = Comment
+        fields = ('title', 'review', 'author', 'since', 'until')
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    Сортировка с добавлением id в конец, чтобы порядок записей с
+    одинаковыми значениями не менялся между страницами.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        if any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            return ordering
+        direction = '-' if ordering[-1].startswith('-') else ''
+        return (*ordering, f'{direction}id')
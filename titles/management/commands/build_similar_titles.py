@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from titles.similarity import get_builder
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает похожие произведения (таблица SimilarTitle) по '
+        'жанрам и общим авторам отзывов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--review-weight', type=float, default=0.7)
+        parser.add_argument('--genre-weight', type=float, default=0.3)
+        parser.add_argument(
+            '--max-user-reviews', type=int, default=1000,
+            help='Авторы с большим числом отзывов не учитываются.',
+        )
+        parser.add_argument(
+            '--genre-candidates', type=int, default=50,
+            help='Сколько самых обсуждаемых произведений жанра '
+                 'рассматривать как кандидатов.',
+        )
+        parser.add_argument(
+            '--backend', choices=('auto', 'scipy', 'python'),
+            default='auto',
+        )
+
+    def handle(self, *args, **options):
+        builder = get_builder(
+            backend=options['backend'],
+            top=options['top'],
+            review_weight=options['review_weight'],
+            genre_weight=options['genre_weight'],
+            max_user_reviews=options['max_user_reviews'],
+            genre_candidates=options['genre_candidates'],
+        )
+
+        def progress(done, total):
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{done}/{total}')
+
+        builder.build(chunk_size=options['chunk_size'], progress=progress)
+        self.stdout.write(
+            self.style.SUCCESS('Похожие произведения пересчитаны')
+        )
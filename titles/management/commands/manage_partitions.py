@@ -0,0 +1,63 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from titles import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Создает секции таблиц отзывов и комментариев на месяцы вперед и '
+        'архивирует старые секции (только PostgreSQL).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert', action='store_true',
+            help='Секционировать таблицы, если это еще не сделано.',
+        )
+        parser.add_argument(
+            '--months-ahead', type=int,
+            default=settings.PARTITION_MONTHS_AHEAD,
+        )
+        parser.add_argument(
+            '--archive-after', type=int, default=None,
+            help='Архивировать секции старше этого числа месяцев.',
+        )
+        parser.add_argument(
+            '--tablespace', default=settings.PARTITION_ARCHIVE_TABLESPACE,
+            help='Табличное пространство для архивных секций.',
+        )
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError(
+                'Секционирование поддерживается только в PostgreSQL'
+            )
+        if options['convert']:
+            for table in partitions.convert(
+                connection, options['months_ahead']
+            ):
+                self.stdout.write(f'Секционирована таблица {table}')
+        created = 0
+        with connection.cursor() as cursor:
+            for table in partitions.TABLES:
+                if not partitions.is_partitioned(cursor, table):
+                    raise CommandError(
+                        f'Таблица {table} не секционирована, запустите '
+                        f'команду с --convert'
+                    )
+                created += partitions.create_partitions(
+                    cursor, table, date.today(),
+                    options['months_ahead'],
+                )
+        self.stdout.write(f'Создано секций: {created}')
+        if options['archive_after'] is not None:
+            archived = partitions.archive(
+                connection, options['archive_after'], options['tablespace']
+            )
+            self.stdout.write(f'Архивировано секций: {len(archived)}')
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from titles.models import Title
+from titles.purge import BATCH_SIZE, purge_title, purge_user
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет произведения и пользователей, помеченных удаленными, '
+        'вместе с отзывами и комментариями, пачками без воркера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        titles = Title.all_objects.filter(is_deleted=True)
+        for title_id in titles.values_list('pk', flat=True):
+            purge_title(title_id, batch_size)
+        users = get_user_model().all_objects.filter(is_deleted=True)
+        for user_id in users.values_list('pk', flat=True):
+            purge_user(user_id, batch_size)
+        self.stdout.write(self.style.SUCCESS('Готово'))
@@ -0,0 +1,61 @@
+import math
+
+from django.core.management.base import BaseCommand
+
+from titles.models import Review, Title
+from titles.signals import review_aggregates, title_aggregates
+
+
+def differs(stored, actual):
+    if stored is None or actual is None:
+        return stored is not actual
+    return not math.isclose(stored, actual, rel_tol=1e-9)
+
+
+def reconcile(model, aggregates, batch_size):
+    """
+    Сверяет хранимые счетчики с данными пачками по batch_size строк и
+    пересчитывает только расходящиеся строки. Возвращает их число.
+    """
+    names = list(aggregates())
+    fixed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            model.objects.filter(pk__gt=last_pk).order_by('pk')
+            .annotate(**{
+                f'actual_{name}': expression
+                for name, expression in aggregates().items()
+            })
+            .values('pk', *names, *(f'actual_{name}' for name in names))
+            [:batch_size]
+        )
+        if not batch:
+            return fixed
+        last_pk = batch[-1]['pk']
+        wrong = [
+            row['pk'] for row in batch
+            if any(
+                differs(row[name], row[f'actual_{name}']) for name in names
+            )
+        ]
+        if wrong:
+            fixed += model.objects.filter(pk__in=wrong).update(**aggregates())
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет и исправляет хранимые счетчики: рейтинг, число отзывов и '
+        'сумму оценок произведений, число комментариев отзывов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        titles = reconcile(Title, title_aggregates, batch_size)
+        reviews = reconcile(Review, review_aggregates, batch_size)
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено произведений: {titles}, отзывов: {reviews}'
+        ))
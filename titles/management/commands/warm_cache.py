@@ -0,0 +1,83 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+
+from api_yamdb import page_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Заранее отрисовывает в кэш страниц популярные списки: адреса из '
+        'PAGE_CACHE_WARM_PATHS, самые частые из access-логов nginx, список '
+        'произведений по каждому жанру и категории и отзывы самых '
+        'обсуждаемых произведений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=50,
+            help='Сколько адресов брать из логов и сколько произведений '
+                 'с наибольшим числом отзывов.',
+        )
+        parser.add_argument(
+            '--access-log', action='append', default=[],
+            help='access-лог nginx; можно указать несколько раз.',
+        )
+        parser.add_argument(
+            '--path', action='append', default=[],
+            help='Дополнительный адрес, например /api/v1/titles/?year=2020.',
+        )
+        parser.add_argument(
+            '--no-defaults', action='store_true',
+            help='Не прогревать жанры, категории и популярные отзывы.',
+        )
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument(
+            '--host', default=settings.EDGE_CACHE_HOST,
+            help='Публичное имя сайта (по умолчанию EDGE_CACHE_HOST): от '
+                 'него зависят ключи кэша и ссылки next/previous.',
+        )
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Не пересчитывать страницы, которые уже есть в кэше.',
+        )
+
+    def handle(self, *args, **options):
+        if not options['host']:
+            # Страница под другим Host лежит под другим ключом, и прогрев
+            # не попал бы в запросы посетителей.
+            raise CommandError(
+                'Укажите публичное имя сайта: --host или EDGE_CACHE_HOST'
+            )
+        if not page_cache.is_enabled():
+            self.stderr.write('Кэш страниц выключен (PAGE_CACHE_TTL=0)')
+            return
+        if isinstance(caches['default'], LocMemCache):
+            self.stderr.write(self.style.WARNING(
+                'LocMemCache не общий для процессов: прогрев не будет '
+                'виден серверу приложения.'
+            ))
+        paths = [*settings.PAGE_CACHE_WARM_PATHS, *options['path']]
+        paths += page_cache.access_log_paths(
+            options['access_log'], options['top']
+        )
+        if not options['no_defaults']:
+            paths += page_cache.default_paths(options['top'])
+
+        started = time.perf_counter()
+        results = page_cache.warm(
+            paths, options['host'], options['workers'],
+            refresh=not options['keep'],
+        )
+        for path, status, elapsed in results:
+            if options['verbosity'] > 1 or status != 200:
+                self.stdout.write(f'{status} {elapsed * 1000:.0f} мс {path}')
+        self.stdout.write(self.style.SUCCESS(
+            'Прогрето страниц: {} за {:.1f} с'.format(
+                sum(status == 200 for _, status, _ in results),
+                time.perf_counter() - started,
+            )
+        ))
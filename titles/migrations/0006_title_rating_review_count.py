@@ -0,0 +1,58 @@
+# Generated by Django 3.0.5 on 2026-10-19 18:02
+
+from django.db import migrations, models
+from django.db.models import Avg, Count
+
+
+def fill_title_rating(apps, schema_editor):
+    Title = apps.get_model('titles', 'Title')
+    titles = Title.objects.annotate(
+        avg_score=Avg('reviews__score'),
+        reviews_total=Count('reviews'),
+    )
+    for title in titles.order_by('pk').iterator():
+        Title.objects.filter(pk=title.pk).update(
+            rating=title.avg_score,
+            review_count=title.reviews_total,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0005_auto_20200730_2122'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='title',
+            options={'ordering': ('id',), 'verbose_name': 'Произведение', 'verbose_name_plural': 'Произведения'},
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['rating', 'id'], name='title_rating_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['review_count', 'id'], name='title_review_count_id_idx'),
+        ),
+        migrations.RunPython(fill_title_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.0.5 on 2026-10-19 18:31
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('titles', '0006_title_rating_review_count'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='review',
+            unique_together={('author', 'title')},
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.0.5 on 2026-10-19 21:40
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_score_sum(apps, schema_editor):
+    Title = apps.get_model('titles', 'Title')
+    Review = apps.get_model('titles', 'Review')
+    scores = Review.objects.filter(title=OuterRef('pk')).order_by()
+    scores = scores.values('title').annotate(total=Sum('score'))
+    Title.objects.update(
+        score_sum=Coalesce(Subquery(scores.values('total')), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0007_review_unique_author_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_score_sum, migrations.RunPython.noop),
+    ]
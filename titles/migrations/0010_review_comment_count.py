@@ -0,0 +1,31 @@
+# Generated by Django 3.0.5 on 2026-10-20 10:15
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_count(apps, schema_editor):
+    Review = apps.get_model('titles', 'Review')
+    Comment = apps.get_model('titles', 'Comment')
+    comments = Comment.objects.filter(review=OuterRef('pk')).order_by()
+    comments = comments.values('review').annotate(cnt=Count('id'))
+    Review.objects.update(
+        comment_count=Coalesce(Subquery(comments.values('cnt')), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0009_similartitle'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
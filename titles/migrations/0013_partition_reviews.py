@@ -0,0 +1,29 @@
+# Generated by Django 3.0.5 on 2026-10-20 18:10
+
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_tables(apps, schema_editor):
+    """
+    Секционирование включается настройкой PARTITION_REVIEWS и работает
+    только в PostgreSQL; позже его можно включить командой
+    manage_partitions --convert.
+    """
+    from titles import partitions
+
+    connection = schema_editor.connection
+    if connection.vendor != 'postgresql' or not settings.PARTITION_REVIEWS:
+        return
+    partitions.convert(connection, settings.PARTITION_MONTHS_AHEAD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0012_title_is_deleted'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.0.5 on 2026-10-21 10:20
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    GIN-индекс для полнотекстового поиска в PostgreSQL или таблицы FTS4
+    в SQLite, см. titles.search.
+    """
+    from titles import search
+
+    vendor = schema_editor.connection.vendor
+    for table in search.SEARCH_TABLES:
+        if vendor == 'postgresql':
+            statements = search.postgresql_sql(table)
+        elif vendor == 'sqlite':
+            statements = search.sqlite_sql(table)
+        else:
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    from titles import search
+
+    vendor = schema_editor.connection.vendor
+    for table in search.SEARCH_TABLES:
+        if vendor == 'postgresql':
+            schema_editor.execute(
+                f'DROP INDEX IF EXISTS {table}_text_fts_idx'
+            )
+        elif vendor == 'sqlite':
+            for suffix in ('bu', 'bd', 'au', 'ai'):
+                schema_editor.execute(
+                    f'DROP TRIGGER IF EXISTS {table}_fts_{suffix}'
+                )
+            schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('titles', '0013_partition_reviews'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
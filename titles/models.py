@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import F
 
 from titles.validators import validate_year
 
@@ -37,6 +38,15 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleManager(models.Manager):
+    """
+    Произведения без помеченных удаленными, см. titles.purge.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class Title(models.Model):
     """
     Модель описывает произведения.
@@ -62,16 +72,73 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория',
     )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Рейтинг',
+    )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов',
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    is_deleted = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Удалено',
+    )
+
+    objects = TitleManager()
+    all_objects = models.Manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        ordering = ('id',)
+        # Каждое поле сортировки дополнено id, чтобы постраничный вывод
+        # был детерминированным и сортировка шла по индексу.
+        indexes = [
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+            models.Index(fields=('year', 'id'), name='title_year_id_idx'),
+            models.Index(fields=('rating', 'id'), name='title_rating_id_idx'),
+            models.Index(
+                fields=('review_count', 'id'),
+                name='title_review_count_id_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
 
-class Review(models.Model):
+class RowLockMixin:
+
+    def lock(self, fields):
+        """
+        Блокирует строку до конца транзакции и возвращает значения fields
+        из базы или None, если строки уже нет. Прежние значения берутся
+        из заблокированной строки, а не из загруженного раньше объекта:
+        параллельный запрос мог изменить их после загрузки.
+        """
+        rows = type(self)._base_manager.using(
+            router.db_for_write(type(self), instance=self)
+        ).filter(pk=self.pk)
+        if not connections[rows.db].features.has_select_for_update:
+            # SQLite блокирует базу целиком и только при первой записи:
+            # транзакция, которая сначала читает, получает "database is
+            # locked" вместо ожидания. Пустой UPDATE берет блокировку
+            # записи сразу.
+            rows.update(id=F('id'))
+        return rows.select_for_update().values_list(*fields).first()
+
+
+class Review(RowLockMixin, models.Model):
     """
     Модель описывает отзывы на произведения, которые оставляют пользователи.
     """
@@ -99,17 +166,66 @@ class Review(models.Model):
         db_index=True,
         verbose_name='Дата публикации',
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+
+    # Поля, изменение которых меняет агрегаты произведения.
+    AGGREGATE_FIELDS = frozenset({'score', 'title', 'title_id'})
 
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         unique_together = ('author', 'title')
+        indexes = [
+            # Лента отзывов пользователя, см. api.pagination.
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='review_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'Автор: {self.author}. Отзыв: {self.text[:20]}...'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Произведение и оценка на момент загрузки: по ним titles.signals
+        # считают изменение агрегатов произведения без чтения из базы.
+        instance._loaded_score = (
+            instance.__dict__.get('title_id'),
+            instance.__dict__.get('score'),
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Отзыв и агрегаты произведения меняются в одной транзакции.
+        with transaction.atomic(savepoint=False):
+            update_fields = kwargs.get('update_fields')
+            if not self._state.adding and (
+                update_fields is None
+                or self.AGGREGATE_FIELDS & set(update_fields)
+            ):
+                row = self.lock(('title_id', 'score'))
+                if row is not None:
+                    self._loaded_score = row
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            row = self.lock(('title_id', 'score'))
+            if row is None:
+                # Отзыв удалил параллельный запрос, он же уменьшил
+                # агрегаты произведения.
+                return 0, {}
+            self._loaded_score = row
+            return super().delete(*args, **kwargs)
+
 
-class Comment(models.Model):
+class Comment(RowLockMixin, models.Model):
     """
     Модель описывает комментарии к отзывам, которые оставляют пользователи.
     """
@@ -135,6 +251,75 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='comment_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'Автор: {self.author}. Комментарий: {self.text[:20]}...'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Отзыв на момент загрузки, см. Review.from_db.
+        instance._loaded_review_id = instance.__dict__.get('review_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Комментарий и счетчик отзыва меняются в одной транзакции.
+        with transaction.atomic(savepoint=False):
+            update_fields = kwargs.get('update_fields')
+            if not self._state.adding and (
+                update_fields is None
+                or {'review', 'review_id'} & set(update_fields)
+            ):
+                row = self.lock(('review_id',))
+                if row is not None:
+                    self._loaded_review_id = row[0]
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            row = self.lock(('review_id',))
+            if row is None:
+                return 0, {}
+            self._loaded_review_id = row[0]
+            return super().delete(*args, **kwargs)
+
+
+class SimilarTitle(models.Model):
+    """
+    Похожее произведение. Таблица заполняется командой
+    build_similar_titles: для каждого произведения хранится top-K соседей
+    по пересечению жанров и общим авторам отзывов.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='similar_titles',
+        verbose_name='Произведение',
+    )
+    similar = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='recommended_in',
+        verbose_name='Похожее произведение',
+    )
+    rank = models.PositiveSmallIntegerField(verbose_name='Место')
+    score = models.FloatField(verbose_name='Сходство')
+
+    class Meta:
+        verbose_name = 'Похожее произведение'
+        verbose_name_plural = 'Похожие произведения'
+        ordering = ('title', 'rank')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('title', 'rank'), name='similar_title_rank_uniq'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.title_id} -> {self.similar_id} ({self.score:.3f})'
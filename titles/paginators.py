@@ -0,0 +1,52 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для больших таблиц. Если выборка не отфильтрована, вместо
+    COUNT(*) берется оценка числа строк из статистики PostgreSQL.
+    Точный подсчет выполняется для небольших таблиц и на других СУБД.
+    Условие менеджера по умолчанию (например, is_deleted=False у
+    произведений) фильтром не считается: таких строк мало, и оценка по
+    всей таблице остается верной с той же точностью.
+    """
+    estimate_threshold = 100000
+
+    @cached_property
+    def count(self):
+        estimate = self.get_estimate()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def get_estimate(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql' or not is_unfiltered(queryset):
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return int(row[0]) if row else None
+
+
+def get_where_sql(queryset):
+    query = queryset.query
+    if not query.where:
+        return None
+    compiler = query.get_compiler(queryset.db)
+    sql, params = compiler.compile(query.where)
+    return sql, tuple(params)
+
+
+def is_unfiltered(queryset):
+    """
+    Выборка не содержит условий, кроме условий менеджера по умолчанию.
+    """
+    default = queryset.model._default_manager.using(queryset.db)
+    return get_where_sql(queryset) in (None, get_where_sql(default.all()))
@@ -0,0 +1,267 @@
+"""
+Секционирование таблиц отзывов и комментариев по pub_date (PostgreSQL).
+
+convert() превращает titles_review и titles_comment в таблицы,
+секционированные по месяцам: titles_review_p202610 и т.д., плюс секция
+titles_review_default для строк вне созданных диапазонов. Модели и
+запросы ORM не меняются: Django работает с родительской таблицей, а
+запросы с условием по pub_date читают только нужные секции.
+
+У секционированной таблицы есть ограничения:
+
+- первичный ключ включает ключ секционирования: (id, pub_date). id
+  по-прежнему выдается последовательностью и уникален;
+- уникальность (author, title) отзыва нельзя задать индексом, ее
+  проверяет триггер под advisory-блокировкой пары. Повтор дает ту же
+  ошибку unique_violation (IntegrityError), что и индекс;
+- на titles_review нельзя сослаться внешним ключом, поэтому ограничение
+  на titles_comment.review_id удаляется. Каскадное удаление комментариев
+  и так выполняет Django.
+
+Секции создаются заранее на months_ahead месяцев вперед. archive()
+переписывает секции старше archive_after месяцев компактно (fillfactor
+100, VACUUM FULL или перенос в табличное пространство tablespace),
+замораживает их и отключает для них autovacuum. Архивные секции остаются
+подключенными, поэтому ORM и вложенные эндпоинты их видят, а размер
+индексов и стоимость vacuum горячих секций не растут вместе с таблицей.
+"""
+import re
+from datetime import date, datetime, timezone
+
+from django.db import transaction
+
+TABLES = ('titles_review', 'titles_comment')
+ARCHIVED = 'archived'
+PARTITION_RE = re.compile(r'_p(\d{4})(\d{2})$')
+
+UNIQUE_TRIGGER = '''
+CREATE OR REPLACE FUNCTION titles_review_unique_author_title()
+RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(
+        hashtext('titles_review'),
+        hashtext(NEW.author_id::text || ':' || NEW.title_id::text)
+    );
+    IF (
+        SELECT count(*) FROM titles_review
+        WHERE author_id = NEW.author_id AND title_id = NEW.title_id
+    ) > 1 THEN
+        RAISE unique_violation USING
+            MESSAGE = 'duplicate review for author and title',
+            CONSTRAINT = 'titles_review_author_title_uniq';
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER titles_review_author_title_uniq
+AFTER INSERT OR UPDATE OF author_id, title_id ON titles_review
+FOR EACH ROW EXECUTE FUNCTION titles_review_unique_author_title();
+'''
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def bound(day):
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def partition_name(table, start):
+    return f'{table}_p{start:%Y%m}'
+
+
+def partition_month(name):
+    match = PARTITION_RE.search(name)
+    if match is None:
+        return None
+    return date(int(match[1]), int(match[2]), 1)
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        'SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass',
+        [table],
+    )
+    return cursor.fetchone() is not None
+
+
+def get_partitions(cursor, table):
+    """
+    Возвращает [(имя секции, комментарий)].
+    """
+    cursor.execute(
+        'SELECT c.relname, obj_description(c.oid, %s) FROM pg_inherits i '
+        'JOIN pg_class c ON c.oid = i.inhrelid '
+        'WHERE i.inhparent = %s::regclass ORDER BY c.relname',
+        ['pg_class', table],
+    )
+    return cursor.fetchall()
+
+
+def create_partition(cursor, table, start):
+    """
+    Создает секцию за месяц start. Строки этого месяца, уже попавшие в
+    секцию по умолчанию, переносятся в новую.
+    """
+    qn = cursor.db.ops.quote_name
+    name = partition_name(table, start)
+    cursor.execute('SELECT to_regclass(%s)', [name])
+    if cursor.fetchone()[0] is not None:
+        return False
+    bounds = [bound(start), bound(add_months(start, 1))]
+    with transaction.atomic(using=cursor.db.alias):
+        cursor.execute(
+            f'CREATE TABLE {qn(name)} (LIKE {qn(table)} '
+            f'INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {qn(table + "_default")} '
+            f'WHERE pub_date >= %s AND pub_date < %s RETURNING *) '
+            f'INSERT INTO {qn(name)} SELECT * FROM moved',
+            bounds,
+        )
+        cursor.execute(
+            f'ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            bounds,
+        )
+    return True
+
+
+def create_partitions(cursor, table, first, months_ahead):
+    """
+    Создает недостающие секции с месяца first по текущий месяц плюс
+    months_ahead. Возвращает число созданных.
+    """
+    last = add_months(month_start(date.today()), months_ahead)
+    start = month_start(first)
+    created = 0
+    while start <= last:
+        created += create_partition(cursor, table, start)
+        start = add_months(start, 1)
+    return created
+
+
+def convert_table(cursor, table, months_ahead):
+    qn = cursor.db.ops.quote_name
+    # Уникальные индексы (первичный ключ и unique_together) на
+    # секционированной таблице должны включать pub_date и заменяются.
+    cursor.execute(
+        'SELECT indexdef FROM pg_indexes WHERE schemaname = '
+        "current_schema() AND tablename = %s AND indexdef NOT LIKE "
+        "'CREATE UNIQUE %%'",
+        [table],
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f' "
+        "AND confrelid::regclass::text NOT IN %s",
+        [table, TABLES],
+    )
+    foreign_keys = cursor.fetchall()
+    cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [table, 'id'])
+    sequence = cursor.fetchone()[0]
+    cursor.execute(f'SELECT min(pub_date) FROM {qn(table)}')
+    first = cursor.fetchone()[0] or date.today()
+
+    old, new = qn(f'{table}_old'), qn(f'{table}_new')
+    cursor.execute(
+        f'CREATE TABLE {new} (LIKE {qn(table)} INCLUDING DEFAULTS '
+        f'INCLUDING CONSTRAINTS) PARTITION BY RANGE (pub_date)'
+    )
+    cursor.execute(f'ALTER TABLE {new} ADD PRIMARY KEY (id, pub_date)')
+    cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY NONE')
+    cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {old}')
+    cursor.execute(f'ALTER TABLE {new} RENAME TO {qn(table)}')
+    cursor.execute(
+        f'CREATE TABLE {qn(table + "_default")} PARTITION OF {qn(table)} '
+        f'DEFAULT'
+    )
+    create_partitions(cursor, table, first, months_ahead)
+    cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {old}')
+    cursor.execute(f'DROP TABLE {old} CASCADE')
+    cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY {qn(table)}.id')
+    for indexdef in indexes:
+        cursor.execute(indexdef)
+    for name, definition in foreign_keys:
+        cursor.execute(
+            f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}'
+        )
+    if table == 'titles_review':
+        cursor.execute(
+            'CREATE INDEX titles_review_author_title_idx '
+            'ON titles_review (author_id, title_id)'
+        )
+        cursor.execute(UNIQUE_TRIGGER)
+
+
+def convert(connection, months_ahead=3):
+    """
+    Секционирует таблицы из TABLES, которые еще не секционированы.
+    Отзывы обрабатываются первыми: при этом удаляется внешний ключ
+    комментариев на отзывы.
+    """
+    converted = []
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            for table in TABLES:
+                if not is_partitioned(cursor, table):
+                    convert_table(cursor, table, months_ahead)
+                    converted.append(table)
+    return converted
+
+
+def archive_partition(cursor, name, tablespace=None):
+    """
+    Переписывает секцию компактно и замораживает ее. VACUUM нельзя
+    выполнять в транзакции, поэтому соединение должно быть в режиме
+    autocommit.
+    """
+    qn = cursor.db.ops.quote_name
+    cursor.execute(
+        f'ALTER TABLE {qn(name)} SET (fillfactor = 100, '
+        f'autovacuum_enabled = false, toast.autovacuum_enabled = false)'
+    )
+    if tablespace:
+        cursor.execute(
+            f'ALTER TABLE {qn(name)} SET TABLESPACE {qn(tablespace)}'
+        )
+        cursor.execute(
+            'SELECT indexname FROM pg_indexes WHERE schemaname = '
+            'current_schema() AND tablename = %s',
+            [name],
+        )
+        for (index,) in cursor.fetchall():
+            cursor.execute(
+                f'ALTER INDEX {qn(index)} SET TABLESPACE {qn(tablespace)}'
+            )
+    else:
+        cursor.execute(f'VACUUM FULL {qn(name)}')
+    cursor.execute(f'VACUUM (FREEZE, ANALYZE) {qn(name)}')
+    cursor.execute(f'COMMENT ON TABLE {qn(name)} IS %s', [ARCHIVED])
+
+
+def archive(connection, archive_after, tablespace=None):
+    """
+    Архивирует секции, месяц которых закончился раньше чем archive_after
+    месяцев назад. Возвращает имена архивированных секций.
+    """
+    cutoff = add_months(month_start(date.today()), -archive_after)
+    archived = []
+    with connection.cursor() as cursor:
+        for table in TABLES:
+            for name, comment in get_partitions(cursor, table):
+                month = partition_month(name)
+                if comment == ARCHIVED or month is None or month >= cutoff:
+                    continue
+                archive_partition(cursor, name, tablespace)
+                archived.append(name)
+    return archived
@@ -0,0 +1,190 @@
+"""
+Удаление произведений и пользователей с большим числом отзывов.
+
+Обычный delete() загружает в память все каскадно удаляемые отзывы и
+комментарии, чтобы отправить по ним сигналы. Вместо этого soft_delete()
+помечает строку is_deleted, после чего менеджеры objects ее не видят, и
+ставит в очередь задачу titles.tasks.purge_title или purge_user.
+
+Задача удаляет комментарии и отзывы пачками по batch_size строк
+запросами DELETE ... WHERE id IN (...), без загрузки объектов и без
+сигналов. Счетчики, которые поддерживают сигналы (число комментариев
+отзыва, число отзывов, сумма оценок и рейтинг произведения), пересчитываются
+для каждой пачки в ее транзакции, там же сбрасывается кэш затронутых
+страниц. В конце сама строка удаляется обычным delete(): оставшиеся
+связи уже небольшие.
+
+Без воркера очередь можно разобрать командой purge_deleted.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+
+from api_yamdb import edge_cache, page_cache
+from jobs.registry import enqueue
+from titles.models import Comment, Review, SimilarTitle, Title
+from titles.signals import change_comment_count, change_title_scores
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+
+def raw_delete(queryset):
+    """
+    Удаляет строки одним запросом без загрузки объектов и сигналов.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def invalidate_titles(title_ids):
+    """
+    Сбрасывает кэш списка произведений, самих произведений и их отзывов.
+    """
+    keys, groups = ['titles'], ['titles']
+    for title_id in title_ids:
+        title = f'titles/{title_id}'
+        keys += [title, f'{title}/reviews']
+        groups.append(f'{title}/reviews')
+    edge_cache.invalidate(*keys)
+    page_cache.invalidate(*groups)
+
+
+def invalidate_reviews(reviews):
+    """
+    Сбрасывает кэш отзывов и комментариев по парам (title_id, review_id).
+    """
+    keys, groups = [], []
+    for title_id, review_id in reviews:
+        group = f'titles/{title_id}/reviews'
+        keys += [group, f'{group}/{review_id}/comments']
+        groups.append(group)
+    edge_cache.invalidate(*keys)
+    page_cache.invalidate(*dict.fromkeys(groups))
+
+
+def delete_in_batches(queryset, batch_size):
+    """
+    Удаляет строки queryset пачками, каждую в своей транзакции.
+    """
+    deleted = 0
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        with transaction.atomic():
+            deleted += raw_delete(queryset.model.objects.filter(pk__in=pks))
+
+
+def delete_reviews(review_ids):
+    """
+    Удаляет отзывы с комментариями и вычитает их оценки из агрегатов
+    произведений.
+    """
+    with transaction.atomic():
+        totals = (
+            Review.objects.filter(pk__in=review_ids).order_by()
+            .values('title_id').annotate(count=Count('id'), total=Sum('score'))
+        )
+        totals = list(totals)
+        raw_delete(Comment.objects.filter(review_id__in=review_ids))
+        raw_delete(Review.objects.filter(pk__in=review_ids))
+        for row in totals:
+            change_title_scores(row['title_id'], -row['total'], -row['count'])
+        # Сигналов нет, поэтому кэш сбрасывается здесь.
+        invalidate_titles(row['title_id'] for row in totals)
+
+
+def purge_title(title_id, batch_size=BATCH_SIZE):
+    title = Title.all_objects.filter(pk=title_id, is_deleted=True).first()
+    if title is None:
+        return
+    delete_in_batches(
+        Comment.objects.filter(review__title_id=title_id), batch_size
+    )
+    # Агрегаты удаляемого произведения не пересчитываются.
+    delete_in_batches(Review.objects.filter(title_id=title_id), batch_size)
+    # Произведение пропадает из похожих у других произведений.
+    recommended_in = list(
+        SimilarTitle.objects.filter(similar_id=title_id)
+        .values_list('title_id', flat=True)
+    )
+    delete_in_batches(
+        SimilarTitle.objects.filter(
+            Q(title_id=title_id) | Q(similar_id=title_id)
+        ),
+        batch_size,
+    )
+    edge_cache.invalidate(*(f'titles/{pk}/similar' for pk in recommended_in))
+    title.delete()
+
+
+def purge_user(user_id, batch_size=BATCH_SIZE):
+    user = User.all_objects.filter(pk=user_id, is_deleted=True).first()
+    if user is None:
+        return
+    comments = Comment.objects.filter(author_id=user_id)
+    while True:
+        pks = list(comments.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        with transaction.atomic():
+            counts = (
+                Comment.objects.filter(pk__in=pks).order_by()
+                .values('review_id', 'review__title_id')
+                .annotate(count=Count('id'))
+            )
+            counts = list(counts)
+            raw_delete(Comment.objects.filter(pk__in=pks))
+            for row in counts:
+                change_comment_count(row['review_id'], -row['count'])
+            invalidate_reviews(
+                (row['review__title_id'], row['review_id']) for row in counts
+            )
+
+    reviews = Review.objects.filter(author_id=user_id)
+    while True:
+        pks = list(reviews.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+        # Комментарии других пользователей к этим отзывам удаляются
+        # заранее пачками, чтобы транзакция delete_reviews была короткой.
+        delete_in_batches(
+            Comment.objects.filter(review_id__in=pks), batch_size
+        )
+        delete_reviews(pks)
+    user.delete()
+
+
+def soft_delete(obj):
+    """
+    Скрывает произведение или пользователя и ставит в очередь удаление
+    связанных строк. Логин и email пользователя освобождаются сразу.
+    """
+    model = type(obj)
+    with transaction.atomic():
+        if model is Title:
+            Title.all_objects.filter(pk=obj.pk).update(is_deleted=True)
+            task, key = 'titles.tasks.purge_title', f'purge:title:{obj.pk}'
+            payload = {'title_id': obj.pk}
+            # update() не отправляет сигналов titles.signals.
+            invalidate_titles([obj.pk])
+        else:
+            User.all_objects.filter(pk=obj.pk).update(
+                is_deleted=True, is_active=False,
+                username=f'deleted-{obj.pk}', email='',
+            )
+            task, key = 'titles.tasks.purge_user', f'purge:user:{obj.pk}'
+            payload = {'user_id': obj.pk}
+            # Отзывы и комментарии пользователя показываются под новым
+            # именем до их удаления.
+            invalidate_reviews({
+                *Review.objects.filter(author_id=obj.pk).values_list(
+                    'title_id', 'pk'
+                ),
+                *Comment.objects.filter(author_id=obj.pk).values_list(
+                    'review__title_id', 'review_id'
+                ),
+            })
+        enqueue(task, payload, key=key)
+    obj.is_deleted = True
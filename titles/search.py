@@ -0,0 +1,109 @@
+"""
+Полнотекстовый поиск по тексту отзывов и комментариев.
+
+В PostgreSQL запрос идет по GIN-индексу на to_tsvector(SEARCH_CONFIG,
+text) из миграции titles 0014: выражение TsVector совпадает с
+выражением индекса, поэтому планировщик его использует. Релевантность -
+ts_rank. Ранжирование считается только для найденных строк, поэтому
+запрос быстрый, пока слова достаточно редкие; для частых слов стоит
+сужать поиск фильтрами.
+
+В SQLite (тесты и локальная разработка) используется таблица FTS4
+{table}_fts, которую миграция заполняет и поддерживает триггерами, а
+релевантность - число вхождений слов запроса. FTS5 здесь не подходит:
+запись в нее из триггера сначала читает индекс, и при параллельной
+записи SQLite сразу отвечает "database is locked", не дожидаясь
+блокировки. Слова запроса в обоих случаях объединяются через И.
+"""
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField
+)
+from django.db import connections
+from django.db.models import FloatField, Func
+from django.db.models.expressions import RawSQL
+
+SEARCH_CONFIG = 'russian'
+SEARCH_TABLES = ('titles_review', 'titles_comment')
+
+
+class TsVector(Func):
+    function = 'to_tsvector'
+    template = f"%(function)s('{SEARCH_CONFIG}'::regconfig, %(expressions)s)"
+    output_field = SearchVectorField()
+
+
+def fts_match(query):
+    """
+    Запрос FTS, в котором каждое слово - фраза в кавычках, чтобы
+    операторы FTS во вводе пользователя не обрабатывались.
+    """
+    return ' '.join(
+        '"{}"'.format(word.replace('"', '""')) for word in query.split()
+    )
+
+
+def search(queryset, query):
+    """
+    Возвращает строки queryset, текст которых содержит все слова query,
+    с релевантностью в аннотации rank.
+    """
+    model = queryset.model
+    table = model._meta.db_table
+    if connections[queryset.db].vendor == 'postgresql':
+        search_query = SearchQuery(query, config=SEARCH_CONFIG)
+        return queryset.annotate(
+            document=TsVector('text'),
+            rank=SearchRank(TsVector('text'), search_query),
+        ).filter(document=search_query)
+    fts = f'{table}_fts'
+    match = fts_match(query)
+    # offsets() перечисляет найденные вхождения слов по четыре числа на
+    # каждое, их количество и служит релевантностью.
+    occurrences = (
+        f"(length(offsets({fts})) - "
+        f"length(replace(offsets({fts}), ' ', '')) + 1) / 4.0"
+    )
+    return queryset.filter(
+        id__in=RawSQL(
+            f'SELECT docid FROM {fts} WHERE {fts} MATCH %s', [match]
+        )
+    ).annotate(rank=RawSQL(
+        f'SELECT {occurrences} FROM {fts} '
+        f'WHERE {fts} MATCH %s AND docid = {table}.id',
+        [match],
+        output_field=FloatField(),
+    ))
+
+
+def postgresql_sql(table):
+    """
+    SQL миграции titles 0014 для PostgreSQL: GIN-индекс по выражению.
+    """
+    return [
+        f"CREATE INDEX IF NOT EXISTS {table}_text_fts_idx ON {table} "
+        f"USING gin (to_tsvector('{SEARCH_CONFIG}'::regconfig, text))",
+    ]
+
+
+def sqlite_sql(table):
+    """
+    SQL миграции titles 0014 для SQLite: таблица FTS4 с внешним
+    содержимым и триггеры, которые поддерживают ее в актуальном виде.
+    """
+    fts = f'{table}_fts'
+    delete = f'DELETE FROM {fts} WHERE docid = old.id;'
+    insert = f'INSERT INTO {fts}(docid, text) VALUES (new.id, new.text);'
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts4(text, content='{table}', "
+        f"tokenize=unicode61)",
+        f'CREATE TRIGGER {fts}_bu BEFORE UPDATE OF text ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER {fts}_bd BEFORE DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER {fts}_au AFTER UPDATE OF text ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert} END',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
@@ -0,0 +1,209 @@
+from django.db import transaction
+from django.db.models import Avg, Count, F, FloatField, OuterRef, Subquery, Sum
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api_yamdb import edge_cache, page_cache
+from titles.models import Category, Comment, Genre, Review, Title
+from titles.taxonomy import invalidate_taxonomy
+
+
+def title_aggregates():
+    """
+    Выражения для пересчета хранимых агрегатов произведения по всем его
+    отзывам в запросе UPDATE.
+    """
+    reviews = Review.objects.filter(title=OuterRef('pk')).order_by()
+    reviews = reviews.values('title')
+    return {
+        'rating': Subquery(
+            reviews.annotate(avg=Avg('score')).values('avg')
+        ),
+        'review_count': Coalesce(
+            Subquery(reviews.annotate(cnt=Count('id')).values('cnt')),
+            0,
+        ),
+        'score_sum': Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0,
+        ),
+    }
+
+
+def review_aggregates():
+    """
+    Выражения для пересчета хранимого количества комментариев отзыва.
+    """
+    comments = Comment.objects.filter(review=OuterRef('pk')).order_by()
+    comments = comments.values('review')
+    return {
+        'comment_count': Coalesce(
+            Subquery(comments.annotate(cnt=Count('id')).values('cnt')),
+            0,
+        ),
+    }
+
+
+def update_title_rating(title_id):
+    """
+    Пересчитывает хранимые рейтинг, количество отзывов и сумму оценок
+    произведения по всем его отзывам одним запросом UPDATE.
+    """
+    Title.objects.filter(pk=title_id).update(**title_aggregates())
+
+
+def change_title_scores(title_id, score, count):
+    """
+    Прибавляет score к сумме оценок и count к количеству отзывов
+    произведения. Рейтинг считается в том же UPDATE из прежних значений
+    колонок, поэтому строка не читается и параллельные отзывы не
+    теряются.
+    """
+    Title.objects.filter(pk=title_id).update(
+        score_sum=F('score_sum') + score,
+        review_count=F('review_count') + count,
+        rating=(
+            Cast(F('score_sum') + score, FloatField())
+            / NullIf(F('review_count') + count, 0)
+        ),
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, update_fields=None, **kwargs):
+    loaded = getattr(instance, '_loaded_score', None)
+    if created:
+        change_title_scores(instance.title_id, instance.score, 1)
+    elif update_fields is not None and not Review.AGGREGATE_FIELDS & set(
+        update_fields
+    ):
+        return
+    elif loaded is None or None in loaded:
+        # Прежняя оценка неизвестна (объект создан не из базы или поле
+        # было отложено), пересчитываем агрегаты полностью.
+        update_title_rating(instance.title_id)
+    elif loaded[0] != instance.title_id:
+        change_title_scores(loaded[0], -loaded[1], -1)
+        change_title_scores(instance.title_id, instance.score, 1)
+    elif loaded[1] != instance.score:
+        change_title_scores(instance.title_id, instance.score - loaded[1], 0)
+    instance._loaded_score = (instance.title_id, instance.score)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    loaded = getattr(instance, '_loaded_score', None)
+    if loaded is None or None in loaded:
+        update_title_rating(instance.title_id)
+    else:
+        change_title_scores(loaded[0], -loaded[1], -1)
+
+
+def change_comment_count(review_id, count):
+    Review.objects.filter(pk=review_id).update(
+        comment_count=F('comment_count') + count
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    loaded = getattr(instance, '_loaded_review_id', None)
+    if created:
+        change_comment_count(instance.review_id, 1)
+    elif loaded is not None and loaded != instance.review_id:
+        change_comment_count(loaded, -1)
+        change_comment_count(instance.review_id, 1)
+    instance._loaded_review_id = instance.review_id
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    # При каскадном удалении отзыва UPDATE затрагивает строку, которая
+    # будет удалена следом в той же транзакции.
+    change_comment_count(
+        getattr(instance, '_loaded_review_id', None) or instance.review_id,
+        -1,
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def taxonomy_changed(sender, instance, **kwargs):
+    """
+    Версия меняется сразу и еще раз после коммита: процесс, который успел
+    перечитать таблицы до коммита, получит новые данные при следующем
+    обращении.
+    """
+    invalidate_taxonomy()
+    transaction.on_commit(invalidate_taxonomy)
+    # Категории и жанры выводятся и в списке произведений.
+    page_cache.invalidate('titles')
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def title_changed(sender, instance, **kwargs):
+    edge_cache.invalidate('titles', f'titles/{instance.pk}')
+    page_cache.invalidate('titles')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    """
+    Жанры записываются после post_save произведения, поэтому список,
+    закэшированный между этими запросами, показывал бы прежние жанры.
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        page_cache.invalidate('titles')
+    if reverse and action == 'pre_clear':
+        # Произведения жанра известны только до удаления связей.
+        title_ids = instance.titles.values_list('pk', flat=True)
+    elif reverse and action in ('post_add', 'post_remove'):
+        title_ids = pk_set
+    elif not reverse and action in ('post_add', 'post_remove', 'post_clear'):
+        title_ids = [instance.pk]
+    else:
+        return
+    edge_cache.invalidate('titles', *(f'titles/{pk}' for pk in title_ids))
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def review_changed(sender, instance, **kwargs):
+    # Меняются рейтинг и число отзывов произведения.
+    title = f'titles/{instance.title_id}'
+    edge_cache.invalidate('titles', title, f'{title}/reviews')
+    page_cache.invalidate('titles', f'{title}/reviews')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    if not edge_cache.is_enabled() and not page_cache.is_enabled():
+        return
+    title_id = Review.objects.filter(
+        pk=instance.review_id
+    ).values_list('title_id', flat=True).first()
+    if title_id is None:
+        return
+    # В отзывах выводится число комментариев.
+    reviews = f'titles/{title_id}/reviews'
+    edge_cache.invalidate(
+        reviews, f'{reviews}/{instance.review_id}/comments'
+    )
+    page_cache.invalidate(reviews)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def taxonomy_edge_cache(sender, instance, **kwargs):
+    # Категории и жанры выводятся и в списке произведений.
+    edge_cache.invalidate(
+        'titles', 'categories' if sender is Category else 'genres'
+    )
@@ -0,0 +1,306 @@
+"""
+Расчет похожих произведений для таблицы SimilarTitle.
+
+Сходство произведений a и b:
+
+    score = review_weight * reviews_cos(a, b) + genre_weight * genres_cos(a, b)
+
+reviews_cos - косинус векторов "пользователь оставил отзыв" (число общих
+авторов отзывов, деленное на корень из произведения числа авторов),
+genres_cos - такой же косинус для множеств жанров. Авторы, у которых
+больше max_user_reviews отзывов, не учитываются: они почти ничего не
+говорят о сходстве и дают квадратичный рост числа пар.
+
+Кандидаты для произведения - все произведения с общими авторами отзывов и
+genre_candidates самых обсуждаемых произведений каждого его жанра.
+Расчет идет частями по chunk_size произведений, поэтому в памяти
+держатся только матрица отзывов и соседи текущей части.
+
+ScipySimilarityBuilder считает общих авторов произведением разреженных
+матриц и используется, если установлен scipy; PythonSimilarityBuilder
+дает тот же результат на словарях.
+"""
+import abc
+import math
+from array import array
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+
+from titles.models import Review, SimilarTitle, Title
+
+try:
+    import numpy
+    from scipy import sparse
+except ImportError:  # pragma: no cover
+    numpy = sparse = None
+
+# Оценки округляются, чтобы порядок при равенстве (по id) не зависел от
+# погрешности вычислений.
+SCORE_DIGITS = 6
+
+
+class SimilarityBuilder(abc.ABC):
+    """
+    Общая часть расчета: загрузка произведений и жанров, ранжирование и
+    запись таблицы. Подклассы загружают отзывы и считают оценки.
+    """
+
+    def __init__(self, top=10, review_weight=0.7, genre_weight=0.3,
+                 max_user_reviews=1000, genre_candidates=50):
+        self.top = top
+        self.review_weight = review_weight
+        self.genre_weight = genre_weight
+        self.max_user_reviews = max_user_reviews
+        self.genre_candidates = genre_candidates
+
+    def load(self):
+        titles = Title.objects.order_by('id').values_list('id', 'review_count')
+        self.title_ids = []
+        popularity = {}
+        for title_id, review_count in titles.iterator():
+            self.title_ids.append(title_id)
+            popularity[title_id] = review_count
+
+        self.genres = defaultdict(set)
+        by_genre = defaultdict(list)
+        links = Title.genre.through.objects.order_by().values_list(
+            'title_id', 'genre_id'
+        )
+        for title_id, genre_id in links.iterator():
+            if title_id not in popularity:
+                # Произведение помечено удаленным.
+                continue
+            self.genres[title_id].add(genre_id)
+            by_genre[genre_id].append(title_id)
+        # Для каждого жанра - самые обсуждаемые произведения.
+        self.genre_top = {
+            genre_id: sorted(
+                title_ids, key=lambda pk: (-popularity[pk], pk)
+            )[:self.genre_candidates]
+            for genre_id, title_ids in by_genre.items()
+        }
+        self.load_reviews()
+
+    def iter_reviews(self):
+        """
+        Пары (автор, произведение) без авторов, у которых слишком много
+        отзывов.
+        """
+        reviews = Review.objects.order_by()
+        heavy = set(
+            reviews.values('author_id').annotate(total=Count('id'))
+            .filter(total__gt=self.max_user_reviews)
+            .values_list('author_id', flat=True)
+        )
+        live = set(self.title_ids)
+        pairs = reviews.values_list('author_id', 'title_id')
+        for author_id, title_id in pairs.iterator(chunk_size=10000):
+            if author_id not in heavy and title_id in live:
+                yield author_id, title_id
+
+    def genre_candidates_for(self, title_id):
+        candidates = set()
+        for genre_id in self.genres.get(title_id, ()):
+            candidates.update(self.genre_top[genre_id])
+        return candidates
+
+    def genre_cos(self, title_id, other_id):
+        genres = self.genres.get(title_id)
+        other_genres = self.genres.get(other_id)
+        if not genres or not other_genres:
+            return 0.0
+        return len(genres & other_genres) / math.sqrt(
+            len(genres) * len(other_genres)
+        )
+
+    def rank(self, title_id, scores):
+        """
+        Возвращает top соседей [(id, оценка)] из словаря оценок.
+        """
+        scores.pop(title_id, None)
+        ranked = sorted(
+            (
+                (-round(score, SCORE_DIGITS), other_id)
+                for other_id, score in scores.items() if score > 0
+            )
+        )[:self.top]
+        return [(other_id, -score) for score, other_id in ranked]
+
+    @abc.abstractmethod
+    def load_reviews(self):
+        """
+        Загружает пары (автор, произведение) из iter_reviews().
+        """
+
+    @abc.abstractmethod
+    def compute(self, title_ids):
+        """
+        Возвращает {id произведения: [(id соседа, оценка), ...]}.
+        """
+
+    def build(self, chunk_size=1000, progress=None):
+        """
+        Пересчитывает таблицу SimilarTitle частями по chunk_size
+        произведений. Каждая часть заменяется в отдельной транзакции.
+        """
+        self.load()
+        total = len(self.title_ids)
+        for start in range(0, total, chunk_size):
+            chunk = self.title_ids[start:start + chunk_size]
+            neighbours = self.compute(chunk)
+            rows = [
+                SimilarTitle(
+                    title_id=title_id, similar_id=other_id,
+                    rank=rank, score=score,
+                )
+                for title_id in chunk
+                for rank, (other_id, score) in enumerate(
+                    neighbours.get(title_id, ()), 1
+                )
+            ]
+            with transaction.atomic():
+                SimilarTitle.objects.filter(
+                    title_id__gte=chunk[0], title_id__lte=chunk[-1]
+                ).delete()
+                SimilarTitle.objects.bulk_create(rows)
+            if progress is not None:
+                progress(min(start + chunk_size, total), total)
+        # Строки произведений, удаленных во время расчета, удаляются
+        # каскадом, а строки за пределами текущего диапазона id - здесь.
+        if self.title_ids:
+            SimilarTitle.objects.filter(
+                title_id__gt=self.title_ids[-1]
+            ).delete()
+        else:
+            SimilarTitle.objects.all().delete()
+
+
+class PythonSimilarityBuilder(SimilarityBuilder):
+
+    def load_reviews(self):
+        self.title_authors = defaultdict(lambda: array('l'))
+        self.author_titles = defaultdict(lambda: array('l'))
+        for author_id, title_id in self.iter_reviews():
+            self.title_authors[title_id].append(author_id)
+            self.author_titles[author_id].append(title_id)
+
+    def compute(self, title_ids):
+        result = {}
+        for title_id in title_ids:
+            authors = self.title_authors.get(title_id, ())
+            common = Counter()
+            for author_id in authors:
+                common.update(self.author_titles[author_id])
+            scores = {}
+            for other_id, count in common.items():
+                scores[other_id] = self.review_weight * count / math.sqrt(
+                    len(authors) * len(self.title_authors[other_id])
+                )
+            for other_id in self.genre_candidates_for(title_id) | set(common):
+                scores[other_id] = scores.get(other_id, 0.0) + (
+                    self.genre_weight * self.genre_cos(title_id, other_id)
+                )
+            result[title_id] = self.rank(title_id, scores)
+        return result
+
+
+class ScipySimilarityBuilder(SimilarityBuilder):
+
+    def load(self):
+        super().load()
+        # Жанры как строки плотной матрицы произведения x жанры,
+        # нормированные так, что скалярное произведение строк дает
+        # genres_cos. Жанров немного, поэтому матрица небольшая.
+        genre_index = {
+            genre_id: i for i, genre_id in enumerate(sorted(self.genre_top))
+        }
+        self.title_genres = numpy.zeros(
+            (len(self.ids), len(genre_index)), dtype=numpy.float64
+        )
+        for title_id, genres in self.genres.items():
+            row = self.index[title_id]
+            for genre_id in genres:
+                self.title_genres[row, genre_index[genre_id]] = (
+                    1 / math.sqrt(len(genres))
+                )
+        self.genre_top_index = {
+            genre_id: numpy.searchsorted(self.ids, title_ids)
+            for genre_id, title_ids in self.genre_top.items()
+        }
+
+    def load_reviews(self):
+        authors, titles = array('l'), array('l')
+        for author_id, title_id in self.iter_reviews():
+            authors.append(author_id)
+            titles.append(title_id)
+        self.ids = numpy.array(self.title_ids, dtype=numpy.int64)
+        self.index = {title_id: i for i, title_id in enumerate(self.title_ids)}
+        author_index = numpy.unique(
+            numpy.asarray(authors, dtype=numpy.int64), return_inverse=True
+        )[1]
+        title_index = numpy.searchsorted(
+            self.ids, numpy.asarray(titles, dtype=numpy.int64)
+        )
+        matrix = sparse.csr_matrix(
+            (
+                numpy.ones(len(title_index), dtype=numpy.float64),
+                (author_index, title_index),
+            ),
+            shape=(int(author_index.max(initial=-1)) + 1, len(self.ids)),
+        )
+        # Матрица авторы x произведения и транспонированная к ней.
+        self.author_titles = matrix
+        self.title_authors = matrix.T.tocsr()
+        self.author_counts = numpy.diff(self.title_authors.indptr)
+
+    def compute(self, title_ids):
+        rows = [self.index[title_id] for title_id in title_ids]
+        # Число общих авторов для всех пар (произведение из части, любое
+        # произведение): разреженная матрица len(rows) x всех произведений.
+        common = (self.title_authors[rows] @ self.author_titles).tocsr()
+        result = {}
+        for position, title_id in enumerate(title_ids):
+            row = rows[position]
+            start, end = common.indptr[position], common.indptr[position + 1]
+            columns = common.indices[start:end]
+            candidates = numpy.unique(numpy.concatenate([columns] + [
+                self.genre_top_index[genre_id]
+                for genre_id in self.genres.get(title_id, ())
+            ]).astype(numpy.int64))
+            scores = self.genre_weight * (
+                self.title_genres[candidates] @ self.title_genres[row]
+            )
+            scores[numpy.searchsorted(candidates, columns)] += (
+                self.review_weight * common.data[start:end] / numpy.sqrt(
+                    self.author_counts[row] * self.author_counts[columns]
+                )
+            )
+            scores = numpy.round(scores, SCORE_DIGITS)
+            keep = (scores > 0) & (candidates != row)
+            candidates, scores = candidates[keep], scores[keep]
+            if len(scores) > self.top:
+                # Все кандидаты не хуже top-го, чтобы при равных оценках
+                # порядок по id совпадал с PythonSimilarityBuilder.
+                threshold = -numpy.partition(-scores, self.top - 1)[
+                    self.top - 1
+                ]
+                keep = scores >= threshold
+                candidates, scores = candidates[keep], scores[keep]
+            order = numpy.lexsort((self.ids[candidates], -scores))
+            order = order[:self.top]
+            result[title_id] = list(zip(
+                self.ids[candidates[order]].tolist(), scores[order].tolist()
+            ))
+        return result
+
+
+def get_builder(backend='auto', **options):
+    if backend == 'auto':
+        backend = 'python' if sparse is None else 'scipy'
+    if backend == 'scipy':
+        if sparse is None:
+            raise ImportError('Для backend=scipy нужны numpy и scipy')
+        return ScipySimilarityBuilder(**options)
+    return PythonSimilarityBuilder(**options)
@@ -0,0 +1,49 @@
+from api_yamdb import edge_cache
+from jobs.registry import task
+from titles import purge
+from titles.signals import update_title_rating
+
+
+@task(max_attempts=3)
+def recompute_title_rating(title_id):
+    """
+    Полностью пересчитывает агрегаты отзывов произведения.
+    """
+    update_title_rating(title_id)
+
+
+@task(max_attempts=1, timeout=6 * 3600)
+def build_similar_titles(**options):
+    """
+    Пересчитывает таблицу SimilarTitle; options передаются в
+    titles.similarity.get_builder.
+    """
+    # tasks.py импортируется при старте каждого процесса, а similarity
+    # тянет numpy и scipy, которые нужны только этой задаче.
+    from titles.similarity import get_builder
+
+    get_builder(**options).build()
+
+
+@task(timeout=3600)
+def purge_title(title_id):
+    """
+    Удаляет помеченное удаленным произведение с отзывами, см. titles.purge.
+    """
+    purge.purge_title(title_id)
+
+
+@task(timeout=3600)
+def purge_user(user_id):
+    """
+    Удаляет помеченного удаленным пользователя с отзывами и комментариями.
+    """
+    purge.purge_user(user_id)
+
+
+@task(max_attempts=2, timeout=60)
+def refresh_edge_cache(key):
+    """
+    Обновляет ответы nginx для ключа кэша, см. api_yamdb.edge_cache.
+    """
+    edge_cache.refresh(key)
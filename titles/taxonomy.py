@@ -0,0 +1,69 @@
+"""
+Кэш категорий и жанров в памяти процесса.
+
+Категорий и жанров мало и они почти не меняются, поэтому каждый процесс
+держит их снимок целиком. Актуальность снимка проверяется по версии в
+общем кэше Django (ключ TAXONOMY_VERSION_KEY): при изменении категории
+или жанра версия меняется, и все процессы перечитывают таблицы при
+следующем обращении.
+"""
+import threading
+import uuid
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from titles.models import Category, Genre
+
+TAXONOMY_VERSION_KEY = 'titles:taxonomy:version'
+
+_lock = threading.Lock()
+_taxonomy = None
+
+
+class Taxonomy:
+    """
+    Снимок таблиц категорий и жанров с отображениями id и slug в объекты.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        # Снимок читается из default: реплика может еще не получить
+        # запись, после которой сменилась версия.
+        self.categories = {
+            obj.pk: obj for obj in Category.objects.using(DEFAULT_DB_ALIAS)
+        }
+        self.genres = {
+            obj.pk: obj for obj in Genre.objects.using(DEFAULT_DB_ALIAS)
+        }
+        self.categories_by_slug = {
+            obj.slug: obj for obj in self.categories.values()
+        }
+        self.genres_by_slug = {obj.slug: obj for obj in self.genres.values()}
+
+
+def get_version():
+    version = cache.get(TAXONOMY_VERSION_KEY)
+    if version is None:
+        cache.add(TAXONOMY_VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(TAXONOMY_VERSION_KEY)
+    return version
+
+
+def get_taxonomy():
+    """
+    Возвращает актуальный снимок, перечитывая таблицы при смене версии.
+    """
+    global _taxonomy
+    version = get_version()
+    taxonomy = _taxonomy
+    if taxonomy is not None and taxonomy.version == version:
+        return taxonomy
+    with _lock:
+        if _taxonomy is None or _taxonomy.version != version:
+            _taxonomy = Taxonomy(version)
+        return _taxonomy
+
+
+def invalidate_taxonomy():
+    cache.set(TAXONOMY_VERSION_KEY, uuid.uuid4().hex, None)
@@ -0,0 +1,31 @@
+from django.db.models import Q
+
+from django_filters import rest_framework as filters
+from users.models import CustomUser, UserRole
+
+
+class UserFilter(filters.FilterSet):
+    """
+    Фильтр пользователей по началу username и email, по роли и общий
+    поиск search по началу username или email. Все условия используют
+    индексы таблицы пользователей.
+    """
+    username = filters.CharFilter(
+        field_name='username', lookup_expr='startswith'
+    )
+    email = filters.CharFilter(method='filter_email')
+    role = filters.ChoiceFilter(choices=UserRole.choices)
+    search = filters.CharFilter(method='filter_search')
+
+    class Meta:
+        model = CustomUser
+        fields = ('username', 'email', 'role', 'search')
+
+    def filter_email(self, queryset, name, value):
+        return queryset.filter(email__startswith=value.lower())
+
+    def filter_search(self, queryset, name, value):
+        return queryset.filter(
+            Q(username__startswith=value) |
+            Q(email__startswith=value.lower())
+        )
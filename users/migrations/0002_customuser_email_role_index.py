@@ -0,0 +1,69 @@
+# Generated by Django 3.0.5 on 2026-10-19 18:20
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_duplicates(apps, schema_editor):
+    """
+    Уникальный индекс по LOWER(email) не создастся, если есть адреса,
+    которые отличаются только регистром. Какой из аккаунтов оставить,
+    решает администратор, поэтому миграция останавливается со списком
+    конфликтов.
+    """
+    CustomUser = apps.get_model('users', 'CustomUser')
+    users = CustomUser._base_manager.exclude(email='')
+    duplicates = (
+        users.annotate(email_lower=Lower('email')).order_by()
+        .values('email_lower').annotate(count=Count('id'))
+        .filter(count__gt=1).values_list('email_lower', flat=True)
+    )
+    conflicts = []
+    for email in duplicates:
+        accounts = users.filter(email__iexact=email).order_by('id')
+        conflicts.append('{}: {}'.format(email, ', '.join(
+            f'{user.username} (id={user.pk})' for user in accounts
+        )))
+    if conflicts:
+        raise RuntimeError(
+            'Есть пользователи с email, которые отличаются только '
+            'регистром. Измените или очистите email у лишних аккаунтов и '
+            'повторите migrate:\n' + '\n'.join(conflicts)
+        )
+
+
+def lowercase_emails(apps, schema_editor):
+    CustomUser = apps.get_model('users', 'CustomUser')
+    CustomUser.objects.exclude(email='').update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='email',
+            field=models.EmailField(blank=True, db_index=True, max_length=254, verbose_name='email address'),
+        ),
+        migrations.AlterField(
+            model_name='customuser',
+            name='role',
+            field=models.CharField(choices=[('user', 'User'), ('moderator', 'Moderator'), ('admin', 'Admin')], db_index=True, default='user', max_length=50, verbose_name='Роль'),
+        ),
+        migrations.RunPython(
+            check_case_duplicates, migrations.RunPython.noop
+        ),
+        migrations.RunPython(lowercase_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            sql=(
+                "CREATE UNIQUE INDEX users_customuser_email_lower_uniq "
+                "ON users_customuser (LOWER(email)) WHERE email <> ''"
+            ),
+            reverse_sql='DROP INDEX users_customuser_email_lower_uniq',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.0.5 on 2026-10-20 15:05
+
+from django.db import migrations, models
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_customuser_email_role_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', users.models.CustomUserManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Удален'),
+        ),
+    ]
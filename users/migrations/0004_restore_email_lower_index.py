@@ -0,0 +1,36 @@
+# Generated by Django 3.0.5 on 2026-10-21 12:00
+
+from importlib import import_module
+
+from django.db import migrations
+
+email_index = import_module('users.migrations.0002_customuser_email_role_index')
+
+
+class Migration(migrations.Migration):
+    """
+    SQLite при изменении таблицы в 0003 пересоздает ее и теряет индекс
+    users_customuser_email_lower_uniq, о котором Django не знает. В
+    PostgreSQL индекс сохраняется, и IF NOT EXISTS ничего не меняет.
+    """
+
+    dependencies = [
+        ('users', '0003_customuser_is_deleted'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            email_index.check_case_duplicates, migrations.RunPython.noop
+        ),
+        migrations.RunPython(
+            email_index.lowercase_emails, migrations.RunPython.noop
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE UNIQUE INDEX IF NOT EXISTS "
+                "users_customuser_email_lower_uniq "
+                "ON users_customuser (LOWER(email)) WHERE email <> ''"
+            ),
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
 
 
@@ -8,11 +8,30 @@ class UserRole(models.TextChoices):
     ADMIN = 'admin'
 
 
+class CustomUserManager(UserManager):
+    """
+    Пользователи без помеченных удаленными, см. titles.purge.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class CustomUser(AbstractUser):
+    # Уникальность email без учета регистра обеспечивает индекс
+    # users_customuser_email_lower_uniq из миграции 0002. Django о нем не
+    # знает, и SQLite теряет его, когда пересоздает таблицу при изменении
+    # полей; такие миграции должны создавать индекс заново, как 0004.
+    email = models.EmailField(
+        blank=True,
+        db_index=True,
+        verbose_name='email address',
+    )
     role = models.CharField(
         choices=UserRole.choices,
         default=UserRole.USER,
         max_length=50,
+        db_index=True,
         verbose_name='Роль',
     )
     bio = models.TextField(
@@ -21,6 +40,14 @@ class CustomUser(AbstractUser):
         null=True,
         verbose_name='Биография',
     )
+    is_deleted = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Удален',
+    )
+
+    objects = CustomUserManager()
+    all_objects = models.Manager()
 
     @property
     def is_admin(self):
@@ -34,3 +61,12 @@ class CustomUser(AbstractUser):
     class Meta:
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
+
+    def save(self, *args, **kwargs):
+        """
+        email хранится в нижнем регистре, чтобы поиск по нему шел по индексу
+        без преобразования регистра.
+        """
+        if self.email:
+            self.email = self.email.lower()
+        super().save(*args, **kwargs)